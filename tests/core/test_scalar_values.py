@@ -1,4 +1,9 @@
+import threading
+import time
+from types import SimpleNamespace
+
 import pandas as pd
+import pytest
 from pandas._testing import assert_series_equal
 
 from wetterdienst.core.scalar.values import ScalarValuesCore
@@ -42,3 +47,39 @@ def test_coerce_dates():
     series_expected = pd.Series([pd.Timestamp("1970-01-01").tz_localize("UTC")])
 
     assert_series_equal(series, series_expected)
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_collect_stations_order(prefetch):
+    started = []
+    lock = threading.Lock()
+
+    class CustomScalarValuesCore(ScalarValuesCore):
+        def __init__(self):
+            self.stations = SimpleNamespace(
+                station_id=pd.Series(["1", "2", "3", "4"]), parameter=["a"]
+            )
+
+        def _collect_station_parameter(self, station_id, parameter):
+            with lock:
+                started.append(station_id)
+
+            # The first station takes longest, following ones are finished earlier
+            time.sleep(0.2 if station_id == "1" else 0.01)
+
+            return pd.DataFrame({"station_id": [station_id]})
+
+    csvc = CustomScalarValuesCore()
+
+    collected = csvc._collect_stations(prefetch)
+
+    station_id, station_data, network = next(collected)
+
+    assert station_id == "1"
+    assert station_data[0][0] == "a"
+    assert station_data[0][1]["station_id"].tolist() == ["1"]
+
+    # Following stations are collected while the first one is processed
+    assert len(started) >= 1 + prefetch
+
+    assert [station_id for station_id, _, _ in collected] == ["2", "3", "4"]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import tempfile
+from zipfile import ZipFile
+
+from wetterdienst.provider.dwd.forecast.access import KMLReader
+
+
+def test_kml_reader_fetch_closes_download(monkeypatch):
+    download = tempfile.TemporaryFile()
+
+    with ZipFile(download, "w") as kmz:
+        kmz.writestr("MOSMIX_S_2021071509.kml", b"<kml/>")
+
+    download.seek(0)
+
+    reader = KMLReader(station_ids=["01001"], parameters=["TTT"])
+
+    monkeypatch.setattr(reader, "download", lambda url: download)
+
+    assert reader.fetch("https://example.org/MOSMIX_S.kmz") == b"<kml/>"
+
+    # The temporary file of large forecasts does not stay open
+    assert download.closed
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from wetterdienst.metadata.columns import Columns
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.provider.dwd.metadata.column_names import DwdColumns
+from wetterdienst.provider.dwd.observation import DwdObservationDataset, catalog
+from wetterdienst.provider.dwd.observation.fileindex import FileIndex
+
+
+def test_catalog(monkeypatch):
+    # Changed files make sure no cached entries of earlier runs are used
+    changed = time.time()
+
+    stations = {
+        Period.RECENT: [("00001", "Recent"), ("00003", "Recent"), ("00044", "None")],
+        Period.HISTORICAL: [("00001", "Historical"), ("00005", "Historical")],
+    }
+    files = {
+        Period.RECENT: ["00001", "00003"],
+        Period.HISTORICAL: ["00001", "00001", "00005"],
+    }
+
+    def create_meta_index(dataset, resolution, period):
+        return pd.DataFrame(
+            {
+                Columns.STATION_ID.value: [station for station, _ in stations[period]],
+                Columns.FROM_DATE.value: pd.Timestamp("2000-01-01", tz="UTC"),
+                Columns.TO_DATE.value: pd.Timestamp("2020-12-31", tz="UTC"),
+                Columns.HEIGHT.value: 100.0,
+                Columns.LATITUDE.value: 50.0,
+                Columns.LONGITUDE.value: 10.0,
+                Columns.NAME.value: [name for _, name in stations[period]],
+                Columns.STATE.value: "Sachsen",
+            }
+        )
+
+    def load_file_index(dataset, resolution, period):
+        frame = pd.DataFrame(
+            {
+                DwdColumns.FILENAME.value: [
+                    f"{period.value}/{station_id}_{i}.zip"
+                    for i, station_id in enumerate(files[period])
+                ],
+                DwdColumns.STATION_ID.value: files[period],
+            }
+        )
+
+        return FileIndex(
+            changed=changed,
+            frame=frame,
+            stations=dict(tuple(frame.groupby(DwdColumns.STATION_ID.value))),
+            date_range_indexes={},
+        )
+
+    monkeypatch.setattr(
+        catalog, "create_meta_index_for_climate_observations", create_meta_index
+    )
+    monkeypatch.setattr(
+        catalog, "load_file_index_for_climate_observations", load_file_index
+    )
+
+    dwd_catalog = catalog.DwdObservationCatalog.build(
+        datasets=["kl"], resolutions=["daily"], periods=["recent", "historical"]
+    )
+
+    assert len(dwd_catalog.df) == 4
+
+    # Station without files is left out, recent metadata takes precedence
+    df = dwd_catalog.stations(
+        Resolution.DAILY,
+        [DwdObservationDataset.CLIMATE_SUMMARY],
+        [Period.RECENT, Period.HISTORICAL],
+    )
+
+    assert df[Columns.STATION_ID.value].tolist() == ["00001", "00003", "00005"]
+    assert df[Columns.NAME.value].tolist() == ["Recent", "Recent", "Historical"]
+
+    coverage = dwd_catalog.coverage("00001")
+
+    assert coverage[Columns.PERIOD.value].tolist() == ["historical", "recent"]
+    assert coverage["files"].tolist() == [2, 1]
+    assert dwd_catalog.coverage("00044").empty
+
+    assert (
+        dwd_catalog.files(
+            "00001",
+            DwdObservationDataset.CLIMATE_SUMMARY,
+            Resolution.DAILY,
+            Period.HISTORICAL,
+        )
+        == ["historical/00001_0.zip", "historical/00001_1.zip"]
+    )
+    assert (
+        dwd_catalog.files(
+            "00044",
+            DwdObservationDataset.CLIMATE_SUMMARY,
+            Resolution.DAILY,
+            Period.RECENT,
+        )
+        == []
+    )
+
+
+def test_catalog_entry_rebuilt(monkeypatch):
+    state = {"changed": time.time(), "stations": ["00001"]}
+    builds = []
+
+    def create_meta_index(dataset, resolution, period):
+        builds.append(state["changed"])
+
+        return pd.DataFrame(
+            {
+                Columns.STATION_ID.value: state["stations"],
+                Columns.FROM_DATE.value: pd.Timestamp("2000-01-01", tz="UTC"),
+                Columns.TO_DATE.value: pd.Timestamp("2020-12-31", tz="UTC"),
+                Columns.HEIGHT.value: 100.0,
+                Columns.LATITUDE.value: 50.0,
+                Columns.LONGITUDE.value: 10.0,
+                Columns.NAME.value: "Station",
+                Columns.STATE.value: "Sachsen",
+            }
+        )
+
+    def load_file_index(dataset, resolution, period):
+        frame = pd.DataFrame(
+            {
+                DwdColumns.FILENAME.value: [f"{s}.zip" for s in state["stations"]],
+                DwdColumns.STATION_ID.value: state["stations"],
+            }
+        )
+
+        return FileIndex(
+            changed=state["changed"],
+            frame=frame,
+            stations=dict(tuple(frame.groupby(DwdColumns.STATION_ID.value))),
+            date_range_indexes={},
+        )
+
+    monkeypatch.setattr(
+        catalog, "create_meta_index_for_climate_observations", create_meta_index
+    )
+    monkeypatch.setattr(
+        catalog, "load_file_index_for_climate_observations", load_file_index
+    )
+
+    combination = (
+        DwdObservationDataset.CLIMATE_SUMMARY,
+        Resolution.DAILY,
+        Period.RECENT,
+    )
+
+    catalog.create_catalog_entry(*combination)
+    catalog.create_catalog_entry(*combination)
+
+    assert builds == [state["changed"]]
+
+    # Changed files overwrite the one cached entry of the dataset
+    state["changed"] += 1
+    state["stations"] = ["00001", "00002"]
+
+    entry = catalog.create_catalog_entry(*combination)
+
+    assert entry[Columns.STATION_ID.value].tolist() == ["00001", "00002"]
+    assert builds == [state["changed"] - 1, state["changed"]]
+
+    cached = catalog._create_catalog_entry(
+        dataset=combination[0], resolution=combination[1], period=combination[2]
+    )
+
+    assert cached.changed == state["changed"]
+
+
+def test_catalog_concurrent(monkeypatch):
+    selection = {
+        "datasets": ["kl", "more_precip"],
+        "resolutions": ["daily"],
+        "periods": ["historical", "recent"],
+    }
+
+    # Meta and file indexes of all combinations are built at the same time
+    barrier = threading.Barrier(
+        len(catalog.select_combinations(**selection)) * 2, timeout=10
+    )
+
+    def build_index(*args):
+        barrier.wait()
+
+        raise RuntimeError("index failed")
+
+    monkeypatch.setattr(
+        catalog, "create_meta_index_for_climate_observations", build_index
+    )
+    monkeypatch.setattr(
+        catalog, "load_file_index_for_climate_observations", build_index
+    )
+
+    with pytest.raises(RuntimeError):
+        catalog.DwdObservationCatalog.build(**selection)
+
+    assert not barrier.broken
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+from io import BytesIO
+from unittest import mock
+
+from tests.util.test_network import RangeSession, _archive
+from wetterdienst.provider.dwd.observation import download
+from wetterdienst.provider.dwd.observation.download import _extract_product_file
+from wetterdienst.util.network import RemoteFile
+
+
+def test_extract_product_file_ranges():
+    session = RangeSession(_archive())
+    session.get = mock.Mock(wraps=session.get)
+
+    url = "https://opendata.dwd.de/tageswerte_KL_01048_akt.zip"
+
+    product = _extract_product_file(RemoteFile(url, session), url)
+
+    assert product.getvalue() == b"STATIONS_ID;MESS_DATUM"
+
+    # One request for the central directory, one for the product file
+    assert session.get.call_count == 2
+
+
+def test_download_climate_observations_data_shared(monkeypatch):
+    shared = BytesIO(b"STATIONS_ID;MESS_DATUM")
+
+    monkeypatch.setattr(
+        download,
+        "__download_climate_observations_data",
+        lambda **kwargs: shared,
+    )
+
+    first = download._download_climate_observations_data("first.zip")
+    first.read(5)
+
+    second = download._download_climate_observations_data("second.zip")
+
+    # Reading one payload does not move the other
+    assert second.read() == b"STATIONS_ID;MESS_DATUM"
+    assert first.read() == b"ONS_ID;MESS_DATUM"
+    assert shared.tell() == 0
@@ -2,6 +2,11 @@
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
 """ tests for file index creation """
+import multiprocessing
+import time
+from datetime import datetime
+
+import pandas as pd
 import pytest
 import requests
 
@@ -12,11 +17,14 @@ from wetterdienst.provider.dwd.observation import (
     DwdObservationDataset,
     DwdObservationPeriod,
     DwdObservationResolution,
+    fileindex,
 )
 from wetterdienst.provider.dwd.observation.fileindex import (
     create_file_index_for_climate_observations,
     create_file_list_for_climate_observations,
 )
+from wetterdienst.util.network import ListedFile
+from wetterdienst.util.store import FileIndexStore
 
 
 @pytest.mark.remote
@@ -74,3 +82,182 @@ def test_create_file_list_for_dwd_server():
         "10_minutes/air_temperature/historical/"
         "10minutenwerte_TU_00003_19930428_19991231_hist.zip"
     ]
+
+
+def test_file_index_incremental(monkeypatch):
+    store = FileIndexStore()
+    monkeypatch.setattr(fileindex, "file_index_store", store)
+    monkeypatch.setattr(fileindex, "_file_indexes", {})
+
+    base = (
+        "https://opendata.dwd.de/climate_environment/CDC/observations_germany/"
+        "climate/10_minutes/air_temperature/historical/"
+    )
+
+    def listed(name, size):
+        return ListedFile(base + name, size, datetime(2021, 7, 1))
+
+    listings = [
+        [
+            listed("10minutenwerte_TU_00003_19930428_19991231_hist.zip", 100),
+            listed("10minutenwerte_TU_00003_20000101_20091231_hist.zip", 100),
+            listed("10minutenwerte_TU_00044_20070209_20091231_hist.zip", 100),
+            listed("DESCRIPTION_obsgermany_climate_10min_tu_historical_en.pdf", 10),
+        ],
+        [
+            listed("10minutenwerte_TU_00003_19930428_19991231_hist.zip", 100),
+            listed("10minutenwerte_TU_00003_20000101_20091231_hist.zip", 120),
+            listed("10minutenwerte_TU_00044_20100101_20201231_hist.zip", 100),
+        ],
+    ]
+
+    monkeypatch.setattr(
+        fileindex, "crawl_remote_files", lambda url, recursive: listings.pop(0)
+    )
+
+    arguments = (
+        DwdObservationDataset.TEMPERATURE_AIR,
+        Resolution.MINUTE_10,
+        Period.HISTORICAL,
+    )
+
+    file_index = create_file_index_for_climate_observations(*arguments)
+
+    assert file_index[DwdColumns.STATION_ID.value].tolist() == [
+        "00003",
+        "00003",
+        "00044",
+    ]
+    assert file_index[DwdColumns.DATE_RANGE.value].tolist()[0] == "19930428_19991231"
+    assert file_index[DwdColumns.INTERVAL.value][0].left == pd.Timestamp(
+        "1993-04-28", tz="UTC"
+    )
+
+    listing = base
+
+    # The listing is not requested again within its TTL
+    create_file_index_for_climate_observations(*arguments)
+    assert len(listings) == 1
+
+    monkeypatch.setattr(fileindex, "get_ttl", lambda *args: -1)
+
+    changed = store.changed(listing)
+
+    assert fileindex.update_file_index_for_climate_observations(*arguments) == listing
+    assert store.changed(listing) > changed
+
+    monkeypatch.setattr(fileindex, "get_ttl", lambda *args: 3600)
+
+    # Only changes are applied to the stored rows
+    assert create_file_list_for_climate_observations("00044", *arguments) == [
+        base + "10minutenwerte_TU_00044_20100101_20201231_hist.zip"
+    ]
+    assert create_file_list_for_climate_observations(
+        "00003", *arguments, date_range="20000101_20091231"
+    ) == [base + "10minutenwerte_TU_00003_20000101_20091231_hist.zip"]
+
+    # Grouped index is reused until the listing changes
+    file_index = fileindex.load_file_index_for_climate_observations(*arguments)
+    assert fileindex.load_file_index_for_climate_observations(*arguments) is file_index
+    assert file_index.station("00005").empty
+
+
+def test_file_index_update_single_flight(tmp_path, monkeypatch):
+    store = FileIndexStore(str(tmp_path / "fileindex.sqlite"))
+    monkeypatch.setattr(fileindex, "file_index_store", store)
+
+    marker = tmp_path / "marker"
+
+    def crawl_remote_files(url, recursive):
+        with open(marker, "a") as f:
+            f.write("x")
+
+        time.sleep(0.5)
+
+        return [ListedFile(f"{url}tageswerte_KL_00003_akt.zip", 100, None)]
+
+    monkeypatch.setattr(fileindex, "crawl_remote_files", crawl_remote_files)
+
+    arguments = (DwdObservationDataset.CLIMATE_SUMMARY, Resolution.DAILY, Period.RECENT)
+
+    context = multiprocessing.get_context("fork")
+
+    workers = [
+        context.Process(
+            target=fileindex.update_file_index_for_climate_observations,
+            args=arguments,
+        )
+        for _ in range(3)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    # Only one of the racing processes listed the server, the others found the
+    # listing updated once they got hold of its lock
+    assert marker.read_text() == "x"
+
+
+@pytest.mark.parametrize(
+    "start,end",
+    [
+        ("1990-01-01", "1995-01-01"),
+        ("2000-01-01", "2000-01-01"),
+        ("1999-12-31", "2000-01-01"),
+        ("2015-01-01", "2030-01-01"),
+        ("1980-01-01", "1985-01-01"),
+    ],
+)
+def test_file_index_date_ranges(start, end):
+    date_ranges = [
+        ("00003", "19930428_19991231"),
+        ("00003", "20000101_20091231"),
+        ("00003", "20100101_20201231"),
+        ("00044", "20070209_20091231"),
+        # Faulty date range spanning all others
+        ("00044", "19900101_20201231"),
+        ("00044", "20100101_20201231"),
+    ]
+
+    frame = pd.DataFrame(
+        {
+            DwdColumns.STATION_ID.value: [station_id for station_id, _ in date_ranges],
+            DwdColumns.DATE_RANGE.value: [date_range for _, date_range in date_ranges],
+        }
+    )
+    for column, position in ((DwdColumns.FROM_DATE, 0), (DwdColumns.TO_DATE, 1)):
+        frame[column.value] = pd.to_datetime(
+            frame[DwdColumns.DATE_RANGE.value].str.split("_").str[position], utc=True
+        )
+    frame[DwdColumns.INTERVAL.value] = pd.arrays.IntervalArray.from_arrays(
+        frame[DwdColumns.FROM_DATE.value],
+        frame[DwdColumns.TO_DATE.value],
+        closed="both",
+    )
+
+    file_index = fileindex.FileIndex(
+        changed=None,
+        frame=frame,
+        stations={},
+        date_range_indexes=fileindex._build_date_range_indexes(frame),
+    )
+
+    interval = pd.Interval(
+        pd.Timestamp(start, tz="UTC"), pd.Timestamp(end, tz="UTC"), "both"
+    )
+
+    for station_id in ("00003", "00044"):
+        station = frame[frame[DwdColumns.STATION_ID.value] == station_id]
+        expected = station[station[DwdColumns.INTERVAL.value].array.overlaps(interval)]
+
+        assert sorted(file_index.date_ranges(station_id, interval)) == sorted(
+            expected[DwdColumns.DATE_RANGE.value]
+        )
+
+    assert file_index.date_ranges("00005", interval) == []
+    assert len(file_index.date_ranges("00044")) == 3
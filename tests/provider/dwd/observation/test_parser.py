@@ -2,6 +2,7 @@
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
 """ Tests for parser function """
+import hashlib
 from io import BytesIO
 from zipfile import ZipFile
 
@@ -11,8 +12,10 @@ import requests
 from pandas._testing import assert_frame_equal
 
 from wetterdienst import Period, Resolution
-from wetterdienst.provider.dwd.observation import DwdObservationDataset
+from wetterdienst.provider.dwd.observation import DwdObservationDataset, parser
 from wetterdienst.provider.dwd.observation.parser import parse_climate_observations_data
+from wetterdienst.util import cache
+from wetterdienst.util.store import PayloadStore
 
 
 @pytest.mark.remote
@@ -62,3 +65,39 @@ def test_parse_dwd_data():
             }
         ),
     )
+
+
+def test_parse_dwd_data_frame_cache(tmp_path, monkeypatch):
+    frame_store = PayloadStore(str(tmp_path / "frames"), str(tmp_path / "frames.dbm"))
+    monkeypatch.setattr(cache, "frame_store", frame_store)
+
+    url = "https://opendata.dwd.de/tageswerte_KL_00001_akt.zip"
+    file = (
+        b"STATIONS_ID;MESS_DATUM;  TMK;eor\n"
+        b"    1;20210101;  -0.5;eor\n"
+        b"    1;20210102;-999;eor\n"
+    )
+
+    def parse(content: bytes):
+        return parse_climate_observations_data(
+            filenames_and_files=[(url, BytesIO(content))],
+            dataset=DwdObservationDataset.CLIMATE_SUMMARY,
+            resolution=Resolution.DAILY,
+            period=Period.RECENT,
+        )
+
+    df = parse(file)
+
+    assert frame_store.metadata(url) == {"validator": hashlib.sha256(file).hexdigest()}
+
+    # Read back from the frame cache for the very same content, without parsing
+    with monkeypatch.context() as m:
+        m.setattr(parser, "__parse_climate_observations_data", None)
+
+        assert_frame_equal(parse(file), df)
+
+    # The file changed after the frame was cached, e.g. it was downloaded again
+    # before it is parsed, so the cached frame is no longer valid
+    changed = file.replace(b"-0.5", b"1.5")
+
+    assert parse(changed)["tmk"][0] == "1.5"
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+from freezegun import freeze_time
+
+from wetterdienst.metadata.provider import Provider
+from wetterdienst.provider.dwd.observation import (
+    DwdObservationDataset,
+    DwdObservationPeriod,
+    DwdObservationResolution,
+)
+from wetterdienst.provider.dwd.radar import (
+    DwdRadarParameter,
+    DwdRadarPeriod,
+    DwdRadarResolution,
+)
+from wetterdienst.util.cache import get_ttl
+
+
+def _get_ttl(period):
+    return get_ttl(
+        Provider.DWD,
+        DwdObservationDataset.CLIMATE_SUMMARY,
+        DwdObservationResolution.DAILY,
+        period,
+    )
+
+
+def test_dwd_ttl_policy():
+    assert _get_ttl(DwdObservationPeriod.NOW) == 5 * 60
+    assert _get_ttl(DwdObservationPeriod.RECENT) == 60 * 60
+    assert _get_ttl(None) is None
+
+
+def test_dwd_ttl_policy_historical():
+    # Within the release window, historical data is refreshed daily
+    with freeze_time("2021-03-15"):
+        assert _get_ttl(DwdObservationPeriod.HISTORICAL) == 24 * 60 * 60
+
+    # Afterwards everything fetched since the end of the window stays valid
+    with freeze_time("2021-07-01"):
+        assert _get_ttl(DwdObservationPeriod.HISTORICAL) == 30 * 24 * 60 * 60
+
+    with freeze_time("2021-06-01 06:00"):
+        assert _get_ttl(DwdObservationPeriod.HISTORICAL) == 24 * 60 * 60
+
+
+def test_dwd_ttl_policy_monthly_archives():
+    # Historical RADOLAN_CDC gains a monthly archive, also outside of the window
+    with freeze_time("2021-08-15"):
+        assert (
+            get_ttl(
+                Provider.DWD,
+                DwdRadarParameter.RADOLAN_CDC,
+                DwdRadarResolution.HOURLY,
+                DwdRadarPeriod.HISTORICAL,
+            )
+            == 24 * 60 * 60
+        )
+        assert _get_ttl(DwdObservationPeriod.HISTORICAL) > 24 * 60 * 60
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import os
+
+import requests
+
+from wetterdienst.provider.dwd import mirror as dwd_mirror
+from wetterdienst.provider.dwd.mirror import mirror
+from wetterdienst.util import network
+from wetterdienst.util.transport import FileAdapter, LocalAdapter
+
+
+def test_mirror_incremental(tmp_path, monkeypatch):
+    # A local directory tree stands in for the DWD server
+    server = tmp_path / "server"
+    dataset = (
+        server / "opendata.dwd.de" / "climate_environment" / "CDC" / "kl" / "recent"
+    )
+    dataset.mkdir(parents=True)
+
+    (dataset / "tageswerte_KL_01048_akt.zip").write_bytes(b"foo")
+    (dataset / "tageswerte_KL_04411_akt.zip").write_bytes(b"bar")
+
+    session = requests.Session()
+    session.mount("https://", LocalAdapter(str(server)))
+
+    monkeypatch.setattr(network, "session", session)
+    monkeypatch.setattr(dwd_mirror, "create_dwd_session", lambda: session)
+
+    target = tmp_path / "mirror"
+
+    summary = mirror(str(target), ["climate_environment/CDC/"])
+
+    assert summary == {"files": 2, "downloaded": 2, "failed": 0, "bytes": 6}
+
+    # The mirror has the same layout as the tree of the local transport
+    mirrored = (
+        target / "opendata.dwd.de" / "climate_environment" / "CDC" / "kl" / "recent"
+    )
+
+    assert (mirrored / "tageswerte_KL_01048_akt.zip").read_bytes() == b"foo"
+
+    url = "https://opendata.dwd.de/climate_environment/CDC/kl/recent/"
+
+    local = requests.Session()
+    local.mount("https://", LocalAdapter(str(target)))
+
+    assert local.get(f"{url}tageswerte_KL_01048_akt.zip").content == b"foo"
+
+    # ... and is read with the DWD server pointing to its folder of the host
+    files = requests.Session()
+    files.mount("file://", FileAdapter())
+
+    server_root = (target / "opendata.dwd.de").as_uri()
+
+    assert (
+        files.get(
+            f"{server_root}/climate_environment/CDC/kl/recent/"
+            "tageswerte_KL_04411_akt.zip"
+        ).content
+        == b"bar"
+    )
+
+    # Unchanged files are not downloaded again
+    summary = mirror(str(target), ["climate_environment/CDC/"])
+
+    assert summary["downloaded"] == 0
+
+    (dataset / "tageswerte_KL_04411_akt.zip").write_bytes(b"barbaz")
+    os.utime(dataset / "tageswerte_KL_04411_akt.zip", (0, 0))
+
+    summary = mirror(str(target), ["climate_environment/CDC/"])
+
+    assert summary == {"files": 2, "downloaded": 1, "failed": 0, "bytes": 6}
+    assert (mirrored / "tageswerte_KL_04411_akt.zip").read_bytes() == b"barbaz"
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import pytest
+
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.provider.dwd import warm
+from wetterdienst.provider.dwd.observation import DwdObservationDataset
+
+
+def test_warm_cache(monkeypatch):
+    calls = []
+
+    def record(name):
+        def function(*args, **kwargs):
+            calls.append((name, *args))
+            return [f"{args[0]}.zip"] if name == "file list" else None
+
+        return function
+
+    monkeypatch.setattr(
+        warm, "create_meta_index_for_climate_observations", record("meta index")
+    )
+    monkeypatch.setattr(
+        warm, "create_file_index_for_climate_observations", record("file index")
+    )
+    monkeypatch.setattr(
+        warm, "create_file_list_for_climate_observations", record("file list")
+    )
+    monkeypatch.setattr(warm, "_download_climate_observations_data", record("payload"))
+
+    summary = warm.warm_cache(
+        datasets=["kl"],
+        resolutions=["daily"],
+        periods=["recent"],
+        station_ids=["1048"],
+        payloads=True,
+    )
+
+    assert summary == {"indexes": 2, "payloads": 1, "failed": 0}
+
+    combination = (
+        DwdObservationDataset.CLIMATE_SUMMARY,
+        Resolution.DAILY,
+        Period.RECENT,
+    )
+
+    assert ("meta index", *combination) in calls
+    assert ("file index", *combination) in calls
+    assert ("file list", "01048", *combination) in calls
+    assert ("payload", "01048.zip") in calls
+
+
+def test_warm_cache_payloads_without_stations():
+    with pytest.raises(ValueError):
+        warm.warm_cache(datasets=["kl"], payloads=True)
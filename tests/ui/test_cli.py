@@ -54,7 +54,7 @@ def test_cli_help():
 
     assert "Options:\n --help  Show this message and exit."
     assert (
-        "Commands:\n  about\n  explorer\n  radar\n  "
+        "Commands:\n  about\n  cache\n  explorer\n  mirror\n  radar\n  "
         "restapi\n  show\n  stations\n  values\n" in result.output
     )
 
@@ -105,6 +105,25 @@ def test_cli_about_coverage(capsys):
     assert "precipitation" in result.output
 
 
+def test_cli_cache_stats():
+    runner = CliRunner()
+
+    result = runner.invoke(cli, "cache stats")
+
+    assert result.exit_code == 0
+
+    stats = json.loads(result.output)
+
+    assert set(stats["fileindex_1h"].keys()) == {
+        "hits",
+        "misses",
+        "hit_ratio",
+        "regeneration_time",
+        "stored_bytes",
+    }
+    assert {"frames", "fileindex"} <= stats.keys()
+
+
 def invoke_wetterdienst_stations_empty(provider, kind, setting, fmt="json"):
     runner = CliRunner()
 
@@ -296,3 +296,11 @@ def test_dwd_values_sql_tidy(dicts_are_same):
             "quality": 3.0,
         },
     )
+
+
+def test_cache_stats():
+    response = client.get("/restapi/cache/stats")
+
+    assert response.status_code == 200
+    assert "payload_12h" in response.json()
+    assert "fileindex" in response.json()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import json
+from io import BytesIO
+
+import pandas as pd
+from dogpile.cache import make_region
+from dogpile.cache.util import kwarg_function_key_generator
+from freezegun import freeze_time
+
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
+from wetterdienst.util import cache
+from wetterdienst.util.cache import cache_on_policy
+from wetterdienst.util.instrumentation import record_network
+from wetterdienst.util.store import PayloadStore
+
+
+def test_cache_on_policy(monkeypatch):
+    monkeypatch.setitem(
+        cache.ttl_policies,
+        Provider.ECCC,
+        lambda dataset, resolution, period: 60 if period == Period.NOW else None,
+    )
+
+    region = make_region(function_key_generator=kwarg_function_key_generator).configure(
+        "dogpile.cache.memory", expiration_time=3600
+    )
+
+    calls = []
+
+    @cache_on_policy(region, Provider.ECCC)
+    def download(url, period=None):
+        calls.append(url)
+        return url
+
+    with freeze_time("2021-07-01 00:00:00") as frozen:
+        download("now", period=Period.NOW)
+        download("historical", Period.HISTORICAL)
+
+        frozen.tick(120)
+
+        # Only the value with the shorter TTL of the policy is expired
+        download("now", period=Period.NOW)
+        download("historical", Period.HISTORICAL)
+
+    assert calls == ["now", "historical", "now"]
+
+
+def test_cache_on_policy_cache_hits():
+    region = make_region(function_key_generator=kwarg_function_key_generator).configure(
+        "dogpile.cache.memory", expiration_time=3600
+    )
+
+    @cache_on_policy(region, Provider.ECCC, url_argument="url")
+    def download(url):
+        return url
+
+    with record_network() as network:
+        download("https://example.org/foo")
+        download("https://example.org/foo")
+
+    assert [record.url for record in network.records] == ["https://example.org/foo"]
+    assert network.records[0].cache_hit
+
+
+def test_cache_on_policy_revalidation(tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        cache.ttl_policies, Provider.ECCC, lambda dataset, resolution, period: 60
+    )
+
+    region = make_region(function_key_generator=kwarg_function_key_generator).configure(
+        "wetterdienst.filestore",
+        expiration_time=3600,
+        arguments={"filename": str(tmp_path / "payload.dbm")},
+    )
+
+    url = "https://example.org/foo.zip"
+    downloads = []
+    revalidations = []
+
+    def revalidate(url, validators):
+        revalidations.append(validators)
+
+        # Unchanged at the first revalidation, changed at the second one
+        return len(revalidations) == 1
+
+    @cache_on_policy(region, Provider.ECCC, url_argument="url", revalidate=revalidate)
+    def download(url):
+        downloads.append(url)
+
+        cache.record_validators(url, {"ETag": f'"{len(downloads)}"'})
+
+        return BytesIO(f"foo{len(downloads)}".encode())
+
+    with freeze_time("2021-07-01 00:00:00") as frozen:
+        assert download(url).read() == b"foo1"
+
+        frozen.tick(120)
+
+        # The expired value is kept, only its validators were sent
+        assert download(url).read() == b"foo1"
+        assert revalidations == [{"etag": '"1"'}]
+
+        frozen.tick(30)
+
+        # Revalidated values are fresh for another TTL
+        download(url)
+        assert len(revalidations) == 1
+
+        frozen.tick(60)
+
+        assert download(url).read() == b"foo2"
+
+    assert downloads == [url, url]
+    assert revalidations == [{"etag": '"1"'}, {"etag": '"1"'}]
+
+    # Only validators are stored next to the value, no copy of the file
+    assert region.actual_backend.store.metadata(
+        region.function_key_generator(None, download.__wrapped__)(url)
+    )["validators"] == {"etag": '"2"'}
+
+
+def test_cache_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "cache_stats_filename", str(tmp_path / "stats.json"))
+
+    region = cache.payload_cache_twelve_hours
+
+    # Start from counters of other tests run in this process
+    cache.reset_cache_stats()
+
+    region.delete("stats")
+    region.get_or_create("stats", lambda: b"foo")
+    region.get_or_create("stats", lambda: b"foo")
+
+    stats = cache.cache_stats()["payload_12h"]
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["regeneration_time"] >= 0
+
+    # Counters of this process have been added to the file, so they are not
+    # counted twice
+    assert cache.cache_stats()["payload_12h"]["hits"] == 1
+
+
+def test_cache_stats_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "cache_stats_filename", str(tmp_path / "stats.json"))
+    monkeypatch.setattr(
+        cache,
+        "frame_store",
+        PayloadStore(str(tmp_path / "frames"), str(tmp_path / "frames.dbm")),
+    )
+
+    cache.reset_cache_stats()
+
+    url = "https://example.org/foo.zip"
+
+    assert cache.load_frame(url, "1") is None
+    cache.store_frame(url, pd.DataFrame({"foo": [1, 2]}), "1")
+    assert cache.load_frame(url, "1") is not None
+
+    # The file changed since the frame was stored
+    assert cache.load_frame(url, "2") is None
+
+    stats = cache.cache_stats()
+
+    assert stats["frames"]["hits"] == 1
+    assert stats["frames"]["misses"] == 2
+    assert stats["frames"]["stored_bytes"] > 0
+
+    # Counted by the file index updates
+    assert set(stats["fileindex"].keys()) == set(stats["payload_12h"].keys())
+
+
+def test_cache_stats_periodic_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "cache_stats_filename", str(tmp_path / "stats.json"))
+
+    cache.reset_cache_stats()
+
+    region = cache.payload_cache_twelve_hours
+    region.delete("stats")
+
+    # Counting does not write the counters before the interval has passed
+    monkeypatch.setattr(cache, "CACHE_STATS_INTERVAL", 3600)
+    region.get_or_create("stats", lambda: b"foo")
+
+    assert "payload_12h" not in json.loads((tmp_path / "stats.json").read_text())
+
+    # Running processes add their counters to the file, so they are seen by others
+    monkeypatch.setattr(cache, "CACHE_STATS_INTERVAL", 0)
+    region.get_or_create("stats", lambda: b"foo")
+
+    stats = json.loads((tmp_path / "stats.json").read_text())["payload_12h"]
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import contextvars
+import threading
+import time
+
+import pytest
+
+from wetterdienst.util.engine import DownloadEngine
+
+
+def test_download_engine_concurrency():
+    engine = DownloadEngine(concurrency=3)
+
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def download(item):
+        with lock:
+            running.append(item)
+            peak.append(len(running))
+
+        time.sleep(0.05)
+
+        with lock:
+            running.remove(item)
+
+        return item * 2
+
+    # Results keep the order of the items
+    assert engine.map(download, range(10)) == [item * 2 for item in range(10)]
+
+    # Calls of several threads share the same limit
+    threads = [
+        threading.Thread(target=engine.map, args=(download, range(5))) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 3
+
+
+def test_download_engine_nested_and_errors():
+    engine = DownloadEngine(concurrency=1)
+
+    def inner(item):
+        return item + 1
+
+    def outer(item):
+        # Would dead-lock with a single slot, if not run inline
+        return engine.map(inner, [item])[0]
+
+    assert engine.map(outer, [1, 2]) == [2, 3]
+
+    def fail(item):
+        raise ValueError(item)
+
+    with pytest.raises(ValueError):
+        engine.map(fail, [1])
+
+
+def test_download_engine_context():
+    engine = DownloadEngine(concurrency=2)
+
+    variable = contextvars.ContextVar("variable", default=None)
+    variable.set("caller")
+
+    # Downloads see the context of the caller, e.g. its network report
+    assert engine.map(lambda item: variable.get(), [1, 2]) == ["caller", "caller"]
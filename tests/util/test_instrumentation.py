@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+from wetterdienst.util import transport
+from wetterdienst.util.engine import download_engine
+from wetterdienst.util.instrumentation import record_cache_hit, record_network
+
+
+def _session(tmp_path, monkeypatch):
+    folder = tmp_path / "example.org" / "data"
+    folder.mkdir(parents=True)
+    (folder / "foo.txt").write_bytes(b"x" * 1000)
+
+    monkeypatch.setattr(transport, "transport_type", transport.TransportType.LOCAL)
+    monkeypatch.setattr(transport, "transport_root", str(tmp_path))
+
+    return transport.create_session()
+
+
+def test_record_network(tmp_path, monkeypatch):
+    session = _session(tmp_path, monkeypatch)
+
+    url = "https://example.org/data/foo.txt"
+
+    # Nothing is recorded outside of record_network()
+    session.get(url)
+
+    with record_network() as outer:
+        session.get(url)
+
+        with record_network() as inner:
+            r = session.get(url, stream=True)
+            assert len(b"".join(r.iter_content(chunk_size=100))) == 1000
+
+            # Requests of the download engine count towards the caller
+            download_engine.submit(session.get, url).result()
+
+            record_cache_hit(url)
+
+        session.get("https://example.org/data/bar.txt")
+
+    assert inner.summary()["requests"] == 2
+    assert inner.summary()["cache_hits"] == 1
+    assert inner.summary()["bytes"] == 2000
+
+    # Records of the inner report are part of the outer one
+    summary = outer.summary()
+    assert summary["requests"] == 4
+    assert summary["cache_hits"] == 1
+    assert summary["bytes"] == 3000
+    assert summary["retries"] == 0
+
+    urls = outer.by_url()
+    assert list(urls) == [url, "https://example.org/data/bar.txt"]
+    assert urls[url]["requests"] == 3
+    assert urls[url]["bytes"] == 3000
+    assert urls["https://example.org/data/bar.txt"]["bytes"] == 0
+
+    record = outer.records[0]
+    assert record.status == 200
+    assert record.total_time >= record.time_to_first_byte
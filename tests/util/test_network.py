@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from unittest import mock
+from zipfile import ZipFile
+
+import pytest
+import requests
+from dogpile.cache import make_region
+
+from wetterdienst.util import cache, network
+
+
+def _response(status_code: int, content: bytes = b"", headers: dict = None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+def test_revalidate():
+    url = "https://opendata.dwd.de/climate_environment/CDC/foo.zip"
+
+    session = mock.Mock()
+    session.get.return_value = _response(304)
+
+    assert network.revalidate(url, {"etag": '"abc"'}, session)
+    session.get.assert_called_with(url, headers={"If-None-Match": '"abc"'}, stream=True)
+
+    session.get.return_value = _response(200, b"foobaz")
+
+    assert not network.revalidate(
+        url, {"last_modified": "Mon, 01 Mar 2021 00:00:00 GMT"}, session
+    )
+    session.get.assert_called_with(
+        url,
+        headers={"If-Modified-Since": "Mon, 01 Mar 2021 00:00:00 GMT"},
+        stream=True,
+    )
+
+    # Without validators there is nothing to revalidate
+    assert not network.revalidate(url, {}, session)
+    assert session.get.call_count == 2
+
+
+def test_coalesced_get_not_found():
+    url = "https://opendata.dwd.de/weather/local_forecasts/mos/MOSMIX_L/X/kml/"
+    cache.negative_cache.delete(url)
+
+    session = mock.Mock()
+    session.get.return_value = _response(404)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError) as excinfo:
+            network.coalesced_get(url, session)
+
+        assert excinfo.value.response.status_code == 404
+
+    # The second attempt is answered by the negative cache
+    assert session.get.call_count == 1
+
+
+class RangeSession:
+    """ Session serving a resource with or without support for ranges """
+
+    def __init__(self, content: bytes, ranges: bool = True):
+        self.content = content
+        self.ranges = ranges
+        self.transferred = 0
+
+    def get(self, url, headers=None):
+        spec = (headers or {}).get("Range")
+
+        if not spec or not self.ranges:
+            response = _response(200, self.content)
+        else:
+            start, end = spec[len("bytes=") :].split("-")
+            size = len(self.content)
+
+            if not start:
+                start, end = max(size - int(end), 0), size - 1
+            else:
+                start, end = int(start), min(int(end), size - 1)
+
+            response = _response(
+                206,
+                self.content[start : end + 1],
+                {"Content-Range": f"bytes {start}-{end}/{size}"},
+            )
+
+        self.transferred += len(response.content)
+
+        return response
+
+
+def _archive() -> bytes:
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("Metadaten_Geographie_01048.txt", os.urandom(200_000))
+        zip_file.writestr("produkt_klima_tag_01048.txt", b"STATIONS_ID;MESS_DATUM")
+        zip_file.writestr("Metadaten_Parameter_01048.html", os.urandom(200_000))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_remote_file(ranges):
+    content = _archive()
+    session = RangeSession(content, ranges=ranges)
+
+    remote_file = network.RemoteFile("https://example.org/foo.zip", session)
+
+    with ZipFile(remote_file) as zip_file:
+        product = zip_file.read("produkt_klima_tag_01048.txt")
+
+    assert product == b"STATIONS_ID;MESS_DATUM"
+    assert remote_file.ranged is ranges
+
+    if ranges:
+        # Only the central directory and the product file are transferred
+        assert session.transferred < len(content) / 4
+    else:
+        assert session.transferred == len(content)
+
+
+class DroppingSession:
+    """ Session whose connection drops after the given number of bytes per request """
+
+    def __init__(self, content: bytes, drop_after: int, validator: str = "abc"):
+        self.content = content
+        self.drop_after = drop_after
+        self.validator = validator
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False):
+        headers = headers or {}
+        self.requests.append(headers)
+
+        start = 0
+        size = len(self.content)
+
+        if "Range" in headers and headers.get("If-Range") == self.validator:
+            start = int(headers["Range"][len("bytes=") : -1])
+            response = _response(
+                206, headers={"Content-Range": f"bytes {start}-{size - 1}/{size}"}
+            )
+        else:
+            response = _response(200)
+
+        response.headers.update({"Content-Length": str(size - start), "ETag": "abc"})
+
+        def iter_content(chunk_size=1):
+            sent = 0
+            for offset in range(start, size, 1000):
+                if sent >= self.drop_after:
+                    raise requests.exceptions.ChunkedEncodingError("Connection dropped")
+                chunk = self.content[offset : offset + 1000]
+                sent += len(chunk)
+                yield chunk
+
+        response.iter_content = iter_content
+        response._content_consumed = True
+
+        return response
+
+
+def test_stream_download():
+    content = os.urandom(10_000)
+    session = DroppingSession(content, drop_after=4000)
+
+    progress = []
+    f = network.stream_download(
+        "https://example.org/foo.tar.gz", session, progress=progress.append
+    )
+
+    assert f.read() == content
+    assert sum(progress) == len(content)
+
+    # Resumed twice from the bytes received so far
+    assert [request.get("Range") for request in session.requests] == [
+        None,
+        "bytes=4000-",
+        "bytes=8000-",
+    ]
+    assert session.requests[1]["If-Range"] == "abc"
+
+
+def test_stream_download_zipfile():
+    content = _archive()
+    session = DroppingSession(content, drop_after=len(content))
+
+    f = network.stream_download("https://example.org/foo.zip", session)
+
+    # Members of a downloaded archive are opened right from the file
+    assert f.seekable()
+
+    with ZipFile(f) as zip_file:
+        with zip_file.open("produkt_klima_tag_01048.txt") as member:
+            assert member.read() == b"STATIONS_ID;MESS_DATUM"
+
+
+def test_stream_download_changed(monkeypatch):
+    monkeypatch.setattr(network, "STREAM_RESUME_ATTEMPTS", 2)
+
+    # The resource changed, so every attempt starts over and fails the same way
+    session = DroppingSession(os.urandom(10_000), drop_after=4000, validator="changed")
+
+    with pytest.raises(IOError):
+        network.stream_download("https://example.org/foo.tar.gz", session)
+
+    assert len(session.requests) == 3
+
+
+LISTINGS = {
+    "https://example.org/radolan/": """<html><body><pre><a href="../">../</a>
+<a href="bin/">bin/</a>                 03-Jan-2021 09:11                   -
+<a href="DESCRIPTION.pdf">DESCRIPTION.pdf</a>      03-Jan-2021 09:11              197345
+</pre></body></html>""",
+    "https://example.org/radolan/bin/": """<table>
+<tr><th><a href="?C=N;O=D">Name</a></th></tr>
+<tr><td><a href="/radolan/">Parent Directory</a></td><td>-</td></tr>
+<tr><td><a href="raa01-sf_10000-2101031150-dwd---bin.gz">raa01</a></td>
+<td align="right">2021-01-03 11:50  </td><td align="right">1.5K</td></tr>
+</table>""",
+}
+
+
+def test_crawl_remote_files(monkeypatch):
+    monkeypatch.setattr(
+        network,
+        "coalesced_get",
+        lambda url: BytesIO(LISTINGS[url].encode()),
+    )
+
+    files = network.crawl_remote_files("https://example.org/radolan", recursive=True)
+
+    assert files == [
+        network.ListedFile(
+            "https://example.org/radolan/DESCRIPTION.pdf",
+            197345,
+            datetime(2021, 1, 3, 9, 11),
+        ),
+        network.ListedFile(
+            "https://example.org/radolan/bin/raa01-sf_10000-2101031150-dwd---bin.gz",
+            1536,
+            datetime(2021, 1, 3, 11, 50),
+        ),
+    ]
+
+    assert network.list_remote_files("https://example.org/radolan/", False) == [
+        "https://example.org/radolan/DESCRIPTION.pdf"
+    ]
+
+
+def test_file_adapter(tmp_path):
+    (tmp_path / "recent").mkdir()
+    (tmp_path / "recent" / "tageswerte_KL_01048_akt.zip").write_bytes(b"foobar")
+    (tmp_path / "DESCRIPTION.pdf").write_bytes(b"foo")
+
+    url = tmp_path.as_uri()
+
+    files = network.crawl_remote_files(url, recursive=True)
+
+    assert [(file.url, file.size) for file in files] == [
+        (f"{url}/DESCRIPTION.pdf", 3),
+        (f"{url}/recent/tageswerte_KL_01048_akt.zip", 6),
+    ]
+
+    response = network.session.get(f"{url}/recent/tageswerte_KL_01048_akt.zip")
+
+    assert response.content == b"foobar"
+
+    assert network.session.get(f"{url}/missing.zip").status_code == 404
+
+
+class SlowSession:
+    """ Session answering slowly, recording full downloads into a marker file """
+
+    def __init__(self, marker: str):
+        self.marker = marker
+
+    def get(self, url, headers=None):
+        time.sleep(0.5)
+
+        with open(self.marker, "a") as f:
+            f.write("x")
+
+        return _response(200, b"foobar", {"ETag": '"abc"'})
+
+
+def test_coalesced_get(tmp_path):
+    url = "https://opendata.dwd.de/climate_environment/CDC/coalesced.zip"
+    marker = str(tmp_path / "marker")
+
+    session = SlowSession(marker)
+
+    with ThreadPoolExecutor(4) as executor:
+        payloads = list(
+            executor.map(lambda _: network.coalesced_get(url, session), range(4))
+        )
+
+    assert [payload.read() for payload in payloads] == [b"foobar"] * 4
+
+    # Only one of the threads downloaded the resource, the others waited for it
+    with open(marker) as f:
+        assert f.read() == "x"
+
+
+def _coalesced_get(url: str, marker: str, filename: str) -> None:
+    region = make_region().configure(
+        "wetterdienst.filestore", arguments={"filename": filename}
+    )
+
+    payload = region.get_or_create(
+        url, lambda: network.coalesced_get(url, SlowSession(marker))
+    )
+
+    assert payload.read() == b"foobar"
+
+
+def test_coalesced_get_processes(tmp_path):
+    url = "https://opendata.dwd.de/climate_environment/CDC/coalesced.zip"
+    marker = str(tmp_path / "marker")
+    filename = str(tmp_path / "payload.dbm")
+
+    context = multiprocessing.get_context("fork")
+
+    workers = [
+        context.Process(target=_coalesced_get, args=(url, marker, filename))
+        for _ in range(3)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    # The other processes waited on the lock of the entry and read it from the cache
+    with open(marker) as f:
+        assert f.read() == "x"
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO
+from zipfile import ZipFile
+
+import pandas as pd
+import pytest
+from dogpile.cache import make_region
+from dogpile.cache.api import NO_VALUE
+
+from wetterdienst.util.store import (
+    Eviction,
+    FileIndexStore,
+    IndexType,
+    MappedPayload,
+    MemoryTier,
+    PayloadStore,
+)
+
+
+@pytest.mark.parametrize("index_type", IndexType)
+def test_payload_store_roundtrip(tmp_path, index_type):
+    store = PayloadStore(
+        directory=str(tmp_path / "payload"),
+        index_filename=str(tmp_path / f"payload.{index_type.value}"),
+        index_type=index_type,
+    )
+
+    assert store.get("foo") is None
+
+    store.set("foo", b"foobar", {"etag": "abc"})
+
+    payload, metadata = store.get("foo")
+
+    assert isinstance(payload, MappedPayload)
+    assert payload.read(3) == b"foo"
+    assert payload.read() == b"bar"
+    assert payload.getvalue() == b"foobar"
+    assert metadata == {"etag": "abc"}
+
+    # One file per payload, addressed by the hash of its key
+    assert os.path.exists(store.path(store.digest("foo")))
+
+    store.delete("foo")
+
+    assert store.get("foo") is None
+    assert not os.path.exists(store.path(store.digest("foo")))
+
+
+def test_mapped_payload_zipfile(tmp_path):
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("produkt_klima_tag.txt", "STATIONS_ID;MESS_DATUM\n1;2")
+
+    path = tmp_path / "archive.zip"
+    path.write_bytes(buffer.getvalue())
+
+    with ZipFile(MappedPayload(str(path))) as zip_file:
+        assert zip_file.read("produkt_klima_tag.txt") == b"STATIONS_ID;MESS_DATUM\n1;2"
+
+
+def test_file_store_backend(tmp_path):
+    region = make_region().configure(
+        "wetterdienst.filestore",
+        arguments={"filename": str(tmp_path / "payload.dbm")},
+    )
+
+    region.set("bytes", b"foobar")
+    region.set("buffer", BytesIO(b"foobar"))
+    region.set("frame", pd.DataFrame({"a": [1, 2]}))
+
+    assert region.get("bytes") == b"foobar"
+
+    buffer = region.get("buffer")
+    assert isinstance(buffer, MappedPayload)
+    assert buffer.getvalue() == b"foobar"
+
+    pd.testing.assert_frame_equal(region.get("frame"), pd.DataFrame({"a": [1, 2]}))
+
+
+def test_file_store_backend_file(tmp_path):
+    region = make_region().configure(
+        "wetterdienst.filestore",
+        arguments={"filename": str(tmp_path / "payload.dbm")},
+    )
+
+    spool = tempfile.SpooledTemporaryFile(max_size=3)
+    spool.write(b"foobar")
+
+    region.set("file", spool)
+
+    # The file is copied as it is and keeps its position
+    assert spool.tell() == 6
+
+    payload = region.get("file")
+    assert isinstance(payload, MappedPayload)
+    assert payload.getvalue() == b"foobar"
+
+
+def test_payload_store_eviction_lru(tmp_path):
+    store = PayloadStore(
+        directory=str(tmp_path / "payload"),
+        index_filename=str(tmp_path / "payload.dbm"),
+        max_bytes=25,
+    )
+
+    store.set("a", b"0" * 10)
+    store.set("b", b"1" * 10)
+
+    # Use "a", so "b" becomes the least recently used payload
+    store.get("a")
+
+    store.set("c", b"2" * 10)
+
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.get("c") is not None
+    assert store.stored_bytes() == 20
+
+
+@pytest.mark.parametrize("index_type", IndexType)
+def test_payload_store_eviction_lfu(tmp_path, index_type):
+    store = PayloadStore(
+        directory=str(tmp_path / "payload"),
+        index_filename=str(tmp_path / f"payload.{index_type.value}"),
+        max_bytes=25,
+        eviction=Eviction.LFU,
+        index_type=index_type,
+    )
+
+    store.set("a", b"0" * 10)
+    store.set("b", b"1" * 10)
+
+    store.get("a")
+    store.get("a")
+    store.get("b")
+
+    store.set("c", b"2" * 10)
+
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.stored_bytes() == 20
+
+    store.delete("a")
+
+    assert store.stored_bytes() == 10
+
+
+def test_payload_store_lock_files(tmp_path):
+    store = PayloadStore(
+        directory=str(tmp_path / "payload"),
+        index_filename=str(tmp_path / "payload.dbm"),
+        max_bytes=25,
+    )
+
+    def lock_files():
+        return sorted(
+            name
+            for _, _, names in os.walk(tmp_path / "payload")
+            for name in names
+            if name.endswith(".lock")
+        )
+
+    for key in ("a", "b", "c"):
+        mutex = store.get_mutex(key)
+        mutex.acquire()
+        store.set(key, b"0" * 10)
+        mutex.release()
+
+    # Lock files are removed along with evicted and deleted payloads
+    assert len(lock_files()) == 2
+
+    store.delete("c")
+
+    assert len(lock_files()) == 1
+
+    # ... but not while the lock is held
+    mutex = store.get_mutex("b")
+    mutex.acquire()
+    store.delete("b")
+
+    assert len(lock_files()) == 1
+
+    mutex.release()
+
+    # A lock removed while waiting for it is taken on the new lock file
+    mutex = store.get_mutex("b")
+    mutex.acquire()
+
+    waiting = store.get_mutex("b")
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(waiting.acquire()))
+    thread.start()
+    time.sleep(0.1)
+
+    os.unlink(mutex.path)
+    mutex.release()
+    thread.join(timeout=10)
+
+    assert acquired == [True]
+    assert os.fstat(waiting._file.fileno()).st_ino == os.stat(waiting.path).st_ino
+    assert store.get_mutex("b").locked()
+
+    waiting.release()
+
+
+def _regenerate(filename: str, marker: str, index_type: IndexType) -> None:
+    region = make_region().configure(
+        "wetterdienst.filestore",
+        expiration_time=60,
+        arguments={"filename": filename, "index": index_type.value},
+    )
+
+    def create():
+        with open(marker, "a") as f:
+            f.write("x")
+
+        time.sleep(0.5)
+
+        return b"file index"
+
+    assert region.get_or_create("fileindex", create) == b"file index"
+
+
+@pytest.mark.parametrize("index_type", IndexType)
+def test_file_store_backend_single_flight(tmp_path, index_type):
+    filename = str(tmp_path / f"fileindex.{index_type.value}")
+    marker = str(tmp_path / "marker")
+
+    context = multiprocessing.get_context("fork")
+
+    workers = [
+        context.Process(target=_regenerate, args=(filename, marker, index_type))
+        for _ in range(4)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    # Only one of the workers created the value, the others waited for it
+    with open(marker) as f:
+        assert f.read() == "x"
+
+
+def test_memory_tier(tmp_path):
+    region = make_region().configure(
+        "wetterdienst.filestore",
+        arguments={"filename": str(tmp_path / "fileindex.dbm")},
+        wrap=[MemoryTier(max_bytes=5000)],
+    )
+
+    df = pd.DataFrame({"a": range(100)})
+
+    region.set("a", df)
+
+    # Values are held as live objects instead of being unpickled again
+    assert region.get("a") is df
+
+    region.set("b", pd.DataFrame({"a": range(300)}))
+    region.set("c", pd.DataFrame({"a": range(300)}))
+
+    # Least recently used values are dropped from memory, but kept on disk
+    assert region.backend.held_bytes <= 5000
+    assert region.get("a") is not df
+    pd.testing.assert_frame_equal(region.get("a"), df)
+
+    region.delete("a")
+
+    assert region.get("a") is NO_VALUE
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_file_index_store(tmp_path, in_memory):
+    store = FileIndexStore(None if in_memory else str(tmp_path / "fileindex.sqlite"))
+
+    described = []
+
+    def describe(urls):
+        described.extend(urls)
+
+        return pd.DataFrame(
+            {
+                "url": urls,
+                "station_id": [url[:1] for url in urls],
+                "from_date": [url[2:10] for url in urls],
+                "to_date": [url[11:19] for url in urls],
+            }
+        )
+
+    changes = store.update(
+        "listing",
+        [
+            ("1_19900101_19991231", 10, 1.0),
+            ("1_20000101_20091231", 10, 1.0),
+            ("2_20000101_20091231", 10, 1.0),
+        ],
+        describe,
+    )
+
+    assert changes == {"added": 3, "removed": 0, "changed": 0}
+
+    changed = store.changed("listing")
+
+    # Listing again without changes
+    store.update(
+        "listing",
+        [
+            ("1_19900101_19991231", 10, 1.0),
+            ("1_20000101_20091231", 10, 1.0),
+            ("2_20000101_20091231", 10, 1.0),
+        ],
+        describe,
+    )
+
+    assert store.changed("listing") == changed
+
+    described.clear()
+
+    changes = store.update(
+        "listing",
+        [
+            ("1_19900101_19991231", 10, 1.0),
+            ("1_20000101_20091231", 12, 2.0),
+            ("3_20000101_20091231", 10, 1.0),
+        ],
+        describe,
+    )
+
+    # Unchanged files are not described again
+    assert changes == {"added": 1, "removed": 1, "changed": 1}
+    assert sorted(described) == ["1_20000101_20091231", "3_20000101_20091231"]
+    assert store.changed("listing") > changed
+
+    assert store.query("listing")["url"].tolist() == [
+        "1_19900101_19991231",
+        "1_20000101_20091231",
+        "3_20000101_20091231",
+    ]
+    assert store.query("other").empty
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from wetterdienst.util.engine import DOWNLOAD_CONCURRENCY
+from wetterdienst.util.transport import (
+    JitteredRetry,
+    LocalAdapter,
+    RateLimitedAdapter,
+    ReplayAdapter,
+    TokenBucket,
+    create_session,
+)
+
+
+def test_local_adapter(tmp_path):
+    folder = tmp_path / "climate.weather.gc.ca" / "climate_data"
+    folder.mkdir(parents=True)
+
+    (folder / "bulk_data_e.html%3Fformat%3Dcsv%26stationID%3D1").write_text("a,b")
+
+    session = requests.Session()
+    session.mount("https://", LocalAdapter(str(tmp_path)))
+
+    response = session.get(
+        "https://climate.weather.gc.ca/climate_data/bulk_data_e.html"
+        "?format=csv&stationID=1"
+    )
+
+    assert response.status_code == 200
+    assert response.text == "a,b"
+
+    # Folders are answered with a listing
+    response = session.get("https://climate.weather.gc.ca/climate_data/")
+
+    assert "bulk_data_e.html" in response.text
+
+    response = session.get("https://climate.weather.gc.ca/missing.csv")
+
+    assert response.status_code == 404
+
+
+class CountingAdapter(BaseAdapter):
+    """ Adapter standing in for a live server """
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+
+        response = requests.Response()
+        response.url = request.url
+        response.status_code = 200
+        response.headers["ETag"] = '"abc"'
+        response._content = f"response {self.requests}".encode()
+
+        return response
+
+    def close(self):
+        pass
+
+
+def test_replay_adapter(tmp_path):
+    adapter = CountingAdapter()
+
+    url = "https://opendata.dwd.de/climate_environment/CDC/foo.zip"
+
+    recording = requests.Session()
+    recording.mount("https://", ReplayAdapter(str(tmp_path), adapter))
+
+    assert recording.get(url).content == b"response 1"
+
+    replaying = requests.Session()
+    replaying.mount("https://", ReplayAdapter(str(tmp_path)))
+
+    for _ in range(2):
+        response = replaying.get(url)
+
+        assert response.content == b"response 1"
+        assert response.headers["ETag"] == '"abc"'
+
+    assert adapter.requests == 1
+
+    with pytest.raises(requests.ConnectionError):
+        replaying.get(f"{url}.missing")
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=20, burst=2)
+
+    start = time.monotonic()
+
+    for _ in range(4):
+        bucket.acquire()
+
+    # Two requests are sent right away, the others wait for a token each
+    assert time.monotonic() - start >= 0.09
+
+
+def test_jittered_retry():
+    retry = JitteredRetry(total=5, backoff_factor=1).increment().increment()
+
+    backoffs = {retry.get_backoff_time() for _ in range(10)}
+
+    assert all(0 <= backoff <= 2 for backoff in backoffs)
+    assert len(backoffs) > 1
+
+
+def test_create_session():
+    session = create_session(retries=5)
+
+    adapter = session.get_adapter("https://opendata.dwd.de/")
+
+    assert isinstance(adapter, RateLimitedAdapter)
+    assert isinstance(adapter.max_retries, JitteredRetry)
+    assert adapter.max_retries.total == 5
+    assert 503 in adapter.max_retries.status_forcelist
+    assert adapter._pool_maxsize == DOWNLOAD_CONCURRENCY
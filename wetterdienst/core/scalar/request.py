@@ -26,6 +26,7 @@ from wetterdienst.metadata.provider import Provider
 from wetterdienst.metadata.resolution import Frequency, Resolution, ResolutionType
 from wetterdienst.util.enumeration import parse_enumeration_from_template
 from wetterdienst.util.geo import Coordinates, derive_nearest_neighbours
+from wetterdienst.util.instrumentation import record_network
 
 log = logging.getLogger(__name__)
 
@@ -561,7 +562,8 @@ class ScalarRequestCore(Core):
 
         :return: pandas.DataFrame with the information of different available stations
         """
-        df = self._all()
+        with record_network() as network:
+            df = self._all()
 
         df = df.reindex(columns=self._base_columns)
 
@@ -578,7 +580,7 @@ class ScalarRequestCore(Core):
         #         df[Columns.TO_DATE.value] >= self.end_date
         #     ]
 
-        result = StationsResult(self, df.copy().reset_index(drop=True))
+        result = StationsResult(self, df.copy().reset_index(drop=True), network=network)
 
         return result
 
@@ -589,7 +591,8 @@ class ScalarRequestCore(Core):
         :param station_id: list of stations that are requested
         :return: df with filtered stations
         """
-        df = self.all().df
+        stations = self.all()
+        df = stations.df
 
         station_id = self._parse_station_id(pd.Series(station_id))
 
@@ -597,7 +600,7 @@ class ScalarRequestCore(Core):
 
         df = df[df[Columns.STATION_ID.value].isin(station_id)]
 
-        result = StationsResult(self, df)
+        result = StationsResult(self, df, network=stations.network)
 
         return result
 
@@ -622,7 +625,8 @@ class ScalarRequestCore(Core):
         if threshold < 0:
             raise ValueError("threshold must be ge 0")
 
-        df = self.all().df
+        stations = self.all()
+        df = stations.df
 
         station_match = extract_fun(
             query=name,
@@ -642,7 +646,7 @@ class ScalarRequestCore(Core):
         else:
             df = pd.DataFrame().reindex(columns=df.columns)
 
-        result = StationsResult(stations=self, df=df)
+        result = StationsResult(stations=self, df=df, network=stations.network)
 
         return result
 
@@ -668,7 +672,8 @@ class ScalarRequestCore(Core):
 
         coords = Coordinates(np.array(latitude), np.array(longitude))
 
-        df = self.all().df.reset_index(drop=True)
+        stations = self.all()
+        df = stations.df.reset_index(drop=True)
 
         distances, indices_nearest_neighbours = derive_nearest_neighbours(
             df[Columns.LATITUDE.value].values,
@@ -699,7 +704,9 @@ class ScalarRequestCore(Core):
                 f"{latitude}°N and {longitude}°E and number {rank}"
             )
 
-        result = StationsResult(self, df.reset_index(drop=True))
+        result = StationsResult(
+            self, df.reset_index(drop=True), network=stations.network
+        )
 
         return result
 
@@ -727,9 +734,10 @@ class ScalarRequestCore(Core):
         distance_in_km = guess(distance, unit, [Distance]).km
 
         # TODO: replace the repeating call to self.all()
-        all_nearby_stations = self.filter_by_rank(
+        nearby_stations = self.filter_by_rank(
             latitude, longitude, self.all().df.shape[0]
-        ).df
+        )
+        all_nearby_stations = nearby_stations.df
 
         df = all_nearby_stations[
             all_nearby_stations[Columns.DISTANCE.value] <= distance_in_km
@@ -741,7 +749,11 @@ class ScalarRequestCore(Core):
                 f"{latitude}°N and {longitude}°E and distance {distance_in_km}km"
             )
 
-        result = StationsResult(stations=self, df=df.reset_index(drop=True))
+        result = StationsResult(
+            stations=self,
+            df=df.reset_index(drop=True),
+            network=nearby_stations.network,
+        )
 
         return result
 
@@ -768,14 +780,17 @@ class ScalarRequestCore(Core):
         lat_interval = pd.Interval(bottom, top, closed="both")
         lon_interval = pd.Interval(left, right, closed="both")
 
-        df = self.all().df
+        stations = self.all()
+        df = stations.df
 
         df = df[
             df[Columns.LATITUDE.value].apply(lambda x: x in lat_interval)
             & df[Columns.LONGITUDE.value].apply(lambda x: x in lon_interval)
         ]
 
-        result = StationsResult(stations=self, df=df.reset_index(drop=True))
+        result = StationsResult(
+            stations=self, df=df.reset_index(drop=True), network=stations.network
+        )
 
         return result
 
@@ -787,15 +802,17 @@ class ScalarRequestCore(Core):
         """
         import duckdb
 
-        df = self.all().df
+        stations = self.all()
 
-        df = duckdb.query_df(df, "data", sql).df()
+        df = duckdb.query_df(stations.df, "data", sql).df()
 
         df[Columns.FROM_DATE.value] = df[Columns.FROM_DATE.value].dt.tz_localize(
             self.tz
         )
         df[Columns.TO_DATE.value] = df[Columns.TO_DATE.value].dt.tz_localize(self.tz)
 
-        result = StationsResult(stations=self, df=df.reset_index(drop=True))
+        result = StationsResult(
+            stations=self, df=df.reset_index(drop=True), network=stations.network
+        )
 
         return result
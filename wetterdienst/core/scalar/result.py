@@ -3,7 +3,7 @@
 # Distributed under the MIT License. See LICENSE for more info.
 from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 import pandas as pd
 
@@ -12,6 +12,7 @@ from wetterdienst.core.scalar.export import ExportMixin
 from wetterdienst.metadata.columns import Columns
 from wetterdienst.metadata.period import Period
 from wetterdienst.metadata.resolution import Frequency, Resolution
+from wetterdienst.util.instrumentation import NetworkReport
 
 if TYPE_CHECKING:
     from wetterdienst.core.scalar.request import ScalarRequestCore
@@ -24,11 +25,14 @@ class StationsResult(ExportMixin):
         self,
         stations: Union["ScalarRequestCore", "DwdMosmixRequest"],
         df: pd.DataFrame,
+        network: Optional[NetworkReport] = None,
         **kwargs
     ) -> None:
         # TODO: add more attributes from ScalarStations class
         self.stations = stations
         self.df = df
+        # Network access while the stations were acquired
+        self.network = network
         self._kwargs = kwargs
 
     def __eq__(self, other):
@@ -141,6 +145,8 @@ class ValuesResult(ExportMixin):
 
     stations: StationsResult
     df: pd.DataFrame
+    # Network access while the values were acquired
+    network: Optional[NetworkReport] = None
 
     def to_ogc_feature_collection(self):
         raise NotImplementedError()
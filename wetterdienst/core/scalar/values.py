@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
+import contextvars
 import logging
 import operator
+import os
 from abc import abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Dict, Generator, List, Tuple, Union
+from itertools import islice
+from typing import Dict, Generator, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -19,10 +24,14 @@ from wetterdienst.metadata.resolution import Resolution
 from wetterdienst.metadata.timezone import Timezone
 from wetterdienst.metadata.unit import REGISTRY, MetricUnit, OriginUnit
 from wetterdienst.util.enumeration import parse_enumeration_from_template
+from wetterdienst.util.instrumentation import NetworkReport, record_network
 from wetterdienst.util.logging import TqdmToLogger
 
 log = logging.getLogger(__name__)
 
+# Number of stations collected ahead of the one being processed
+PREFETCH_DEPTH = int(os.environ.get("WD_PREFETCH_DEPTH", 2))
+
 
 class ScalarValuesCore:
     """ Core for sources of point data where data is related to a station """
@@ -429,27 +438,116 @@ class ScalarValuesCore:
 
         return df
 
-    def query(self) -> Generator[ValuesResult, None, None]:
+    def _collect_station_data(self, station_id: str) -> List[Tuple[Enum, pd.DataFrame]]:
+        """
+        Collect the data of all parameters of a station, the I/O bound stage of
+        query.
+
+        :param station_id: station id for which the data is collected
+        :return: list of parameters with their collected DataFrame
+        """
+        return [
+            (parameter, self._collect_station_parameter(station_id, parameter))
+            for parameter in self.stations.parameter
+        ]
+
+    def _collect_station_recorded(
+        self, station_id: str
+    ) -> Tuple[List[Tuple[Enum, pd.DataFrame]], NetworkReport]:
+        """
+        Collect the data of a station, recording its network access.
+
+        :param station_id: station id for which the data is collected
+        :return: data of the parameters and report of the network access
+        """
+        with record_network() as network:
+            return self._collect_station_data(station_id), network
+
+    def _collect_stations(
+        self, prefetch: int
+    ) -> Generator[
+        Tuple[str, List[Tuple[Enum, pd.DataFrame]], NetworkReport], None, None
+    ]:
+        """
+        Collect the data of all stations in order, while the data of up to prefetch
+        following stations is already collected in the background.
+
+        :param prefetch: number of stations collected ahead, 0 to collect each
+        station only when it is processed
+        :return: station ids with the data of their parameters and the network access
+        """
+        if prefetch < 1:
+            for station_id in self.stations.station_id:
+                yield (station_id, *self._collect_station_recorded(station_id))
+
+            return
+
+        def submit(station_id: str):
+            # Network access of prefetching threads counts towards the caller
+            return executor.submit(
+                contextvars.copy_context().run,
+                self._collect_station_recorded,
+                station_id,
+            )
+
+        station_ids = iter(self.stations.station_id)
+
+        executor = ThreadPoolExecutor(
+            max_workers=prefetch + 1, thread_name_prefix="wetterdienst-prefetch"
+        )
+
+        pending = deque(
+            (station_id, submit(station_id))
+            for station_id in islice(station_ids, prefetch + 1)
+        )
+
+        try:
+            while pending:
+                station_id, future = pending.popleft()
+
+                station_data, network = future.result()
+
+                # Keep the pipeline filled while the current station is processed
+                for next_station_id in islice(station_ids, 1):
+                    pending.append((next_station_id, submit(next_station_id)))
+
+                yield station_id, station_data, network
+        finally:
+            # Stop collecting when the consumer stops early or collecting fails
+            for _, future in pending:
+                future.cancel()
+
+            executor.shutdown(wait=False)
+
+    def query(
+        self, prefetch: Optional[int] = None
+    ) -> Generator[ValuesResult, None, None]:
         """
         Core method for data collection, iterating of station ids and yielding a
         DataFrame for each station with all found parameters. Takes care of type
         coercion of data, date filtering and humanizing of parameters.
 
+        Data of the following stations is downloaded and parsed in the background
+        while a station is processed, results are still yielded in order of stations.
+
+        :param prefetch: number of stations collected ahead, defaults to
+        WD_PREFETCH_DEPTH or 2, 0 disables prefetching
         :return:
         """
-        for station_id in self.stations.station_id:
+        if prefetch is None:
+            prefetch = PREFETCH_DEPTH
+
+        for station_id, collected, network in self._collect_stations(prefetch):
             # TODO: add method to return empty result with correct response string e.g.
             #  station id not available
             station_data = []
 
-            for parameter in self.stations.parameter:
+            for parameter, parameter_df in collected:
                 # TODO: remove doubling of parameter, here parameter is (parameter,
                 #  dataset),
                 #  while parameter_ is only the parameter
                 parameter_, dataset = parameter
 
-                parameter_df = self._collect_station_parameter(station_id, parameter)
-
                 if parameter_df.empty:
                     continue
 
@@ -506,7 +604,7 @@ class ScalarValuesCore:
                 continue
 
             # TODO: add more meaningful metadata here
-            yield ValuesResult(stations=self.stations, df=station_df)
+            yield ValuesResult(stations=self.stations, df=station_df, network=network)
 
     @abstractmethod
     def _collect_station_parameter(self, station_id: str, parameter) -> pd.DataFrame:
@@ -716,10 +814,11 @@ class ScalarValuesCore:
 
         tqdm_out = TqdmToLogger(log, level=logging.INFO)
 
-        for result in tqdm(
-            self.query(), total=len(self.stations.station_id), file=tqdm_out
-        ):
-            data.append(result.df)
+        with record_network() as network:
+            for result in tqdm(
+                self.query(), total=len(self.stations.station_id), file=tqdm_out
+            ):
+                data.append(result.df)
 
         if not data:
             raise ValueError("No data available for given constraints")
@@ -729,7 +828,7 @@ class ScalarValuesCore:
         # Have to reapply category dtype after concatenation
         df = self._coerce_meta_fields(df)
 
-        return ValuesResult(stations=self.stations, df=df)
+        return ValuesResult(stations=self.stations, df=df, network=network)
 
     def _humanize(self, df: pd.DataFrame) -> pd.DataFrame:
         """
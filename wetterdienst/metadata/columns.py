@@ -29,6 +29,9 @@ class Columns(Enum):
     PARAMETER = "parameter"
     DATASET = "dataset"
     VALUE = "value"
+    # Columns of the catalog of observations
+    RESOLUTION = "resolution"
+    PERIOD = "period"
     # Columns for quality
     QUALITY = "quality"
     # QUALITY_TERTIARY = "quality_tertiary"  # for later
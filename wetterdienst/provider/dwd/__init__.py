@@ -1,3 +1,5 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
+# Register the cache TTL policy of the DWD
+from wetterdienst.provider.dwd import cache  # noqa: F401
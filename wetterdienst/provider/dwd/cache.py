@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.provider.dwd.radar.metadata.parameter import DwdRadarParameter
+from wetterdienst.util.cache import register_ttl_policy
+
+# Months within which the DWD publishes the yearly update of historical data,
+# the first month after is when cached historical data becomes stable again.
+HISTORICAL_RELEASE_MONTHS = range(1, 6)
+HISTORICAL_RELEASE_TTL = 60 * 60 * 24
+
+# Resolutions of datasets whose historical period grows by a new archive every
+# month, so their historical data is refreshed daily all year round
+MONTHLY_ARCHIVE_DATASETS = {
+    DwdRadarParameter.RADOLAN_CDC: {Resolution.DAILY, Resolution.HOURLY},
+}
+MONTHLY_ARCHIVE_TTL = 60 * 60 * 24
+
+RECENT_TTL = 60 * 60
+NOW_TTL = 60 * 5
+
+
+def _historical_ttl(now: datetime) -> int:
+    """
+    TTL of historical data. Within the release window data is refreshed daily,
+    afterwards everything fetched since the end of the window stays valid until
+    the next window starts.
+
+    :param now: current datetime (UTC)
+    :return: TTL in seconds
+    """
+    if now.month in HISTORICAL_RELEASE_MONTHS:
+        return HISTORICAL_RELEASE_TTL
+
+    release_end = datetime(now.year, HISTORICAL_RELEASE_MONTHS.stop, 1)
+
+    return max(int((now - release_end).total_seconds()), HISTORICAL_RELEASE_TTL)
+
+
+@register_ttl_policy(Provider.DWD)
+def dwd_ttl_policy(
+    dataset: Optional[Enum] = None,
+    resolution: Optional[Resolution] = None,
+    period: Optional[Enum] = None,
+) -> Optional[int]:
+    """
+    TTL policy for DWD data, which mostly depends on the period of the data.
+    Historical data of datasets growing by a monthly archive is refreshed daily.
+
+    :param dataset: dataset of the data
+    :param resolution: resolution of the data
+    :param period: period of the data
+    :return: TTL in seconds, None for the default of the cache region
+    """
+    if not period:
+        return None
+
+    period = Period(period.value)
+
+    if period == Period.HISTORICAL:
+        monthly_resolutions = MONTHLY_ARCHIVE_DATASETS.get(dataset, ())
+
+        if resolution and Resolution(resolution.value) in monthly_resolutions:
+            return MONTHLY_ARCHIVE_TTL
+
+        return _historical_ttl(datetime.utcnow())
+    elif period == Period.RECENT:
+        return RECENT_TTL
+    elif period == Period.NOW:
+        return NOW_TTL
+
+    return None
@@ -17,6 +17,7 @@ from tqdm import tqdm
 
 from wetterdienst.provider.dwd.network import create_dwd_session
 from wetterdienst.util.logging import TqdmToLogger
+from wetterdienst.util.network import stream_download
 
 log = logging.getLogger(__name__)
 
@@ -39,37 +40,26 @@ class KMLReader:
     def download(self, url: str):
         # https://stackoverflow.com/questions/37573483/progress-bar-while-download-file-over-http-with-requests  # noqa:E501,B950
 
-        response = self.dwd_session.get(url, stream=True)
-        response.raise_for_status()
-
-        total = int(response.headers.get("content-length", 0))
-
-        buffer = BytesIO()
-
         tqdm_out = TqdmToLogger(log, level=logging.INFO)
 
+        # Large files like MOSMIX-S are downloaded to disk and resumed if interrupted
         with tqdm(
             desc=url,
-            total=total,
             unit="iB",
             unit_scale=True,
             unit_divisor=1024,
             file=tqdm_out,
         ) as bar:
-            for data in response.iter_content(chunk_size=1024):
-                size = buffer.write(data)
-                bar.update(size)
-
-        return buffer
+            return stream_download(url, self.dwd_session, progress=bar.update)
 
     def fetch(self, url) -> bytes:
         """
         Fetch weather forecast file (zipped xml).
         """
-        buffer = self.download(url)
-        kmz = ZipFile(buffer, "r")
-        kml = kmz.open(kmz.namelist()[0], "r").read()
-        return kml
+        # The downloaded file is removed from disk once it is closed
+        with self.download(url) as buffer, ZipFile(buffer, "r") as kmz:
+            with kmz.open(kmz.namelist()[0], "r") as kml_file:
+                return kml_file.read()
 
     def read(self, url: str):
         """
@@ -10,7 +10,6 @@ from urllib.parse import urljoin
 
 import numpy as np
 import pandas as pd
-import requests
 from requests import HTTPError
 
 from wetterdienst.core.scalar.request import ScalarRequestCore
@@ -42,6 +41,7 @@ from wetterdienst.provider.dwd.metadata.constants import (
     DWD_SERVER,
 )
 from wetterdienst.provider.dwd.metadata.datetime import DatetimeFormat
+from wetterdienst.provider.dwd.network import create_dwd_session
 from wetterdienst.util.cache import metaindex_cache
 from wetterdienst.util.enumeration import parse_enumeration_from_template
 from wetterdienst.util.geo import convert_dm_to_dd
@@ -524,7 +524,7 @@ class DwdMosmixRequest(ScalarRequestCore):
         :return:
         """
         # TODO: Cache payload with FSSPEC
-        payload = requests.get(self._url, headers={"User-Agent": ""})
+        payload = create_dwd_session().get(self._url, headers={"User-Agent": ""})
 
         df = pd.read_fwf(
             StringIO(payload.text),
@@ -16,6 +16,7 @@ from wetterdienst.provider.dwd.metadata.constants import (
 )
 from wetterdienst.provider.dwd.observation.metadata.dataset import DwdObservationDataset
 from wetterdienst.util.cache import (
+    file_index_store,
     fileindex_cache_five_minutes,
     fileindex_cache_one_hour,
 )
@@ -39,9 +40,7 @@ def _create_file_index_for_dwd_server(
     Returns:
         file index in a pandas.DataFrame with sets of parameters and station id
     """
-    parameter_path = build_path_to_parameter(dataset, resolution, period)
-
-    url = reduce(urljoin, [DWD_SERVER, DWD_CDC_PATH, cdc_base.value, parameter_path])
+    url = build_url_to_parameter(dataset, resolution, period, cdc_base)
 
     files_server = list_remote_files(url, recursive=True)
 
@@ -56,6 +55,29 @@ def reset_file_index_cache() -> None:
     """ Function to reset the cached file index for all kinds of parameters """
     fileindex_cache_five_minutes.invalidate()
     fileindex_cache_one_hour.invalidate()
+    file_index_store.clear()
+
+
+def build_url_to_parameter(
+    dataset: DwdObservationDataset,
+    resolution: Resolution,
+    period: Period,
+    cdc_base: DWDCDCBase,
+) -> str:
+    """
+    Function to build the url of the folder holding the files of a dataset
+    Args:
+        dataset: dwd dataset enumeration
+        resolution: time resolution of TimeResolution enumeration
+        period: period type of PeriodType enumeration
+        cdc_base: base path e.g. climate_observations/germany
+
+    Returns:
+        url of the folder on the DWD server
+    """
+    parameter_path = build_path_to_parameter(dataset, resolution, period)
+
+    return reduce(urljoin, [DWD_SERVER, DWD_CDC_PATH, cdc_base.value, parameter_path])
 
 
 def build_path_to_parameter(
@@ -1,9 +1,20 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
+import os
 from enum import Enum
+from urllib.parse import urlparse
 
-DWD_SERVER = "https://opendata.dwd.de"
+# The DWD open data server
+DWD_REMOTE_SERVER = "https://opendata.dwd.de"
+
+# Root all data is read from, either the DWD server or a local mirror of it given
+# as file:// url
+DWD_SERVER = os.environ.get("WD_DWD_SERVER", DWD_REMOTE_SERVER)
+
+# Paths are joined to the root, so keep the last folder of it
+if urlparse(DWD_SERVER).path and not DWD_SERVER.endswith("/"):
+    DWD_SERVER += "/"
 DWD_CDC_PATH = "climate_environment/CDC/"
 
 DWD_MOSMIX_S_PATH = "weather/local_forecasts/mos/MOSMIX_S/all_stations/kml/"
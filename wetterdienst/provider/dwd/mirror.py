@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+"""
+Local mirror of the DWD server. Subtrees of the server are synchronized
+incrementally into a local directory with one folder per host, the layout of the
+local transport. The mirror then can be used as root of all data with e.g.
+``WD_DWD_SERVER=file:///data/dwd/opendata.dwd.de/`` or as a whole with
+``WD_TRANSPORT=local WD_TRANSPORT_ROOT=/data/dwd``.
+"""
+import calendar
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from wetterdienst.provider.dwd.metadata.constants import (
+    DWD_CDC_PATH,
+    DWD_REMOTE_SERVER,
+    DWDCDCBase,
+)
+from wetterdienst.provider.dwd.network import create_dwd_session
+from wetterdienst.util.engine import download_engine
+from wetterdienst.util.network import ListedFile, crawl_remote_files
+from wetterdienst.util.transport import url_to_path
+
+log = logging.getLogger(__name__)
+
+# Shortcuts for commonly mirrored subtrees
+MIRROR_PRESETS = {
+    "observations": f"{DWD_CDC_PATH}{DWDCDCBase.CLIMATE_OBSERVATIONS.value}",
+    "mosmix": "weather/local_forecasts/mos/",
+    "radolan": f"{DWD_CDC_PATH}grids_germany/",
+    "radar": "weather/radar/",
+}
+
+# Chunks in which files are written to disk
+CHUNK_SIZE = 1024 * 1024
+
+
+def _modified_timestamp(file: ListedFile) -> Optional[int]:
+    """ Modification time of a listed file as timestamp, listings are in UTC """
+    if file.modified is None:
+        return None
+
+    return calendar.timegm(file.modified.timetuple())
+
+
+def _is_current(path: str, file: ListedFile) -> bool:
+    """ Whether the mirrored file has the size and modification time of the listing """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    return (
+        file.size is not None
+        and stat.st_size == file.size
+        and int(stat.st_mtime) == _modified_timestamp(file)
+    )
+
+
+def _mirror_file(task: Tuple[ListedFile, str]) -> Optional[int]:
+    """
+    Download a file into the mirror, replacing the mirrored file only once it is
+    complete.
+
+    :return: number of downloaded bytes, None if the download failed
+    """
+    file, path = task
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    partial_path = f"{path}.part"
+
+    try:
+        response = create_dwd_session().get(file.url, stream=True)
+        response.raise_for_status()
+
+        size = 0
+        with open(partial_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                size += f.write(chunk)
+    except Exception as e:
+        log.warning(f"Mirroring {file.url} failed: {e}")
+
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+        return None
+
+    os.replace(partial_path, path)
+
+    modified = _modified_timestamp(file)
+    if modified is not None:
+        os.utime(path, (modified, modified))
+
+    return size
+
+
+def mirror(
+    target: str, paths: List[str], server: str = DWD_REMOTE_SERVER
+) -> Dict[str, int]:
+    """
+    Synchronize subtrees of the DWD server into a local directory. Only files whose
+    size or modification time differ from the listing of the server are
+    downloaded, so repeated runs only transfer changed files.
+
+    :param target: directory of the mirror, with one folder per host
+    :param paths: subtrees relative to the server or names of MIRROR_PRESETS
+    :param server: server to be mirrored
+    :return: number of listed, downloaded and failed files and downloaded bytes
+    """
+    if not server.endswith("/"):
+        server += "/"
+
+    tasks = []
+    listed = 0
+    for path in paths:
+        path = MIRROR_PRESETS.get(path, path).strip("/") + "/"
+
+        log.info(f"Listing {path} of {server}")
+
+        for file in crawl_remote_files(urljoin(server, path), recursive=True):
+            listed += 1
+
+            local_path = url_to_path(target, file.url)
+
+            if not _is_current(local_path, file):
+                tasks.append((file, local_path))
+
+    log.info(f"Mirroring {len(tasks)} of {listed} files to {target}")
+
+    sizes = download_engine.map(_mirror_file, tasks)
+
+    return {
+        "files": listed,
+        "downloaded": sum(size is not None for size in sizes),
+        "failed": sum(size is None for size in sizes),
+        "bytes": sum(size for size in sizes if size is not None),
+    }
@@ -2,20 +2,32 @@
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
 import logging
+import os
 from functools import lru_cache
 from io import BytesIO
+from typing import IO, Dict
 
 import requests
-from requests.adapters import HTTPAdapter
 
-from wetterdienst.provider.dwd.metadata.constants import DWD_SERVER
+from wetterdienst.util.network import (
+    RemoteFile,
+    coalesced_get,
+    revalidate,
+    stream_download,
+)
+from wetterdienst.util.transport import create_session
 
 logger = logging.getLogger(__name__)
 
+# Read single members of archives with HTTP Range requests instead of downloading
+# the whole archive
+RANGE_REQUESTS = "WD_RANGE_REQUESTS" in os.environ
+
 
 def download_file_from_dwd(url: str) -> BytesIO:
     """
-    A function used to download a specified file from the server.
+    A function used to download a specified file from the server. Concurrent
+    downloads of the same file are coalesced into one request.
 
     :param url:     The url to the file on the dwd server
 
@@ -24,13 +36,57 @@ def download_file_from_dwd(url: str) -> BytesIO:
     dwd_session = create_dwd_session()
 
     logger.info(f"Downloading resource {url}")
-    r = dwd_session.get(url)
-    r.raise_for_status()
 
-    return BytesIO(r.content)
+    return coalesced_get(url, dwd_session)
+
+
+def revalidate_file_from_dwd(url: str, validators: Dict[str, str]) -> bool:
+    """
+    A function used to check whether a file downloaded before is unchanged on the
+    server, by a conditional request with the validators of the download.
+
+    :param url:         The url to the file on the dwd server
+    :param validators:  ETag and/or Last-Modified of the downloaded file
+
+    :return:            True if the file is unchanged.
+    """
+    dwd_session = create_dwd_session()
+
+    logger.info(f"Revalidating resource {url}")
+
+    return revalidate(url, validators, dwd_session)
+
+
+def stream_file_from_dwd(url: str) -> IO[bytes]:
+    """
+    A function used to download a large file from the server in chunks, which is
+    written to disk and resumed if the connection drops.
+
+    :param url:     The url to the file on the dwd server
+
+    :return:        File object of the file.
+    """
+    dwd_session = create_dwd_session()
+
+    logger.info(f"Streaming resource {url}")
 
+    return stream_download(url, dwd_session)
 
-MAX_RETRIES = 3
+
+def open_file_from_dwd(url: str) -> RemoteFile:
+    """
+    A function used to open a specified file on the server without downloading it,
+    only the byte ranges being read are requested.
+
+    :param url:     The url to the file on the dwd server
+
+    :return:        Seekable file object of the remote file.
+    """
+    dwd_session = create_dwd_session()
+
+    logger.info(f"Opening resource {url}")
+
+    return RemoteFile(url, dwd_session)
 
 
 @lru_cache(maxsize=None)
@@ -42,8 +98,5 @@ def create_dwd_session() -> requests.Session:
     Returns:
         requests.Session object that then can be used for requests to the server
     """
-    dwd_session = requests.Session()
-
-    dwd_session.mount(DWD_SERVER, HTTPAdapter(max_retries=MAX_RETRIES))
-
-    return dwd_session
+    # Pooling, retries and rate limits follow the transport policy
+    return create_session()
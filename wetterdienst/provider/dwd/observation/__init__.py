@@ -5,6 +5,7 @@ from wetterdienst.provider.dwd.observation.api import (
     DwdObservationRequest,
     DwdObservationValues,
 )
+from wetterdienst.provider.dwd.observation.catalog import DwdObservationCatalog
 from wetterdienst.provider.dwd.observation.metadata.dataset import DwdObservationDataset
 from wetterdienst.provider.dwd.observation.metadata.parameter import (
     DwdObservationParameter,
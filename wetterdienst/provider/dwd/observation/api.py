@@ -21,12 +21,13 @@ from wetterdienst.provider.dwd.index import _create_file_index_for_dwd_server
 from wetterdienst.provider.dwd.metadata.column_names import DwdColumns
 from wetterdienst.provider.dwd.metadata.constants import DWDCDCBase
 from wetterdienst.provider.dwd.metadata.datetime import DatetimeFormat
+from wetterdienst.provider.dwd.observation.catalog import DwdObservationCatalog
 from wetterdienst.provider.dwd.observation.download import (
     download_climate_observations_data_parallel,
 )
 from wetterdienst.provider.dwd.observation.fileindex import (
-    create_file_index_for_climate_observations,
     create_file_list_for_climate_observations,
+    load_file_index_for_climate_observations,
 )
 from wetterdienst.provider.dwd.observation.metadata import (
     DwdObservationDataset,
@@ -51,9 +52,6 @@ from wetterdienst.provider.dwd.observation.metadata.unit import (
     DwdObservationUnitOrigin,
     DwdObservationUnitSI,
 )
-from wetterdienst.provider.dwd.observation.metaindex import (
-    create_meta_index_for_climate_observations,
-)
 from wetterdienst.provider.dwd.observation.parser import parse_climate_observations_data
 from wetterdienst.provider.dwd.observation.util.parameter import (
     check_dwd_observations_dataset,
@@ -179,13 +177,6 @@ class DwdObservationValues(ScalarValuesCore):
             )
 
             if len(remote_files) == 0:
-                parameter_identifier = build_parameter_set_identifier(
-                    dataset,
-                    self.stations.resolution,
-                    period,
-                    station_id,
-                    date_range,
-                )
                 log.info(
                     f"No files found for {parameter_identifier}. Station will be skipped."
                 )
@@ -193,7 +184,7 @@ class DwdObservationValues(ScalarValuesCore):
 
             # TODO: replace with FSSPEC caching
             filenames_and_files = download_climate_observations_data_parallel(
-                remote_files
+                remote_files, dataset, self.stations.resolution, period
             )
 
             period_df = parse_climate_observations_data(
@@ -351,19 +342,12 @@ class DwdObservationValues(ScalarValuesCore):
         :param dataset:
         :return:
         """
-        file_index = create_file_index_for_climate_observations(
+        file_index = load_file_index_for_climate_observations(
             dataset, self.stations.resolution, Period.HISTORICAL
         )
 
         # Filter for from date and end date
-        file_index_filtered = file_index[
-            (file_index[Columns.STATION_ID.value] == station_id)
-            & file_index[Columns.INTERVAL.value].array.overlaps(
-                self.stations.stations._interval
-            )
-        ]
-
-        return file_index_filtered[Columns.DATE_RANGE.value].tolist()
+        return file_index.date_ranges(station_id, self.stations.stations._interval)
 
 
 class DwdObservationRequest(ScalarRequestCore):
@@ -586,48 +570,22 @@ class DwdObservationRequest(ScalarRequestCore):
 
         :return:
         """
-        datasets = pd.Series(self.parameter).map(lambda x: x[1]).unique()
+        datasets = pd.Series(self.parameter).map(lambda x: x[1]).unique().tolist()
 
-        stations_df = pd.DataFrame()
+        # First "now" period as it has more updated end date up to the last "now"
+        # values
+        periods = list(reversed(self.period))
 
         for dataset in datasets:
-            # First "now" period as it has more updated end date up to the last "now"
-            # values
-            for period in reversed(self.period):
+            for period in periods:
                 if not check_dwd_observations_dataset(dataset, self.resolution, period):
                     log.warning(
                         f"The combination of {dataset.value}, "
                         f"{self.resolution.value}, {period.value} is invalid."
                     )
 
-                    continue
-
-                df = create_meta_index_for_climate_observations(
-                    dataset, self.resolution, period
-                )
-
-                file_index = create_file_index_for_climate_observations(
-                    dataset, self.resolution, period
-                )
-
-                df = df[
-                    df.loc[:, Columns.STATION_ID.value].isin(
-                        file_index[Columns.STATION_ID.value]
-                    )
-                ]
-
-                if not stations_df.empty:
-                    df = df[
-                        ~df[Columns.STATION_ID.value].isin(
-                            stations_df[Columns.STATION_ID.value]
-                        )
-                    ]
-
-                stations_df = stations_df.append(df)
-
-        if not stations_df.empty:
-            stations_df = stations_df.sort_values(
-                [Columns.STATION_ID.value], key=lambda x: x.astype(int)
-            )
+        catalog = DwdObservationCatalog.build(
+            datasets=datasets, resolutions=[self.resolution], periods=periods
+        )
 
-        return stations_df
+        return catalog.stations(self.resolution, datasets, periods)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+"""
+Catalog of DWD observations, mapping every station, dataset, resolution and period
+to the files of the station along with its date coverage and geometry.
+
+The catalog is assembled from one entry per combination of dataset, resolution and
+period, which joins the meta index with the file index. The indexes of all
+combinations are built concurrently. Entries are kept in the meta index cache,
+one per combination, which is rebuilt in place once the listing of its files
+changes, so station discovery and coverage questions are answered from the
+catalog instead of listing and parsing the server again.
+"""
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+
+from wetterdienst.metadata.columns import Columns
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.provider.dwd.metadata.column_names import DwdColumns
+from wetterdienst.provider.dwd.observation.fileindex import (
+    load_file_index_for_climate_observations,
+)
+from wetterdienst.provider.dwd.observation.metadata.dataset import (
+    RESOLUTION_DATASET_MAPPING,
+    DwdObservationDataset,
+)
+from wetterdienst.provider.dwd.observation.metadata.period import DwdObservationPeriod
+from wetterdienst.provider.dwd.observation.metadata.resolution import (
+    DwdObservationResolution,
+)
+from wetterdienst.provider.dwd.observation.metaindex import (
+    METADATA_COLUMNS,
+    create_meta_index_for_climate_observations,
+)
+from wetterdienst.util.cache import metaindex_cache
+from wetterdienst.util.engine import DOWNLOAD_CONCURRENCY
+from wetterdienst.util.enumeration import parse_enumeration_from_template
+
+log = logging.getLogger(__name__)
+
+Combination = Tuple[DwdObservationDataset, Resolution, Period]
+
+# Columns identifying an entry of the catalog, in order of its index
+CATALOG_INDEX = [
+    Columns.RESOLUTION.value,
+    Columns.DATASET.value,
+    Columns.PERIOD.value,
+    Columns.STATION_ID.value,
+]
+
+CATALOG_FILES = "files"
+
+
+def select_combinations(
+    datasets: Optional[List[Union[str, DwdObservationDataset]]] = None,
+    resolutions: Optional[List[Union[str, Resolution]]] = None,
+    periods: Optional[List[Union[str, Period]]] = None,
+) -> List[Combination]:
+    """
+    Valid combinations of dataset, resolution and period matching the selectors,
+    where no selector means all.
+
+    :param datasets: datasets, all if not given
+    :param resolutions: resolutions, all if not given
+    :param periods: periods, all if not given
+    :return: combinations of dataset, resolution and period
+    """
+    if datasets:
+        datasets = [
+            parse_enumeration_from_template(dataset, DwdObservationDataset)
+            for dataset in datasets
+        ]
+    if resolutions:
+        resolutions = [
+            parse_enumeration_from_template(
+                resolution, DwdObservationResolution, Resolution
+            )
+            for resolution in resolutions
+        ]
+    if periods:
+        periods = [
+            parse_enumeration_from_template(period, DwdObservationPeriod, Period)
+            for period in periods
+        ]
+
+    combinations = []
+    for resolution, dataset_periods in RESOLUTION_DATASET_MAPPING.items():
+        if resolutions and resolution not in resolutions:
+            continue
+
+        for dataset, available_periods in dataset_periods.items():
+            if datasets and dataset not in datasets:
+                continue
+
+            for period in available_periods:
+                if periods and period not in periods:
+                    continue
+
+                combinations.append((dataset, resolution, period))
+
+    return combinations
+
+
+class CatalogEntry(NamedTuple):
+    """ Catalog entry of a dataset with the state of the files it was built from """
+
+    changed: Optional[float]
+    frame: pd.DataFrame
+
+
+def create_catalog_entry(
+    dataset: DwdObservationDataset, resolution: Resolution, period: Period
+) -> pd.DataFrame:
+    """
+    Stations of a dataset with files, along with their date coverage, geometry
+    and files.
+
+    :param dataset: dataset
+    :param resolution: resolution of the dataset
+    :param period: period of the dataset
+    :return: one row per station
+    """
+    file_index = load_file_index_for_climate_observations(dataset, resolution, period)
+
+    entry = _create_catalog_entry(dataset=dataset, resolution=resolution, period=period)
+
+    # The cached entry is rebuilt and overwritten once the files of the dataset
+    # change, so there is only ever one entry per dataset
+    if entry.changed != file_index.changed:
+        entry = _create_catalog_entry.refresh(
+            dataset=dataset, resolution=resolution, period=period
+        )
+
+    return entry.frame
+
+
+@metaindex_cache.cache_on_arguments()
+def _create_catalog_entry(
+    dataset: DwdObservationDataset, resolution: Resolution, period: Period
+) -> CatalogEntry:
+    """ Catalog entry of a dataset for the current state of its files """
+    meta_index = create_meta_index_for_climate_observations(dataset, resolution, period)
+    file_index = load_file_index_for_climate_observations(dataset, resolution, period)
+
+    entry = meta_index.loc[
+        meta_index[Columns.STATION_ID.value].isin(file_index.stations),
+        METADATA_COLUMNS,
+    ].copy()
+
+    entry[Columns.RESOLUTION.value] = resolution.value
+    entry[Columns.DATASET.value] = dataset.value
+    entry[Columns.PERIOD.value] = period.value
+
+    entry[CATALOG_FILES] = [
+        file_index.station(station_id)[DwdColumns.FILENAME.value].tolist()
+        for station_id in entry[Columns.STATION_ID.value]
+    ]
+
+    return CatalogEntry(changed=file_index.changed, frame=entry.reset_index(drop=True))
+
+
+class DwdObservationCatalog:
+    """
+    Catalog of DWD observations with one row per station, dataset, resolution and
+    period, indexed in this order: resolution, dataset, period, station id.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df.set_index(CATALOG_INDEX).sort_index()
+
+    @classmethod
+    def build(
+        cls,
+        datasets: Optional[List[Union[str, DwdObservationDataset]]] = None,
+        resolutions: Optional[List[Union[str, Resolution]]] = None,
+        periods: Optional[List[Union[str, Period]]] = None,
+        max_workers: Optional[int] = None,
+    ) -> "DwdObservationCatalog":
+        """
+        Build the catalog for a selection of datasets, resolutions and periods from
+        their cached entries. The meta and file indexes of all combinations are
+        built concurrently first, so missing entries are created from the cache.
+
+        :param datasets: datasets, all if not given
+        :param resolutions: resolutions, all if not given
+        :param periods: periods, all if not given
+        :param max_workers: number of indexes built at the same time, defaults to
+            the download concurrency
+        :return: catalog
+        """
+        combinations = select_combinations(datasets, resolutions, periods)
+
+        log.info(f"Building catalog of {len(combinations)} dataset combinations")
+
+        tasks = [
+            partial(function, *combination)
+            for combination in combinations
+            for function in (
+                load_file_index_for_climate_observations,
+                create_meta_index_for_climate_observations,
+            )
+        ]
+
+        if tasks:
+            with ThreadPoolExecutor(
+                max_workers=max_workers or min(len(tasks), DOWNLOAD_CONCURRENCY),
+                thread_name_prefix="wetterdienst-catalog",
+            ) as executor:
+                # Network access of the workers counts towards the caller
+                futures = [
+                    executor.submit(contextvars.copy_context().run, task)
+                    for task in tasks
+                ]
+
+                for future in futures:
+                    future.result()
+
+        # Merged in order of the combinations, independent of the order of completion
+        entries = [create_catalog_entry(*combination) for combination in combinations]
+
+        if not entries:
+            return cls(
+                pd.DataFrame(columns=[*METADATA_COLUMNS, *CATALOG_INDEX, CATALOG_FILES])
+            )
+
+        return cls(pd.concat(entries, ignore_index=True))
+
+    def _select(
+        self,
+        resolution: Resolution,
+        datasets: Optional[List[DwdObservationDataset]] = None,
+        periods: Optional[List[Period]] = None,
+    ) -> pd.DataFrame:
+        """ Rows of a resolution, optionally of some datasets and periods only """
+        try:
+            df = self.df.loc[[resolution.value]]
+        except KeyError:
+            return self.df.iloc[0:0].reset_index()
+
+        df = df.reset_index()
+
+        if datasets:
+            df = df[
+                df[Columns.DATASET.value].isin([dataset.value for dataset in datasets])
+            ]
+        if periods:
+            df = df[df[Columns.PERIOD.value].isin([period.value for period in periods])]
+
+        return df
+
+    def stations(
+        self,
+        resolution: Resolution,
+        datasets: List[DwdObservationDataset],
+        periods: List[Period],
+    ) -> pd.DataFrame:
+        """
+        Stations with files in any of the datasets and periods. Stations found in
+        more than one of them are described by the first dataset and, within it,
+        the first period in the given order.
+
+        :param resolution: resolution
+        :param datasets: datasets in order of precedence
+        :param periods: periods in order of precedence
+        :return: one row per station with its metadata, sorted by station id
+        """
+        df = self._select(resolution, datasets, periods)
+
+        precedence = (
+            df[Columns.DATASET.value].map(
+                {dataset.value: i for i, dataset in enumerate(datasets)}
+            )
+            * len(periods)
+            + df[Columns.PERIOD.value].map(
+                {period.value: i for i, period in enumerate(periods)}
+            )
+        ).rename("precedence")
+
+        df = df.loc[precedence.sort_values(kind="mergesort").index]
+
+        df = df.drop_duplicates(subset=Columns.STATION_ID.value)
+
+        df = df.sort_values(
+            [Columns.STATION_ID.value], key=lambda x: x.astype(int), kind="mergesort"
+        )
+
+        return df.loc[:, METADATA_COLUMNS].reset_index(drop=True)
+
+    def coverage(self, station_id: str) -> pd.DataFrame:
+        """
+        Date coverage and number of files of a station per dataset, resolution and
+        period.
+
+        :param station_id: station id
+        :return: one row per dataset, resolution and period with files
+        """
+        try:
+            df = self.df.xs(station_id, level=Columns.STATION_ID.value)
+        except KeyError:
+            df = self.df.iloc[0:0].droplevel(Columns.STATION_ID.value)
+
+        df = df.reset_index()
+
+        df[CATALOG_FILES] = df[CATALOG_FILES].map(len)
+
+        return df.loc[
+            :,
+            [
+                Columns.RESOLUTION.value,
+                Columns.DATASET.value,
+                Columns.PERIOD.value,
+                Columns.FROM_DATE.value,
+                Columns.TO_DATE.value,
+                CATALOG_FILES,
+            ],
+        ]
+
+    def files(
+        self,
+        station_id: str,
+        dataset: DwdObservationDataset,
+        resolution: Resolution,
+        period: Period,
+    ) -> List[str]:
+        """
+        Files of a station in a dataset.
+
+        :param station_id: station id
+        :param dataset: dataset
+        :param resolution: resolution of the dataset
+        :param period: period of the dataset
+        :return: urls of the files, empty if the station has none
+        """
+        try:
+            return self.df.at[
+                (resolution.value, dataset.value, period.value, station_id),
+                CATALOG_FILES,
+            ]
+        except KeyError:
+            return []
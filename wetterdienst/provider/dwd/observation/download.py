@@ -1,37 +1,69 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
-from concurrent.futures.thread import ThreadPoolExecutor
+import logging
+from functools import partial
 from io import BytesIO
-from typing import List, Tuple
-from zipfile import BadZipFile, ZipFile
+from typing import List, Optional, Tuple, Union
+from zipfile import BadZipFile, ZipFile, sizeFileHeader
 
 from requests.exceptions import InvalidURL
 
 from wetterdienst.exceptions import FailedDownload, ProductFileNotFound
-from wetterdienst.provider.dwd.network import download_file_from_dwd
-from wetterdienst.util.cache import payload_cache_five_minutes
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.provider.dwd.network import (
+    RANGE_REQUESTS,
+    download_file_from_dwd,
+    open_file_from_dwd,
+    revalidate_file_from_dwd,
+)
+from wetterdienst.provider.dwd.observation.metadata.dataset import DwdObservationDataset
+from wetterdienst.util.cache import cache_on_policy, payload_cache_five_minutes
+from wetterdienst.util.engine import download_engine
+from wetterdienst.util.network import RemoteFile
+
+log = logging.getLogger(__name__)
 
 PRODUCT_FILE_IDENTIFIER = "produkt"
 
 
 def download_climate_observations_data_parallel(
     remote_files: List[str],
+    dataset: Optional[DwdObservationDataset] = None,
+    resolution: Optional[Resolution] = None,
+    period: Optional[Period] = None,
 ) -> List[Tuple[str, BytesIO]]:
     """
-    Wrapper for ``_download_dwd_data`` to provide a multiprocessing feature.
+    Wrapper for ``_download_dwd_data`` to download files concurrently. Downloads run
+    on the download engine, which limits the downloads in flight across all
+    requests of the process.
 
     :param remote_files:    List of requested files
+    :param dataset:         Dataset of the files, used for the cache TTL
+    :param resolution:      Resolution of the files, used for the cache TTL
+    :param period:          Period of the files, used for the cache TTL
     :return:                List of downloaded files
     """
+    download = partial(
+        _download_climate_observations_data,
+        dataset=dataset,
+        resolution=resolution,
+        period=period,
+    )
 
-    with ThreadPoolExecutor() as executor:
-        files_in_bytes = executor.map(_download_climate_observations_data, remote_files)
+    files_in_bytes = download_engine.map(download, remote_files)
 
     return list(zip(remote_files, files_in_bytes))
 
 
-def _download_climate_observations_data(remote_file: str) -> BytesIO:
+def _download_climate_observations_data(
+    remote_file: str,
+    dataset: Optional[DwdObservationDataset] = None,
+    resolution: Optional[Resolution] = None,
+    period: Optional[Period] = None,
+) -> BytesIO:
     """
     This function downloads the station data for which the link is
     provided by the 'select_dwd' function. It checks the shortened filepath (just
@@ -41,16 +73,51 @@ def _download_climate_observations_data(remote_file: str) -> BytesIO:
     Args:
         remote_file: contains path to file that should be downloaded
             and the path to the folder to store the files
+        dataset: dataset of the file
+        resolution: resolution of the file
+        period: period of the file, determines how long it is cached
 
     Returns:
         stores data on local file system
 
     """
-    return BytesIO(__download_climate_observations_data(remote_file=remote_file))
-
-
-@payload_cache_five_minutes.cache_on_arguments()
-def __download_climate_observations_data(remote_file: str) -> bytes:
+    file = __download_climate_observations_data(
+        remote_file=remote_file, dataset=dataset, resolution=resolution, period=period
+    )
+
+    # Payloads of the memory backend are shared between threads, so every caller
+    # reads from its own file object
+    if isinstance(file, BytesIO):
+        return BytesIO(file.getvalue())
+
+    file.seek(0)
+
+    return file
+
+
+@cache_on_policy(
+    payload_cache_five_minutes,
+    Provider.DWD,
+    url_argument="remote_file",
+    revalidate=revalidate_file_from_dwd,
+)
+def __download_climate_observations_data(
+    remote_file: str,
+    dataset: Optional[DwdObservationDataset] = None,
+    resolution: Optional[Resolution] = None,
+    period: Optional[Period] = None,
+) -> BytesIO:
+
+    if RANGE_REQUESTS:
+        try:
+            return _extract_product_file(open_file_from_dwd(remote_file), remote_file)
+        except ProductFileNotFound:
+            raise
+        except (IOError, BadZipFile) as e:
+            log.info(
+                f"Reading {remote_file} with range requests failed ({e}), "
+                f"downloading it in full"
+            )
 
     try:
         zip_file = download_file_from_dwd(remote_file)
@@ -61,20 +128,48 @@ def __download_climate_observations_data(remote_file: str) -> bytes:
     except Exception:
         raise FailedDownload(f"Download failed for {remote_file}")
 
+    return _extract_product_file(zip_file, remote_file)
+
+
+def _extract_product_file(
+    zip_file: Union[BytesIO, RemoteFile], remote_file: str
+) -> BytesIO:
+    """
+    Extract the product file from the archive of a remote file. Of a remote archive
+    read with range requests, only the central directory and the product file
+    are transferred.
+
+    :param zip_file: archive of the remote file
+    :param remote_file: url of the remote file
+    :return: product file in bytes
+    """
     try:
         zip_file_opened = ZipFile(zip_file)
 
         # Files of archive
-        archive_files = zip_file_opened.namelist()
+        archive_files = zip_file_opened.infolist()
 
         for file in archive_files:
             # If found file load file in bytes, close zipfile and return bytes
-            if file.startswith(PRODUCT_FILE_IDENTIFIER):
+            if file.filename.startswith(PRODUCT_FILE_IDENTIFIER):
+                if isinstance(zip_file, RemoteFile):
+                    # Request local header and data of the member at once, with
+                    # room for a local extra field
+                    zip_file.fetch(
+                        file.header_offset,
+                        file.header_offset
+                        + sizeFileHeader
+                        + len(file.orig_filename.encode())
+                        + len(file.extra)
+                        + 1024
+                        + file.compress_size,
+                    )
+
                 file_in_bytes = zip_file_opened.open(file).read()
 
                 zip_file_opened.close()
 
-                return file_in_bytes
+                return BytesIO(file_in_bytes)
 
         # If whatsoever no file was found and returned already throw exception
         raise ProductFileNotFound(
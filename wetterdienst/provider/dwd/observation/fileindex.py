@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
-from typing import List, Optional
+import logging
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
 
+import numpy as np
 import pandas as pd
 
 from wetterdienst.metadata.extension import Extension
 from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
 from wetterdienst.metadata.resolution import Resolution
-from wetterdienst.provider.dwd.index import _create_file_index_for_dwd_server
+from wetterdienst.provider.dwd.index import build_url_to_parameter
 from wetterdienst.provider.dwd.metadata.column_names import DwdColumns
 from wetterdienst.provider.dwd.metadata.constants import (
     DATE_RANGE_REGEX,
@@ -18,7 +23,93 @@ from wetterdienst.provider.dwd.metadata.constants import (
 from wetterdienst.provider.dwd.metadata.datetime import DatetimeFormat
 from wetterdienst.provider.dwd.observation.metadata.dataset import DwdObservationDataset
 from wetterdienst.provider.dwd.observation.metadata.resolution import HIGH_RESOLUTIONS
-from wetterdienst.util.cache import fileindex_cache_twelve_hours
+from wetterdienst.util.cache import (
+    file_index_store,
+    file_index_store_stats,
+    get_ttl,
+)
+from wetterdienst.util.network import crawl_remote_files
+
+log = logging.getLogger(__name__)
+
+# Time after which a listing is updated from the server, if no TTL policy applies
+FILE_INDEX_TTL = 60 * 60 * 12
+
+
+class DateRangeIndex(NamedTuple):
+    """
+    Date ranges of the historical files of a station sorted by their start, along
+    with the running maximum of their ends. Both are sorted, so the date ranges
+    overlapping an interval are found by binary search.
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    max_ends: np.ndarray
+    date_ranges: np.ndarray
+
+    def overlapping(self, start: int, end: int) -> List[str]:
+        """
+        Date ranges overlapping an interval, both ends included.
+
+        :param start: start of the interval in nanoseconds since epoch
+        :param end: end of the interval in nanoseconds since epoch
+        :return: date ranges in order of their start
+        """
+        # Date ranges starting after the interval are left out
+        stop = np.searchsorted(self.starts, end, side="right")
+
+        # Date ranges before the first one reaching into the interval are left out
+        first = np.searchsorted(self.max_ends[:stop], start, side="left")
+
+        candidates = slice(first, stop)
+
+        return self.date_ranges[candidates][self.ends[candidates] >= start].tolist()
+
+
+class FileIndex(NamedTuple):
+    """ File index of a dataset with the files grouped by station """
+
+    # Time of the last change of the listing the index was built from
+    changed: Optional[float]
+    frame: pd.DataFrame
+    stations: Dict[str, pd.DataFrame]
+    # Only for historical files of high resolutions, which are split by date range
+    date_range_indexes: Dict[str, DateRangeIndex]
+
+    def station(self, station_id: str) -> pd.DataFrame:
+        """ Files of a station, an empty frame if it has none """
+        try:
+            return self.stations[station_id]
+        except KeyError:
+            return self.frame.iloc[0:0]
+
+    def date_ranges(
+        self, station_id: str, interval: Optional[pd.Interval] = None
+    ) -> List[str]:
+        """
+        Date ranges of the historical files of a station overlapping an interval.
+
+        :param station_id: station id
+        :param interval: interval of the request, all date ranges if not given
+        :return: date ranges in order of their start
+        """
+        try:
+            index = self.date_range_indexes[station_id]
+        except KeyError:
+            return []
+
+        if interval is None:
+            return index.date_ranges.tolist()
+
+        return index.overlapping(
+            pd.Timestamp(interval.left).value, pd.Timestamp(interval.right).value
+        )
+
+
+# File indexes built by listing, rebuilt once the listing changes in the store
+_file_indexes: Dict[str, FileIndex] = {}
+_file_indexes_lock = threading.Lock()
 
 
 def create_file_list_for_climate_observations(
@@ -42,25 +133,182 @@ def create_file_list_for_climate_observations(
     Returns:
         List of path's to file
     """
-    file_index = create_file_index_for_climate_observations(dataset, resolution, period)
-
-    file_index = file_index[file_index[DwdColumns.STATION_ID.value] == station_id]
+    file_index = load_file_index_for_climate_observations(
+        dataset, resolution, period
+    ).station(station_id)
 
     if date_range:
         file_index = file_index[file_index[DwdColumns.DATE_RANGE.value] == date_range]
 
-    return file_index[DwdColumns.FILENAME.value].values.tolist()
+    return file_index[DwdColumns.FILENAME.value].tolist()
+
+
+def _describe_files(
+    urls: List[str], resolution: Resolution, period: Period
+) -> pd.DataFrame:
+    """
+    Station id and, for historical high resolution data, date range of data files.
+
+    :param urls: urls of data files
+    :param resolution: resolution of the files
+    :param period: period of the files
+    :return: frame with the columns of the file index store
+    """
+    urls = pd.Series(urls, dtype="str")
+
+    df = pd.DataFrame(
+        {"url": urls, "station_id": urls.str.findall(STATION_ID_REGEX).str[0]}
+    )
+
+    if resolution in HIGH_RESOLUTIONS and period == Period.HISTORICAL:
+        df["date_range"] = urls.str.findall(DATE_RANGE_REGEX).str[0]
+
+        df[["from_date", "to_date"]] = df["date_range"].str.split("_", expand=True)
+
+    return df.dropna(subset=["station_id"])
+
+
+def update_file_index_for_climate_observations(
+    dataset: DwdObservationDataset,
+    resolution: Resolution,
+    period: Period,
+) -> str:
+    """
+    Update the stored file index of a dataset from the server, once its TTL has
+    expired. Only files that were added, removed or changed since the last listing
+    are written to the store. A listing is updated by one thread and process at a
+    time, the others find it updated once they get hold of the lock.
+
+    :param dataset: dataset of the files
+    :param resolution: resolution of the files
+    :param period: period of the files
+    :return: url of the listing in the file index store
+    """
+    listing = build_url_to_parameter(
+        dataset, resolution, period, DWDCDCBase.CLIMATE_OBSERVATIONS
+    )
+
+    ttl = get_ttl(Provider.DWD, dataset, resolution, period) or FILE_INDEX_TTL
+
+    updated = file_index_store.updated(listing)
+
+    if updated and time.time() - updated < ttl:
+        file_index_store_stats.record(hit=True)
+        return listing
+
+    with file_index_store.lock(listing):
+        # Another thread or process may have updated the listing meanwhile
+        updated = file_index_store.updated(listing)
+
+        if updated and time.time() - updated < ttl:
+            file_index_store_stats.record(hit=True)
+            return listing
+
+        start = time.perf_counter()
+
+        files = [
+            (file.url, file.size, file.modified and file.modified.timestamp())
+            for file in crawl_remote_files(listing, recursive=True)
+            if file.url.endswith(Extension.ZIP.value)
+        ]
+
+        changes = file_index_store.update(
+            listing, files, lambda urls: _describe_files(urls, resolution, period)
+        )
+
+        file_index_store_stats.record(
+            hit=False, regeneration_time=time.perf_counter() - start
+        )
+
+    log.info(f"Updated file index of {listing}: {changes}")
+
+    return listing
+
+
+def load_file_index_for_climate_observations(
+    dataset: DwdObservationDataset,
+    resolution: Resolution,
+    period: Period,
+) -> FileIndex:
+    """
+    File index of a dataset along with its files grouped by station, so files of
+    a station are looked up without scanning the whole index. The index is built
+    once per change of the listing and held in memory.
+
+    :param dataset: dataset of the files
+    :param resolution: resolution of the files
+    :param period: period of the files
+    :return: file index
+    """
+    listing = update_file_index_for_climate_observations(dataset, resolution, period)
+
+    changed = file_index_store.changed(listing)
+
+    with _file_indexes_lock:
+        file_index = _file_indexes.get(listing)
+
+    if file_index and file_index.changed == changed:
+        return file_index
+
+    frame = _build_file_index(listing, resolution, period)
+
+    if DwdColumns.DATE_RANGE.value in frame:
+        date_range_indexes = _build_date_range_indexes(frame)
+    else:
+        date_range_indexes = {}
+
+    file_index = FileIndex(
+        changed=changed,
+        frame=frame,
+        stations=dict(tuple(frame.groupby(DwdColumns.STATION_ID.value, sort=False))),
+        date_range_indexes=date_range_indexes,
+    )
+
+    with _file_indexes_lock:
+        _file_indexes[listing] = file_index
+
+    return file_index
+
+
+def _build_date_range_indexes(frame: pd.DataFrame) -> Dict[str, DateRangeIndex]:
+    """ Date range indexes of all stations of a file index of historical files """
+    frame = frame.sort_values(
+        [DwdColumns.STATION_ID.value, DwdColumns.FROM_DATE.value], kind="mergesort"
+    )
+
+    station_ids = frame[DwdColumns.STATION_ID.value].to_numpy()
+
+    starts = pd.DatetimeIndex(frame[DwdColumns.FROM_DATE.value]).asi8
+    ends = pd.DatetimeIndex(frame[DwdColumns.TO_DATE.value]).asi8
+    max_ends = pd.Series(ends).groupby(station_ids).cummax().to_numpy()
+    date_ranges = frame[DwdColumns.DATE_RANGE.value].to_numpy()
+
+    # Rows of a station are consecutive after sorting
+    bounds = np.flatnonzero(station_ids[1:] != station_ids[:-1]) + 1
+    firsts = np.concatenate(([0], bounds))
+    stops = np.concatenate((bounds, [len(frame)]))
+
+    return {
+        station_ids[first]: DateRangeIndex(
+            starts=starts[first:stop],
+            ends=ends[first:stop],
+            max_ends=max_ends[first:stop],
+            date_ranges=date_ranges[first:stop],
+        )
+        for first, stop in zip(firsts, stops)
+        if stop > first
+    }
 
 
-@fileindex_cache_twelve_hours.cache_on_arguments()
 def create_file_index_for_climate_observations(
     parameter_set: DwdObservationDataset,
     resolution: Resolution,
     period: Period,
 ) -> pd.DataFrame:
     """
-    Function (cached) to create a file index of the DWD station data. The file index
-    is created for an individual set of parameters.
+    Function to create a file index of the DWD station data. The file index
+    is created for an individual set of parameters from the file index store,
+    which is updated from the server depending on the period.
     Args:
         parameter_set: parameter of Parameter enumeration
         resolution: time resolution of TimeResolution enumeration
@@ -68,44 +316,34 @@ def create_file_index_for_climate_observations(
     Returns:
         file index in a pandas.DataFrame with sets of parameters and station id
     """
-    file_index = _create_file_index_for_dwd_server(
-        parameter_set, resolution, period, DWDCDCBase.CLIMATE_OBSERVATIONS
-    )
-
-    file_index = file_index[
-        file_index[DwdColumns.FILENAME.value].str.endswith(Extension.ZIP.value)
-    ]
+    return load_file_index_for_climate_observations(
+        parameter_set, resolution, period
+    ).frame
 
-    file_index.loc[:, DwdColumns.STATION_ID.value] = (
-        file_index[DwdColumns.FILENAME.value].str.findall(STATION_ID_REGEX).str[0]
-    )
 
-    file_index = file_index.dropna().reset_index(drop=True)
+def _build_file_index(
+    listing: str, resolution: Resolution, period: Period
+) -> pd.DataFrame:
+    """ File index of a listing in the file index store """
+    stored = file_index_store.query(listing)
 
-    file_index.loc[:, DwdColumns.STATION_ID.value] = file_index[
-        DwdColumns.STATION_ID.value
-    ].astype(str)
+    file_index = pd.DataFrame(
+        {
+            DwdColumns.FILENAME.value: stored["url"].astype(str),
+            DwdColumns.STATION_ID.value: stored["station_id"].astype(str),
+        }
+    )
 
     if resolution in HIGH_RESOLUTIONS and period == Period.HISTORICAL:
         # Date range string for additional filtering of historical files
-        file_index.loc[:, DwdColumns.DATE_RANGE.value] = (
-            file_index[DwdColumns.FILENAME.value].str.findall(DATE_RANGE_REGEX).str[0]
-        )
-
-        file_index.loc[:, [DwdColumns.FROM_DATE.value, DwdColumns.TO_DATE.value]] = (
-            file_index[DwdColumns.DATE_RANGE.value].str.split("_", expand=True).values
-        )
+        file_index[DwdColumns.DATE_RANGE.value] = stored["date_range"]
 
-        file_index.loc[:, DwdColumns.FROM_DATE.value] = pd.to_datetime(
-            file_index[DwdColumns.FROM_DATE.value],
-            format=DatetimeFormat.YMD.value,
-            utc=True,
+        file_index[DwdColumns.FROM_DATE.value] = pd.to_datetime(
+            stored["from_date"], format=DatetimeFormat.YMD.value, utc=True
         )
 
-        file_index.loc[:, DwdColumns.TO_DATE.value] = pd.to_datetime(
-            file_index[DwdColumns.TO_DATE.value],
-            format=DatetimeFormat.YMD.value,
-            utc=True,
+        file_index[DwdColumns.TO_DATE.value] = pd.to_datetime(
+            stored["to_date"], format=DatetimeFormat.YMD.value, utc=True
         )
 
         # Temporary fix for filenames with wrong ordered/faulty dates
@@ -123,17 +361,10 @@ def create_file_index_for_climate_observations(
             DwdColumns.TO_DATE.value
         ].max()
 
-        file_index.loc[:, DwdColumns.INTERVAL.value] = file_index.apply(
-            lambda x: pd.Interval(
-                left=x[DwdColumns.FROM_DATE.value],
-                right=x[DwdColumns.TO_DATE.value],
-                closed="both",
-            ),
-            axis=1,
+        file_index[DwdColumns.INTERVAL.value] = pd.arrays.IntervalArray.from_arrays(
+            file_index[DwdColumns.FROM_DATE.value],
+            file_index[DwdColumns.TO_DATE.value],
+            closed="both",
         )
 
-    file_index = file_index.sort_values(
-        by=[DwdColumns.STATION_ID.value, DwdColumns.FILENAME.value]
-    )
-
     return file_index
@@ -97,9 +97,9 @@ def create_meta_index_for_climate_observations(
         )
 
     # If no state column available, take state information from daily historical
-    # precipitation
+    # precipitation, which is cached as it is shared by all those meta indexes
     if DwdColumns.STATE.value not in meta_index:
-        mdp = _create_meta_index_for_climate_observations(
+        mdp = create_meta_index_for_climate_observations(
             DwdObservationDataset.PRECIPITATION_MORE,
             Resolution.DAILY,
             Period.HISTORICAL,
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
+import hashlib
 import logging
 from io import BytesIO
 from typing import List, Tuple
@@ -19,6 +20,7 @@ from wetterdienst.provider.dwd.observation.metadata.dataset import DwdObservatio
 from wetterdienst.provider.dwd.observation.metadata.parameter import (
     DwdObservationDatasetTree,
 )
+from wetterdienst.util.cache import load_frame, store_frame
 
 log = logging.getLogger(__name__)
 
@@ -85,6 +87,33 @@ def _parse_climate_observations_data(
     """
     filename, file = filename_and_file
 
+    payload = file.read()
+
+    # Frames parsed before from the very same content are read back from the cache
+    validator = hashlib.sha256(payload).hexdigest()
+
+    df = load_frame(filename, validator)
+
+    if df is not None:
+        return df
+
+    df = __parse_climate_observations_data(
+        (filename, BytesIO(payload)), dataset, resolution, period
+    )
+
+    store_frame(filename, df, validator)
+
+    return df
+
+
+def __parse_climate_observations_data(
+    filename_and_file: Tuple[str, BytesIO],
+    dataset: DwdObservationDataset,
+    resolution: Resolution,
+    period: Period,
+) -> pd.DataFrame:
+    filename, file = filename_and_file
+
     try:
         df = pd.read_csv(
             filepath_or_buffer=BytesIO(
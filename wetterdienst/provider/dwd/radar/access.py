@@ -8,17 +8,20 @@ import tarfile
 from dataclasses import dataclass
 from datetime import datetime
 from io import BytesIO
-from typing import Generator, Optional, Tuple
-
-import pandas as pd
+from typing import IO, Generator, Optional
 
 from wetterdienst.exceptions import FailedDownload
 from wetterdienst.metadata.extension import Extension
 from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
 from wetterdienst.metadata.resolution import Resolution
 from wetterdienst.provider.dwd.metadata.column_names import DwdColumns
 from wetterdienst.provider.dwd.metadata.datetime import DatetimeFormat
-from wetterdienst.provider.dwd.network import download_file_from_dwd
+from wetterdienst.provider.dwd.network import (
+    download_file_from_dwd,
+    revalidate_file_from_dwd,
+    stream_file_from_dwd,
+)
 from wetterdienst.provider.dwd.radar.index import (
     create_fileindex_radar,
     create_fileindex_radolan_cdc,
@@ -32,6 +35,7 @@ from wetterdienst.provider.dwd.radar.metadata import (
 from wetterdienst.provider.dwd.radar.sites import DwdRadarSite
 from wetterdienst.provider.dwd.radar.util import get_date_from_filename, verify_hdf5
 from wetterdienst.util.cache import (
+    cache_on_policy,
     payload_cache_five_minutes,
     payload_cache_twelve_hours,
 )
@@ -156,22 +160,21 @@ def collect_radar_data(
                         )
                     ]
 
-                results.append(file_index)
-
-            file_index = pd.concat(results)
+                results.append((period, file_index))
 
-            if file_index.empty:
+            if all(file_index.empty for _, file_index in results):
                 # TODO: Extend this log message.
                 log.warning(f"No radar file found for {parameter}, {site}, {fmt}")
                 return
 
             # Iterate list of files and yield "RadarResult" items.
-            for _, row in file_index.iterrows():
-                url = row[DwdColumns.FILENAME.value]
-                try:
-                    yield download_radolan_data(start_date, url)
-                except FailedDownload:
-                    log.exception()
+            for period, file_index in results:
+                for _, row in file_index.iterrows():
+                    url = row[DwdColumns.FILENAME.value]
+                    try:
+                        yield download_radolan_data(start_date, url, period)
+                    except FailedDownload:
+                        log.exception()
 
         else:
             file_index = create_fileindex_radar(
@@ -239,8 +242,8 @@ def should_cache_download(*args, **kwargs) -> bool:  # pragma: no cover
 
 
 @payload_cache_five_minutes.cache_on_arguments(should_cache_fn=should_cache_download)
-def _download_generic_data_cached(url: str) -> Tuple[str, BytesIO]:
-    return url, download_file_from_dwd(url)
+def _download_generic_data_cached(url: str) -> BytesIO:
+    return download_file_from_dwd(url)
 
 
 def _download_generic_data(url: str) -> Generator[RadarResult, None, None]:
@@ -253,7 +256,7 @@ def _download_generic_data(url: str) -> Generator[RadarResult, None, None]:
                         or an archive of multiple files.
     """
 
-    _, data = _download_generic_data_cached(url)
+    data = _download_generic_data_cached(url)
 
     data.seek(0)
 
@@ -287,6 +290,7 @@ def _download_generic_data(url: str) -> Generator[RadarResult, None, None]:
 def download_radolan_data(
     date_time: datetime,
     url: str,
+    period: Optional[Period] = None,
 ) -> RadarResult:
     """
     Function used to download RADOLAN_CDC data for a given datetime. The function calls
@@ -302,9 +306,11 @@ def download_radolan_data(
                         for a datetime in historical time or an archive with one file
                         for the recent RADOLAN file
 
+    :param period:      The period of the file, determines how long it is cached
+
     :return:            ``RadarResult`` item
     """
-    archive_in_bytes = _download_radolan_data(url)
+    archive_in_bytes = _download_radolan_data(url, period)
 
     result = _extract_radolan_data(date_time, archive_in_bytes)
     result.url = url
@@ -312,23 +318,32 @@ def download_radolan_data(
     return result
 
 
-@payload_cache_twelve_hours.cache_on_arguments()
-def _download_radolan_data(remote_radolan_filepath: str) -> BytesIO:
+@cache_on_policy(
+    payload_cache_twelve_hours,
+    Provider.DWD,
+    url_argument="remote_radolan_filepath",
+    revalidate=revalidate_file_from_dwd,
+)
+def _download_radolan_data(
+    remote_radolan_filepath: str, period: Optional[Period] = None
+) -> IO[bytes]:
     """
-    Function (cached) that downloads the RADOLAN_CDC file.
+    Function (cached) that downloads the RADOLAN_CDC file. Archives of historical
+    data span a month, so they are streamed to disk instead of being held in memory.
 
     Args:
         remote_radolan_filepath: the file path to the file on the DWD server
+        period: period of the file, determines how long it is cached
 
     Returns:
         the file in binary, either an archive of one file or an archive of multiple
         files
     """
-    return download_file_from_dwd(remote_radolan_filepath)
+    return stream_file_from_dwd(remote_radolan_filepath)
 
 
 def _extract_radolan_data(
-    date_time: datetime, archive_in_bytes: BytesIO
+    date_time: datetime, archive_in_bytes: IO[bytes]
 ) -> RadarResult:
     """
     Function used to extract RADOLAN_CDC file for the requested datetime
@@ -350,21 +365,19 @@ def _extract_radolan_data(
         # Have to seek(0) as the archive might be reused
         archive_in_bytes.seek(0)
 
-        with gzip.GzipFile(fileobj=archive_in_bytes, mode="rb") as gz_file:
-            file_in_archive = BytesIO(gz_file.read())
-
-            with tarfile.open(fileobj=file_in_archive) as tar_file:
-                for file in tar_file.getmembers():
-                    if date_time_string in file.name:
-                        return RadarResult(
-                            data=BytesIO(tar_file.extractfile(file).read()),
-                            timestamp=date_time,
-                            filename=file.name,
-                        )
+        # Members are read one after the other, without unpacking the whole archive
+        with tarfile.open(fileobj=archive_in_bytes, mode="r|gz") as tar_file:
+            for file in tar_file:
+                if date_time_string in file.name:
+                    return RadarResult(
+                        data=BytesIO(tar_file.extractfile(file).read()),
+                        timestamp=date_time,
+                        filename=file.name,
+                    )
 
-                raise FileNotFoundError(
-                    f"RADOLAN file for {date_time_string} not found."
-                )  # pragma: no cover
+            raise FileNotFoundError(
+                f"RADOLAN file for {date_time_string} not found."
+            )  # pragma: no cover
 
     except EOFError as ex:
         raise FailedDownload(
@@ -377,7 +390,14 @@ def _extract_radolan_data(
         # Seek again for reused purpose
         archive_in_bytes.seek(0)
 
-        with gzip.GzipFile(fileobj=archive_in_bytes, mode="rb") as gz_file:
-            return RadarResult(
-                data=BytesIO(gz_file.read()), timestamp=date_time, filename=gz_file.name
-            )
+        try:
+            with gzip.GzipFile(fileobj=archive_in_bytes, mode="rb") as gz_file:
+                return RadarResult(
+                    data=BytesIO(gz_file.read()),
+                    timestamp=date_time,
+                    filename=gz_file.name,
+                )
+        except EOFError as ex:
+            raise FailedDownload(
+                f"RADOLAN file for {date_time_string} is invalid: {ex}"
+            )  # pragma: no cover
@@ -10,6 +10,7 @@ from dateparser import parse
 
 from wetterdienst.metadata.extension import Extension
 from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
 from wetterdienst.metadata.resolution import Resolution
 from wetterdienst.provider.dwd.metadata.column_names import DwdColumns
 from wetterdienst.provider.dwd.metadata.constants import DWD_CDC_PATH, DWD_SERVER
@@ -29,7 +30,7 @@ from wetterdienst.provider.dwd.radar.util import (
     RADOLAN_DT_PATTERN,
     get_date_from_filename,
 )
-from wetterdienst.util.cache import fileindex_cache_five_minutes
+from wetterdienst.util.cache import cache_on_policy, fileindex_cache_five_minutes
 from wetterdienst.util.network import list_remote_files
 
 
@@ -120,7 +121,9 @@ def create_fileindex_radar(
     return files_server
 
 
-@fileindex_cache_five_minutes.cache_on_arguments()
+@cache_on_policy(
+    fileindex_cache_five_minutes, Provider.DWD, dataset=DwdRadarParameter.RADOLAN_CDC
+)
 def create_fileindex_radolan_cdc(
     resolution: Resolution, period: Period
 ) -> pd.DataFrame:
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.provider.dwd.forecast import DwdMosmixRequest, DwdMosmixType
+from wetterdienst.provider.dwd.observation.catalog import select_combinations
+from wetterdienst.provider.dwd.observation.download import (
+    _download_climate_observations_data,
+)
+from wetterdienst.provider.dwd.observation.fileindex import (
+    create_file_index_for_climate_observations,
+    create_file_list_for_climate_observations,
+)
+from wetterdienst.provider.dwd.observation.metadata.dataset import DwdObservationDataset
+from wetterdienst.provider.dwd.observation.metaindex import (
+    create_meta_index_for_climate_observations,
+)
+
+log = logging.getLogger(__name__)
+
+
+def _run(executor: ThreadPoolExecutor, tasks: List[Tuple[str, Callable]]) -> int:
+    """
+    Run tasks on the executor and wait for them, failures are logged.
+
+    :return: number of failed tasks
+    """
+    futures = {executor.submit(task): description for description, task in tasks}
+
+    failed = 0
+    for future in as_completed(futures):
+        try:
+            future.result()
+        except Exception as e:
+            log.warning(f"Warming {futures[future]} failed: {e}")
+            failed += 1
+
+    return failed
+
+
+def warm_cache(
+    datasets: Optional[List[Union[str, DwdObservationDataset]]] = None,
+    resolutions: Optional[List[Union[str, Resolution]]] = None,
+    periods: Optional[List[Union[str, Period]]] = None,
+    station_ids: Optional[List[str]] = None,
+    payloads: bool = False,
+    mosmix: bool = False,
+    max_workers: int = 4,
+) -> Dict[str, int]:
+    """
+    Populate the cache with meta indexes and file indexes of DWD observations, and
+    optionally with the MOSMIX station list and the data files of given stations,
+    so that first requests do not have to wait for them.
+
+    :param datasets: datasets to warm, all if not given
+    :param resolutions: resolutions to warm, all if not given
+    :param periods: periods to warm, all if not given
+    :param station_ids: stations whose data files are downloaded with payloads
+    :param payloads: whether to download data files as well
+    :param mosmix: whether to warm the MOSMIX station list
+    :param max_workers: number of concurrent downloads
+    :return: number of warmed indexes, payloads and failed tasks
+    """
+    if payloads and not station_ids:
+        raise ValueError("Warming payloads requires station ids")
+
+    combinations = select_combinations(datasets, resolutions, periods)
+
+    log.info(f"Warming cache for {len(combinations)} dataset combinations")
+
+    tasks = []
+    for dataset, resolution, period in combinations:
+        description = f"{dataset.value}/{resolution.value}/{period.value}"
+
+        tasks.append(
+            (
+                f"meta index of {description}",
+                partial(
+                    create_meta_index_for_climate_observations,
+                    dataset,
+                    resolution,
+                    period,
+                ),
+            )
+        )
+        tasks.append(
+            (
+                f"file index of {description}",
+                partial(
+                    create_file_index_for_climate_observations,
+                    dataset,
+                    resolution,
+                    period,
+                ),
+            )
+        )
+
+    if mosmix:
+        request = DwdMosmixRequest(
+            parameter=DwdMosmixType.SMALL.value, mosmix_type=DwdMosmixType.SMALL
+        )
+
+        tasks.append(("MOSMIX station list", request.all))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        failed = _run(executor, tasks)
+
+        payload_tasks = []
+        if payloads:
+            for dataset, resolution, period in combinations:
+                for station_id in station_ids:
+                    station_id = str(station_id).zfill(5)
+
+                    try:
+                        remote_files = create_file_list_for_climate_observations(
+                            station_id, dataset, resolution, period
+                        )
+                    except Exception as e:
+                        log.warning(
+                            f"File list of {dataset.value}/{resolution.value}/"
+                            f"{period.value} is not available: {e}"
+                        )
+                        continue
+
+                    for remote_file in remote_files:
+                        payload_tasks.append(
+                            (
+                                remote_file,
+                                partial(
+                                    _download_climate_observations_data,
+                                    remote_file,
+                                    dataset=dataset,
+                                    resolution=resolution,
+                                    period=period,
+                                ),
+                            )
+                        )
+
+            failed += _run(executor, payload_tasks)
+
+    return {
+        "indexes": len(tasks),
+        "payloads": len(payload_tasks),
+        "failed": failed,
+    }
@@ -9,10 +9,6 @@ from io import BytesIO
 from typing import Generator, Optional, Tuple, Union
 
 import pandas as pd
-import requests
-from requests.adapters import HTTPAdapter
-from requests_ftp.ftp import FTPSession
-from urllib3 import Retry
 
 from wetterdienst.core.scalar.request import ScalarRequestCore
 from wetterdienst.core.scalar.values import ScalarValuesCore
@@ -39,6 +35,7 @@ from wetterdienst.provider.eccc.observation.metadata.unit import (
     EcccObservationUnitSI,
 )
 from wetterdienst.util.cache import payload_cache_twelve_hours
+from wetterdienst.util.transport import create_session
 
 log = logging.getLogger(__name__)
 
@@ -53,10 +50,7 @@ class EcccObservationValues(ScalarValuesCore):
 
     _has_quality = True
 
-    _session = requests.Session()
-    _session.mount(
-        "https://", HTTPAdapter(max_retries=Retry(total=10, connect=5, read=5))
-    )
+    _session = create_session(retries=10)
 
     _base_url = (
         "https://climate.weather.gc.ca/climate_data/bulk_data_e.html?"
@@ -375,16 +369,16 @@ class EcccObservationRequest(ScalarRequestCore):
         payload = None
 
         # Try original source.
-        session = FTPSession()
+        session = create_session()
         try:
-            response = session.retr(ftp_url)
+            response = session.request("RETR", ftp_url)
             payload = response.content
         except Exception:
             log.exception(f"Unable to access FTP server at {ftp_url}")
 
             # Fall back to different source.
             try:
-                response = requests.get(http_url)
+                response = session.get(http_url)
                 response.raise_for_status()
                 with gzip.open(BytesIO(response.content), mode="rb") as f:
                     payload = f.read()
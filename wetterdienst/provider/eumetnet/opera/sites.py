@@ -6,7 +6,8 @@ import json
 from typing import Dict, List
 
 import pkg_resources
-import requests
+
+from wetterdienst.util.transport import create_session
 
 
 class OperaRadarSites:
@@ -104,7 +105,7 @@ class OperaRadarSitesGenerator:
 
     def get_opera_radar_sites(self) -> List[Dict]:  # pragma: no cover
 
-        data = requests.get(self.url).json()
+        data = create_session().get(self.url).json()
 
         # Filter empty elements and convert data types.
         integer_values = ["maxrange", "number", "startyear", "status", "wmocode"]
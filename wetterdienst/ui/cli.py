@@ -18,6 +18,7 @@ from wetterdienst.exceptions import ProviderError
 from wetterdienst.provider.dwd.radar.api import DwdRadarSites
 from wetterdienst.provider.eumetnet.opera.sites import OperaRadarSites
 from wetterdienst.ui.core import get_stations, get_values, set_logging_level
+from wetterdienst.util.instrumentation import NetworkReport, record_network
 
 log = logging.getLogger(__name__)
 
@@ -46,6 +47,15 @@ kind_opt = cloup.option_group(
 
 debug_opt = click.option("--debug", is_flag=True)
 
+stats_opt = click.option(
+    "--stats", is_flag=True, help="Print statistics of the network access to stderr"
+)
+
+
+def print_network_stats(network: NetworkReport) -> None:
+    """ Print bytes, timings and retries of all urls accessed to stderr """
+    print(json.dumps(network.to_dict(), indent=4), file=sys.stderr)
+
 
 def get_api(provider: str, kind: str):
     """
@@ -126,6 +136,11 @@ def cli():
         wetterdienst about coverage --provider=<provider> --kind=<kind> [--parameter=<parameter>] [--resolution=<resolution>] [--period=<period>]
         wetterdienst about fields --provider=dwd --kind=observation --parameter=<parameter> --resolution=<resolution> --period=<period> [--language=<language>]
 
+        wetterdienst cache stats [--reset]
+        wetterdienst cache warm [--dataset=<dataset>] [--resolution=<resolution>] [--period=<period>] [--station=<station>] [--payloads] [--mosmix] [--workers=<workers>]
+
+        wetterdienst mirror <target> <path>...
+
         wetterdienst stations --provider=<provider> --kind=<kind> --parameter=<parameter> --resolution=<resolution> [--period=<period>] --all=<all> [--target=<target>] [--format=<format>] [--pretty=<pretty>] [--debug=<debug>]
         wetterdienst stations --provider=<provider> --kind=<kind> --parameter=<parameter> --resolution=<resolution> [--period=<period>] --station=<station> [--target=<target>] [--format=<format>] [--pretty=<pretty>] [--debug=<debug>]
         wetterdienst stations --provider=<provider> --kind=<kind> --parameter=<parameter> --resolution=<resolution> [--period=<period>] --name=<name> [--target=<target>] [--format=<format>] [--pretty=<pretty>] [--debug=<debug>]
@@ -165,6 +180,7 @@ def cli():
         --humanize                            Humanize parameters
         --si-units                            Convert to SI units
         --pretty                              Pretty json with indent 4
+        --stats                               Print bytes, timings, retries and cache hits per url to stderr
         --debug                               Enable debug messages
         --listen=<listen>                     HTTP server listen address.
         --reload                              Run service and dynamically reload changed files
@@ -276,6 +292,22 @@ def cli():
         # Tell me all parameters available for 'daily' resolution.
         wetterdienst about coverage --provider=dwd --kind=observation --resolution=daily
 
+    Examples for mirroring data:
+
+        # Synchronize all observations and MOSMIX forecasts of the DWD server into a local directory
+        wetterdienst mirror /data/dwd observations mosmix
+
+        # Synchronize a single dataset
+        wetterdienst mirror /data/dwd climate_environment/CDC/observations_germany/climate/daily/kl/
+
+        # Read data from the mirror instead of the DWD server
+        WD_DWD_SERVER=file:///data/dwd/opendata.dwd.de/ wetterdienst values --provider=dwd --kind=observation --parameter=kl --resolution=daily --period=recent --station=1048,4411
+
+    Examples for inspecting network access:
+
+        # Print bytes, time to first byte, total time, retries and cache hits of every url touched
+        wetterdienst values --provider=dwd --kind=observation --parameter=kl --resolution=daily --period=recent --station=1048,4411 --stats > values.json
+
     Examples for exporting data to files:
 
         # Export list of stations into spreadsheet
@@ -458,6 +490,92 @@ def fields(provider, kind, dataset, resolution, period, language, **kwargs):
     return
 
 
+@cli.group()
+def cache():
+    pass
+
+
+@cache.command("stats")
+@cloup.option("--reset", is_flag=True, help="Reset the counters after printing them")
+def cache_stats(reset: bool):
+    from wetterdienst.util.cache import cache_stats, reset_cache_stats
+
+    output = json.dumps(cache_stats(), indent=4)
+
+    print(output)
+
+    if reset:
+        reset_cache_stats()
+
+    return
+
+
+@cache.command("warm")
+@cloup.option_group(
+    "(DWD only) selection of observation data",
+    click.option("--dataset", type=StringListParamType(",")),
+    click.option("--resolution", type=StringListParamType(",")),
+    click.option("--period", type=StringListParamType(",")),
+    click.option("--station", type=StringListParamType(",")),
+)
+@cloup.option("--payloads", is_flag=True, help="Also download data files of stations")
+@cloup.option("--mosmix", is_flag=True, help="Also warm the MOSMIX station list")
+@cloup.option("--workers", type=click.INT, default=4)
+@debug_opt
+def cache_warm(
+    dataset: List[str],
+    resolution: List[str],
+    period: List[str],
+    station: List[str],
+    payloads: bool,
+    mosmix: bool,
+    workers: int,
+    debug: bool,
+):
+    set_logging_level(debug)
+
+    from wetterdienst.provider.dwd.warm import warm_cache
+
+    if payloads and not station:
+        raise click.BadParameter("--payloads requires --station")
+
+    summary = warm_cache(
+        datasets=dataset,
+        resolutions=resolution,
+        periods=period,
+        station_ids=station,
+        payloads=payloads,
+        mosmix=mosmix,
+        max_workers=workers,
+    )
+
+    print(json.dumps(summary, indent=4))
+
+    if summary["failed"]:
+        sys.exit(1)
+
+    return
+
+
+@cli.command("mirror")
+@cloup.argument("target", type=click.Path(file_okay=False))
+@cloup.argument("paths", nargs=-1, required=True)
+@debug_opt
+def mirror(target: str, paths: List[str], debug: bool):
+    set_logging_level(debug)
+
+    from wetterdienst.provider.dwd.mirror import mirror
+
+    summary = mirror(target, list(paths))
+
+    print(json.dumps(summary, indent=4))
+
+    if summary["failed"]:
+        sys.exit(1)
+
+    return
+
+
 @cli.command("stations")
 @provider_opt
 @kind_opt
@@ -477,6 +595,7 @@ def fields(provider, kind, dataset, resolution, period, language, **kwargs):
     ["rank", "distance"],
 )
 @cloup.option("--pretty", is_flag=True)
+@stats_opt
 @debug_opt
 def stations(
     provider: str,
@@ -495,31 +614,36 @@ def stations(
     fmt: str,
     target: str,
     pretty: bool,
+    stats: bool,
     debug: bool,
 ):
     set_logging_level(debug)
 
     api = get_api(provider=provider, kind=kind)
 
-    stations_ = get_stations(
-        api=api,
-        parameter=parameter,
-        resolution=resolution,
-        period=period,
-        date=None,
-        issue=None,
-        all_=all_,
-        station_id=station,
-        name=name,
-        coordinates=coordinates,
-        rank=rank,
-        distance=distance,
-        bbox=bbox,
-        sql=sql,
-        tidy=False,
-        si_units=False,
-        humanize=False,
-    )
+    with record_network() as network:
+        stations_ = get_stations(
+            api=api,
+            parameter=parameter,
+            resolution=resolution,
+            period=period,
+            date=None,
+            issue=None,
+            all_=all_,
+            station_id=station,
+            name=name,
+            coordinates=coordinates,
+            rank=rank,
+            distance=distance,
+            bbox=bbox,
+            sql=sql,
+            tidy=False,
+            si_units=False,
+            humanize=False,
+        )
+
+    if stats:
+        print_network_stats(network)
 
     if stations_.df.empty:
         log.error("No stations available for given constraints")
@@ -562,6 +686,7 @@ def stations(
 @cloup.option("--si-units", type=click.BOOL, default=True)
 @cloup.option("--humanize", type=click.BOOL, default=True)
 @cloup.option("--pretty", is_flag=True)
+@stats_opt
 @debug_opt
 def values(
     provider: str,
@@ -586,6 +711,7 @@ def values(
     si_units: bool,
     humanize: bool,
     pretty: bool,
+    stats: bool,
     debug: bool,
 ):
     set_logging_level(debug)
@@ -593,30 +719,34 @@ def values(
     api = get_api(provider, kind)
 
     try:
-        values_ = get_values(
-            api=api,
-            parameter=parameter,
-            resolution=resolution,
-            period=period,
-            date=date,
-            issue=issue,
-            all_=all_,
-            station_id=station,
-            name=name,
-            coordinates=coordinates,
-            rank=rank,
-            distance=distance,
-            bbox=bbox,
-            sql=sql,
-            sql_values=sql_values,
-            si_units=si_units,
-            tidy=tidy,
-            humanize=humanize,
-        )
+        with record_network() as network:
+            values_ = get_values(
+                api=api,
+                parameter=parameter,
+                resolution=resolution,
+                period=period,
+                date=date,
+                issue=issue,
+                all_=all_,
+                station_id=station,
+                name=name,
+                coordinates=coordinates,
+                rank=rank,
+                distance=distance,
+                bbox=bbox,
+                sql=sql,
+                sql_values=sql_values,
+                si_units=si_units,
+                tidy=tidy,
+                humanize=humanize,
+            )
     except ValueError as ex:
         log.exception(ex)
         sys.exit(1)
     else:
+        if stats:
+            print_network_stats(network)
+
         if values_.df.empty:
             log.error("No data available for given constraints")
             sys.exit(1)
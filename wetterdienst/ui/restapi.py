@@ -14,6 +14,7 @@ from wetterdienst.core.scalar.request import ScalarRequestCore
 from wetterdienst.exceptions import ProviderError
 from wetterdienst.ui.cli import get_api
 from wetterdienst.ui.core import get_stations, get_values, set_logging_level
+from wetterdienst.util.cache import cache_stats
 from wetterdienst.util.cli import read_list, setup_logging
 
 app = FastAPI(debug=False)
@@ -57,6 +58,7 @@ def index():
                 <li><a href=restapi/coverage>coverage</a></li>
                 <li><a href=restapi/stations>stations</a></li>
                 <li><a href=restapi/values>values</a></li>
+                <li><a href=restapi/cache/stats>cache statistics</a></li>
             </ul>
             <h4>Producer</h4>
             {PRODUCER_NAME} - <a href="{PRODUCER_LINK}">{PRODUCER_LINK}</a></li>
@@ -109,6 +111,13 @@ def coverage(
     return Response(content=json.dumps(cov, indent=4), media_type="application/json")
 
 
+@app.get("/restapi/cache/stats")
+def cache_statistics():
+    return Response(
+        content=json.dumps(cache_stats(), indent=4), media_type="application/json"
+    )
+
+
 @app.get("/restapi/stations")
 def stations(
     provider: str = Query(default=None),
@@ -1,23 +1,69 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
+import atexit
+import functools
+import importlib.util
+import inspect
+import json
 import logging
 import os
 import platform
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Callable, Dict, Mapping, Optional, Union
 
 import appdirs
-from dogpile.cache import make_region
+import pandas as pd
+from dogpile.cache import CacheRegion, register_backend
+from dogpile.cache.api import NO_VALUE
 from dogpile.cache.util import kwarg_function_key_generator
 
+from wetterdienst.metadata.period import Period
+from wetterdienst.metadata.provider import Provider
+from wetterdienst.metadata.resolution import Resolution
+from wetterdienst.util.instrumentation import record_cache_hit
+from wetterdienst.util.store import (
+    Eviction,
+    FileIndexStore,
+    IndexType,
+    MemoryTier,
+    PayloadStore,
+    entry_metadata,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
 log = logging.getLogger()
 
-# Python on Windows has no "fcntl", which is required by the dbm backend.
-# TODO: Make cache backend configurable, e.g. optionally use Redis for running
-#       in multi-threaded environments.
 platform = platform.system()
-backend = "dogpile.cache.dbm"
-if "WD_CACHE_DISABLE" in os.environ or platform == "Windows":
+
+# Cached values are kept as one file per entry, the index file only holds their
+# metadata.
+register_backend(
+    "wetterdienst.filestore", "wetterdienst.util.store", "FileStoreBackend"
+)
+
+# The index is kept in a dbm file by default. Processes sharing the cache
+# directory, e.g. several workers of the REST API, should use "sqlite" instead.
+cache_backend = os.environ.get("WD_CACHE_BACKEND", IndexType.DBM.value).lower()
+
+backend = "wetterdienst.filestore"
+index_type = None
+if "WD_CACHE_DISABLE" in os.environ or cache_backend == "memory":
     backend = "dogpile.cache.memory"
+else:
+    index_type = IndexType(cache_backend)
+
+    # Python on Windows has no "fcntl", which is required by the dbm backend.
+    if index_type == IndexType.DBM and platform == "Windows":
+        backend = "dogpile.cache.memory"
 
 # Compute cache directory.
 try:
@@ -29,59 +75,740 @@ if not os.path.exists(cache_dir):
     os.makedirs(cache_dir)
 log.info("Cache directory is %s", cache_dir)
 
-# Define cache regions.
-metaindex_cache = make_region(
-    function_key_generator=kwarg_function_key_generator
+SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(size: Optional[str]) -> Optional[int]:
+    """
+    Parse a byte size like "500M" or "2G" as given in environment variables.
+
+    :param size: size as string with optional unit suffix
+    :return: size in bytes or None if not given
+    """
+    if not size:
+        return None
+
+    size = size.strip().upper().rstrip("B")
+
+    factor = SIZE_UNITS.get(size[-1:], 1)
+    if factor > 1:
+        size = size[:-1]
+
+    return int(float(size) * factor)
+
+
+def _region_arguments(name: str) -> dict:
+    """
+    Backend arguments of a cache region. The byte budget is read from
+    ``WD_CACHE_MAX_BYTES_<NAME>``, falling back to ``WD_CACHE_MAX_BYTES``, the
+    eviction strategy from ``WD_CACHE_EVICTION``. The index type is taken from
+    ``WD_CACHE_BACKEND``.
+
+    :param name: name of the region, also used for its files
+    :return: dictionary with backend arguments
+    """
+    if backend == "dogpile.cache.memory":
+        return {}
+
+    max_bytes = os.environ.get(
+        f"WD_CACHE_MAX_BYTES_{name.upper()}", os.environ.get("WD_CACHE_MAX_BYTES")
+    )
+
+    return {
+        "filename": os.path.join(cache_dir, f"{name}.{index_type.value}"),
+        "max_bytes": parse_size(max_bytes),
+        "eviction": Eviction(os.environ.get("WD_CACHE_EVICTION", Eviction.LRU.value)),
+        "index": index_type,
+    }
+
+
+@dataclass
+class CacheStats:
+    """ Counters of a cache region """
+
+    hits: int = 0
+    misses: int = 0
+    regeneration_time: float = 0.0
+
+    def __add__(self, other: "CacheStats") -> "CacheStats":
+        return CacheStats(
+            hits=self.hits + other.hits,
+            misses=self.misses + other.misses,
+            regeneration_time=self.regeneration_time + other.regeneration_time,
+        )
+
+
+# Cache regions by name
+regions: Dict[str, "InstrumentedRegion"] = {}
+
+
+class InstrumentedRegion(CacheRegion):
+    """
+    Cache region counting hits and misses of get_or_create(), which also backs
+    cache_on_arguments(), and the time spent regenerating values on misses.
+    """
+
+    def __init__(self, name: str, *args, **kwargs) -> None:
+        super(InstrumentedRegion, self).__init__(name, *args, **kwargs)
+
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+        regions[name] = self
+
+    def get_or_create(self, key, creator, *args, **kwargs):
+        regenerated = False
+
+        def timed_creator(*creator_args, **creator_kwargs):
+            nonlocal regenerated
+
+            start = time.perf_counter()
+            try:
+                return creator(*creator_args, **creator_kwargs)
+            finally:
+                regenerated = True
+                duration = time.perf_counter() - start
+
+                with self._stats_lock:
+                    self.stats.regeneration_time += duration
+
+        value = super(InstrumentedRegion, self).get_or_create(
+            key, timed_creator, *args, **kwargs
+        )
+
+        with self._stats_lock:
+            if regenerated:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+
+        _flush_cache_stats_periodically()
+
+        return value
+
+    def pop_stats(self) -> CacheStats:
+        """ Counters collected since the last call """
+        with self._stats_lock:
+            stats, self.stats = self.stats, CacheStats()
+
+        return stats
+
+
+# Counters of stores outside of the cache regions by name
+stores: Dict[str, "StoreStats"] = {}
+
+
+class StoreStats:
+    """
+    Counters of a store outside of the cache regions, reported along with the
+    regions. Hits and misses are recorded by the users of the store.
+    """
+
+    def __init__(self, name: str, stored_bytes: Callable[[], int]) -> None:
+        self.stored_bytes = stored_bytes
+
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+        stores[name] = self
+
+    def record(self, hit: bool, regeneration_time: float = 0.0) -> None:
+        """
+        Count a lookup of the store.
+
+        :param hit: whether the value was found in the store
+        :param regeneration_time: seconds spent creating the value on a miss
+        """
+        with self._stats_lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+            self.stats.regeneration_time += regeneration_time
+
+        _flush_cache_stats_periodically()
+
+    def pop_stats(self) -> CacheStats:
+        """ Counters collected since the last call """
+        with self._stats_lock:
+            stats, self.stats = self.stats, CacheStats()
+
+        return stats
+
+
+def _memory_tier() -> list:
+    """
+    In-process tier in front of a disk backed cache region, holding up to
+    ``WD_CACHE_MEMORY_BYTES`` (default 64M) of live objects, "0" disables it.
+
+    :return: proxies to wrap the region backend with
+    """
+    if backend == "dogpile.cache.memory":
+        return []
+
+    max_bytes = parse_size(os.environ.get("WD_CACHE_MEMORY_BYTES", "64M"))
+
+    if not max_bytes:
+        return []
+
+    return [MemoryTier(max_bytes)]
+
+
+# Define cache regions. Indexes are kept in memory as well, as they are looked up
+# many times per request.
+metaindex_cache = InstrumentedRegion(
+    name="metaindex", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
     expiration_time=60 * 60 * 12,
-    arguments={"filename": os.path.join(cache_dir, "metaindex.dbm")},
+    arguments=_region_arguments("metaindex"),
+    wrap=_memory_tier(),
 )
 
-fileindex_cache_five_minutes = make_region(
-    function_key_generator=kwarg_function_key_generator
+fileindex_cache_five_minutes = InstrumentedRegion(
+    name="fileindex_5m", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
     expiration_time=60 * 5,
-    arguments={"filename": os.path.join(cache_dir, "fileindex_5m.dbm")},
+    arguments=_region_arguments("fileindex_5m"),
+    wrap=_memory_tier(),
 )
 
-fileindex_cache_one_hour = make_region(
-    function_key_generator=kwarg_function_key_generator
+fileindex_cache_one_hour = InstrumentedRegion(
+    name="fileindex_1h", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
     expiration_time=60 * 60,
-    arguments={"filename": os.path.join(cache_dir, "fileindex_1h.dbm")},
+    arguments=_region_arguments("fileindex_1h"),
+    wrap=_memory_tier(),
 )
 
-fileindex_cache_twelve_hours = make_region(
-    function_key_generator=kwarg_function_key_generator
+payload_cache_five_minutes = InstrumentedRegion(
+    name="payload_5m", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
-    expiration_time=60 * 60 * 12,
-    arguments={"filename": os.path.join(cache_dir, "fileindex_12h.dbm")},
+    expiration_time=60 * 5,
+    arguments=_region_arguments("payload_5m"),
 )
 
-payload_cache_five_minutes = make_region(
-    function_key_generator=kwarg_function_key_generator
+payload_cache_one_hour = InstrumentedRegion(
+    name="payload_1h", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
-    expiration_time=60 * 5,
-    arguments={"filename": os.path.join(cache_dir, "payload_5m.dbm")},
+    expiration_time=60 * 60,
+    arguments=_region_arguments("payload_1h"),
 )
 
-payload_cache_one_hour = make_region(
-    function_key_generator=kwarg_function_key_generator
+payload_cache_twelve_hours = InstrumentedRegion(
+    name="payload_12h", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
-    expiration_time=60 * 60,
-    arguments={"filename": os.path.join(cache_dir, "payload_1h.dbm")},
+    expiration_time=60 * 60 * 12,
+    arguments=_region_arguments("payload_12h"),
 )
 
-payload_cache_twelve_hours = make_region(
-    function_key_generator=kwarg_function_key_generator
+# Resources known to be missing, e.g. urls answered with "404 Not Found", so
+# repeated requests do not ask the server again. The TTL is short, as resources
+# may appear at any time.
+negative_cache = InstrumentedRegion(
+    name="negative", function_key_generator=kwarg_function_key_generator
 ).configure(
     backend,
-    expiration_time=60 * 60 * 12,
-    arguments={"filename": os.path.join(cache_dir, "payload_12h.dbm")},
+    expiration_time=int(os.environ.get("WD_CACHE_NEGATIVE_TTL", 60 * 30)),
+    arguments=_region_arguments("negative"),
 )
+
+
+def remember_missing(key: str) -> None:
+    """
+    Remember that a resource is missing.
+
+    :param key: url or other identifier of the resource
+    """
+    negative_cache.set(key, True)
+
+
+def known_missing(key: str) -> bool:
+    """
+    Whether a resource has recently been found to be missing.
+
+    :param key: url or other identifier of the resource
+    :return: True if the resource is known to be missing
+    """
+    return negative_cache.get(key) is not NO_VALUE
+
+
+def _create_store(name: str) -> Optional[PayloadStore]:
+    """
+    Payload store outside of the dogpile regions, None if caching is in memory.
+
+    :param name: name of the store, also used for its files
+    :return: payload store
+    """
+    if backend == "dogpile.cache.memory":
+        return None
+
+    arguments = _region_arguments(name)
+
+    return PayloadStore(
+        directory=os.path.join(cache_dir, name),
+        index_filename=arguments["filename"],
+        max_bytes=arguments["max_bytes"],
+        eviction=arguments["eviction"],
+        index_type=arguments["index"],
+    )
+
+
+# Parsed data frames in Arrow IPC format, valid as long as the raw file they were
+# parsed from has the same content, as told by a digest of the parsed bytes.
+frame_store = _create_store("frames")
+
+# pyarrow is an optional dependency, without it frames are not cached.
+frame_store_enabled = importlib.util.find_spec("pyarrow") is not None
+
+# Files of remote folders, updated incrementally from new listings of the folders.
+file_index_store = FileIndexStore(
+    None
+    if backend == "dogpile.cache.memory"
+    else os.path.join(cache_dir, "fileindex.sqlite")
+)
+
+frame_store_stats = StoreStats(
+    "frames", lambda: frame_store.stored_bytes() if frame_store else 0
+)
+
+file_index_store_stats = StoreStats("fileindex", file_index_store.stored_bytes)
+
+
+def load_frame(url: str, validator: str) -> Optional[pd.DataFrame]:
+    """
+    Load the frame parsed from the file at url, if it was parsed from the same
+    content of the file.
+
+    :param url: url of the raw file
+    :param validator: validator of the content of the raw file about to be parsed
+    :return: parsed frame or None
+    """
+    if not (frame_store and frame_store_enabled):
+        return None
+
+    stored = frame_store.get(url)
+
+    if not stored:
+        frame_store_stats.record(hit=False)
+        return None
+
+    payload, metadata = stored
+
+    if metadata.get("validator") != validator:
+        payload.close()
+        frame_store_stats.record(hit=False)
+        return None
+
+    import pyarrow as pa
+
+    try:
+        df = pa.ipc.open_file(pa.py_buffer(payload.getbuffer())).read_pandas()
+    except pa.ArrowException:
+        log.warning(f"Cached frame of {url} is corrupted")
+        frame_store_stats.record(hit=False)
+        return None
+    finally:
+        payload.close()
+
+    frame_store_stats.record(hit=True)
+
+    return df
+
+
+def store_frame(url: str, df: pd.DataFrame, validator: str) -> None:
+    """
+    Store the frame parsed from the file at url along with the validator of the
+    content it was parsed from.
+
+    :param url: url of the raw file
+    :param df: parsed frame
+    :param validator: validator of the content of the raw file the frame was
+        parsed from
+    """
+    if not (frame_store and frame_store_enabled) or df.empty:
+        return
+
+    import pyarrow as pa
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, ValueError, TypeError):
+        log.debug(f"Frame of {url} can not be converted to Arrow")
+        return
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    frame_store.set(url, sink.getvalue(), {"validator": validator})
+
+
+# Functions computing the TTL of a cached value from the dataset, resolution and
+# period it belongs to, registered per provider.
+ttl_policies: Dict[Provider, Callable[..., Optional[int]]] = {}
+
+
+def register_ttl_policy(provider: Provider) -> Callable:
+    """
+    Decorator to register the TTL policy of a provider. The policy is called with
+    dataset, resolution and period and returns the TTL in seconds, None to fall back
+    to the expiration time of the cache region.
+
+    :param provider: provider the policy applies to
+    :return: decorator
+    """
+
+    def decorator(policy: Callable[..., Optional[int]]):
+        ttl_policies[provider] = policy
+        return policy
+
+    return decorator
+
+
+def get_ttl(
+    provider: Provider,
+    dataset: Optional[Enum] = None,
+    resolution: Optional[Resolution] = None,
+    period: Optional[Period] = None,
+) -> Optional[int]:
+    """
+    TTL of cached values for given provider, dataset, resolution and period.
+
+    :param provider: provider of the data
+    :param dataset: dataset of the data
+    :param resolution: resolution of the data
+    :param period: period of the data
+    :return: TTL in seconds, None if no policy applies
+    """
+    policy = ttl_policies.get(provider)
+
+    if not policy:
+        return None
+
+    return policy(dataset=dataset, resolution=resolution, period=period)
+
+
+# Validators of the responses received while a cached value is created, by url
+_received_validators: ContextVar[Optional[Dict[str, Dict[str, str]]]] = ContextVar(
+    "wetterdienst_received_validators", default=None
+)
+
+
+def record_validators(url: str, headers: Mapping[str, str]) -> None:
+    """
+    Record the validators (ETag/Last-Modified) of a response, so they are stored
+    next to the cached value created from it.
+
+    :param url: url of the resource
+    :param headers: headers of the response
+    """
+    received = _received_validators.get()
+
+    if received is None:
+        return
+
+    validators = {
+        name: headers[header]
+        for name, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if headers.get(header)
+    }
+
+    if validators:
+        received[url] = validators
+
+
+def cache_on_policy(
+    region: CacheRegion,
+    provider: Provider,
+    should_cache_fn: Optional[Callable] = None,
+    url_argument: Optional[str] = None,
+    revalidate: Optional[Callable[[str, Dict[str, str]], bool]] = None,
+    dataset: Optional[Enum] = None,
+) -> Callable:
+    """
+    Like ``region.cache_on_arguments()``, but with the expiration time taken from
+    the TTL policy of the provider. The dataset (or parameter_set), resolution and
+    period are picked from the arguments of the decorated function.
+
+    With ``revalidate``, the validators (ETag/Last-Modified) of the downloaded file
+    are stored next to the cached value. Once the value expires, the file is
+    revalidated with them and the cached value is kept if the file is unchanged.
+
+    :param region: cache region to store the values in
+    :param provider: provider whose TTL policy applies
+    :param should_cache_fn: function deciding from a created value if it is cached
+    :param url_argument: argument holding the url of a downloaded file, values
+        served from the cache are then recorded as cache hits of the url
+    :param revalidate: function telling from url and validators of the file
+        whether it is unchanged, requires url_argument
+    :param dataset: dataset of all values, for functions without such an argument
+    :return: decorator
+    """
+
+    def decorator(fn: Callable):
+        signature = inspect.signature(fn)
+        generate_key = region.function_key_generator(None, fn)
+
+        @functools.wraps(fn)
+        def decorated(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            arguments = arguments.arguments
+
+            expiration_time = get_ttl(
+                provider,
+                dataset=arguments.get(
+                    "dataset", arguments.get("parameter_set", dataset)
+                ),
+                resolution=arguments.get("resolution"),
+                period=arguments.get("period"),
+            )
+
+            key = generate_key(*args, **kwargs)
+            url = arguments.get(url_argument)
+
+            # Created and revalidated values are recorded by the network access
+            requested = False
+
+            def creator():
+                nonlocal requested
+                requested = True
+
+                store = _get_store(region) if revalidate else None
+
+                if store:
+                    metadata = store.metadata(
+                        region.key_mangler(key) if region.key_mangler else key
+                    )
+                    validators = (metadata or {}).get("validators")
+
+                    if validators and revalidate(url, validators):
+                        stale = region.get(key, ignore_expiration=True)
+
+                        if stale is not NO_VALUE:
+                            log.info(f"Resource {url} not modified, using cached value")
+
+                            entry_metadata.set({"validators": validators})
+
+                            return stale
+
+                token = _received_validators.set({})
+                try:
+                    value = fn(*args, **kwargs)
+
+                    validators = _received_validators.get().get(url)
+                finally:
+                    _received_validators.reset(token)
+
+                if validators:
+                    entry_metadata.set({"validators": validators})
+
+                return value
+
+            # Metadata set by the creator is stored with the value of this key only
+            token = entry_metadata.set({})
+            try:
+                value = region.get_or_create(
+                    key,
+                    creator,
+                    expiration_time=expiration_time,
+                    should_cache_fn=should_cache_fn,
+                )
+            finally:
+                entry_metadata.reset(token)
+
+            if url_argument and not requested:
+                record_cache_hit(url)
+
+            return value
+
+        def invalidate(*args, **kwargs):
+            region.delete(generate_key(*args, **kwargs))
+
+        decorated.invalidate = invalidate
+
+        return decorated
+
+    return decorator
+
+
+def _get_store(region: CacheRegion) -> Optional[PayloadStore]:
+    """ Payload store behind a region, None if the region is held in memory """
+    return getattr(region.actual_backend, "store", None)
+
+
+def set_cache_budget(
+    region: CacheRegion,
+    max_bytes: Optional[int],
+    eviction: Optional[Union[str, Eviction]] = None,
+) -> None:
+    """
+    Set byte budget and eviction strategy of a cache region at runtime.
+
+    :param region: cache region e.g. payload_cache_twelve_hours
+    :param max_bytes: maximum number of stored bytes, None for no limit
+    :param eviction: eviction strategy, "lru" or "lfu"
+    """
+    store = _get_store(region)
+
+    if not store:
+        log.warning("Cache budgets only apply to disk backed cache regions")
+        return
+
+    store.max_bytes = max_bytes
+
+    if eviction:
+        store.eviction = Eviction(eviction)
+
+
+def get_cache_size(region: CacheRegion) -> int:
+    """
+    Number of bytes stored by a cache region.
+
+    :param region: cache region e.g. payload_cache_twelve_hours
+    :return: stored bytes, 0 for regions held in memory
+    """
+    store = _get_store(region)
+
+    if not store:
+        return 0
+
+    return store.stored_bytes()
+
+
+# Counters of all processes are accumulated in this file while they run and when
+# they exit
+cache_stats_filename = os.path.join(cache_dir, "stats.json")
+
+# Seconds after which a running process adds its counters to the stats file
+CACHE_STATS_INTERVAL = float(os.environ.get("WD_CACHE_STATS_INTERVAL", 60))
+
+_last_flush = time.monotonic()
+_flush_lock = threading.Lock()
+
+
+def _update_cache_stats_file(update: Callable[[dict], dict]) -> dict:
+    """
+    Read and rewrite the stats file under an exclusive lock, so that several
+    processes exiting at the same time do not lose counters.
+
+    :param update: function returning the new content from the current one
+    :return: new content
+    """
+    with open(cache_stats_filename, "a+") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+        try:
+            f.seek(0)
+
+            try:
+                content = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                content = {}
+
+            content = update(content)
+
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(content))
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    return content
+
+
+@atexit.register
+def flush_cache_stats() -> None:
+    """ Add the counters of this process to the stats file """
+
+    def update(content: dict) -> dict:
+        for name, counted in {**regions, **stores}.items():
+            stats = CacheStats(**content.get(name, {})) + counted.pop_stats()
+            content[name] = asdict(stats)
+
+        return content
+
+    try:
+        _update_cache_stats_file(update)
+    except OSError as e:  # pragma: no cover
+        log.warning(f"Cache stats could not be written: {e}")
+
+
+def _flush_cache_stats_periodically() -> None:
+    """
+    Add the counters of this process to the stats file once CACHE_STATS_INTERVAL
+    has passed since the last time, so long running processes like workers of the
+    REST API show up in the statistics of other processes.
+    """
+    global _last_flush
+
+    if time.monotonic() - _last_flush < CACHE_STATS_INTERVAL:
+        return
+
+    # Counters are flushed by one thread, the others go on counting
+    if not _flush_lock.acquire(blocking=False):
+        return
+
+    try:
+        if time.monotonic() - _last_flush < CACHE_STATS_INTERVAL:
+            return
+
+        _last_flush = time.monotonic()
+
+        flush_cache_stats()
+    finally:
+        _flush_lock.release()
+
+
+def cache_stats() -> Dict[str, dict]:
+    """
+    Statistics of all cache regions and of the frame and file index stores,
+    accumulated over all processes using the cache directory: hits, misses, hit
+    ratio, seconds spent regenerating values and stored bytes. Counters of the
+    calling process are up to date, those of other running processes lag behind
+    by up to ``WD_CACHE_STATS_INTERVAL`` seconds.
+
+    :return: dictionary of statistics by region or store name
+    """
+    flush_cache_stats()
+
+    content = _update_cache_stats_file(lambda content: content)
+
+    stored_bytes = {
+        **{
+            name: functools.partial(get_cache_size, region)
+            for name, region in regions.items()
+        },
+        **{name: store.stored_bytes for name, store in stores.items()},
+    }
+
+    stats = {}
+    for name, get_stored_bytes in stored_bytes.items():
+        counted_stats = CacheStats(**content.get(name, {}))
+
+        requests = counted_stats.hits + counted_stats.misses
+
+        stats[name] = {
+            **asdict(counted_stats),
+            "hit_ratio": counted_stats.hits / requests if requests else None,
+            "stored_bytes": get_stored_bytes(),
+        }
+
+    return stats
+
+
+def reset_cache_stats() -> None:
+    """ Reset the counters of all cache regions and stores """
+    for counted in {**regions, **stores}.values():
+        counted.pop_stats()
+
+    _update_cache_stats_file(lambda content: {})
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+"""
+Download engine shared by all requests of a process.
+
+Downloads run on a single thread pool, which bounds the number of downloads in
+flight across all stations, periods and concurrent requests by its number of
+workers. The downloads are blocking, so they keep using the caches and the pooled
+connections of the requests sessions.
+"""
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+# Number of downloads in flight at the same time
+DOWNLOAD_CONCURRENCY = int(os.environ.get("WD_DOWNLOAD_CONCURRENCY", 16))
+
+
+class DownloadEngine:
+    """
+    Engine running blocking download functions with a global concurrency limit.
+    The thread pool is started lazily and restarted in forked processes.
+    """
+
+    def __init__(self, concurrency: int = DOWNLOAD_CONCURRENCY) -> None:
+        self.concurrency = concurrency
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Marks threads of the executor, to run nested downloads inline
+        self._local = threading.local()
+
+    def _start(self) -> ThreadPoolExecutor:
+        """ Start the executor, once per process """
+        with self._lock:
+            if self._pid == os.getpid():
+                return self._executor
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix="wetterdienst-download",
+                initializer=self._mark_worker,
+            )
+            self._pid = os.getpid()
+
+            log.debug(f"Started download engine with {self.concurrency} slots")
+
+            return self._executor
+
+    def _mark_worker(self) -> None:
+        self._local.worker = True
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule a download function on the engine.
+
+        :param function: blocking function to run
+        :return: future of the result
+        """
+        if getattr(self._local, "worker", False):
+            # Waiting for the engine from within the engine could exhaust all of
+            # its slots, so nested downloads run right away
+            future = Future()
+            try:
+                future.set_result(function(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        executor = self._start()
+
+        # Downloads run in the context of the caller, e.g. to record network access
+        context = contextvars.copy_context()
+
+        return executor.submit(context.run, function, *args, **kwargs)
+
+    def map(self, function: Callable, items: Iterable) -> List[Any]:
+        """
+        Synchronous wrapper running the function for all items on the engine.
+
+        :param function: blocking function to run
+        :param items: arguments, one call per item
+        :return: results in order of items
+        """
+        futures = [self.submit(function, item) for item in items]
+
+        return [future.result() for future in futures]
+
+
+download_engine = DownloadEngine()
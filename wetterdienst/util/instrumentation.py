@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+"""
+Instrumentation of network access. Within ``record_network()``, every request sent
+by a session of the transport layer is recorded with the bytes received, the time
+to the first byte, the total time and the number of retries. Files served from the
+caches without a download are recorded as cache hits.
+
+Reports are held in a context variable, so requests of the download engine and of
+prefetching threads are attributed to the report of the calling code. Reports can
+be nested, records of an inner report are added to the outer ones as well.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+
+@dataclass
+class NetworkRecord:
+    """ Network access of a single request """
+
+    url: str
+    method: str = "GET"
+    status: Optional[int] = None
+    bytes: int = 0
+    time_to_first_byte: float = 0.0
+    total_time: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """ Bytes per second of the transfer """
+        if not self.bytes or not self.total_time:
+            return None
+
+        return self.bytes / self.total_time
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "throughput": self.throughput}
+
+
+class NetworkReport:
+    """ Records of the network access within record_network() """
+
+    def __init__(self, parent: Optional["NetworkReport"] = None) -> None:
+        self.parent = parent
+        self.records: List[NetworkRecord] = []
+
+        self._lock = threading.Lock()
+
+    def add(self, record: NetworkRecord) -> None:
+        report = self
+        while report:
+            with report._lock:
+                report.records.append(record)
+
+            report = report.parent
+
+    def summary(self) -> Dict[str, float]:
+        """ Totals over all records """
+        with self._lock:
+            records = list(self.records)
+
+        total_bytes = sum(record.bytes for record in records)
+        total_time = sum(record.total_time for record in records)
+
+        return {
+            "requests": sum(not record.cache_hit for record in records),
+            "cache_hits": sum(record.cache_hit for record in records),
+            "bytes": total_bytes,
+            "total_time": total_time,
+            "throughput": total_bytes / total_time if total_time else None,
+            "retries": sum(record.retries for record in records),
+        }
+
+    def by_url(self) -> Dict[str, dict]:
+        """ Records aggregated per url, in order of first access """
+        urls = {}
+
+        with self._lock:
+            records = list(self.records)
+
+        for record in records:
+            stats = urls.setdefault(
+                record.url,
+                {
+                    "requests": 0,
+                    "cache_hits": 0,
+                    "bytes": 0,
+                    "time_to_first_byte": 0.0,
+                    "total_time": 0.0,
+                    "retries": 0,
+                },
+            )
+
+            if record.cache_hit:
+                stats["cache_hits"] += 1
+            else:
+                stats["requests"] += 1
+
+            stats["bytes"] += record.bytes
+            stats["time_to_first_byte"] += record.time_to_first_byte
+            stats["total_time"] += record.total_time
+            stats["retries"] += record.retries
+
+        return urls
+
+    def to_dict(self) -> dict:
+        return {"summary": self.summary(), "urls": self.by_url()}
+
+
+_report: ContextVar[Optional[NetworkReport]] = ContextVar(
+    "wetterdienst_network_report", default=None
+)
+
+
+@contextmanager
+def record_network() -> Iterator[NetworkReport]:
+    """
+    Record the network access of the enclosed code.
+
+    :return: report, filled while the enclosed code runs
+    """
+    report = NetworkReport(parent=_report.get())
+
+    token = _report.set(report)
+    try:
+        yield report
+    finally:
+        _report.reset(token)
+
+
+def record_cache_hit(url: str) -> None:
+    """
+    Record a file served without a download.
+
+    :param url: url of the file
+    """
+    report = _report.get()
+
+    if report:
+        report.add(NetworkRecord(url=url, cache_hit=True))
+
+
+def record_response(response: requests.Response, *args, **kwargs) -> None:
+    """
+    Response hook of the sessions of the transport layer, recording the request.
+    The bytes of the body are counted while it is read, which for responses that
+    are not streamed happens right after this hook.
+    """
+    report = _report.get()
+
+    if not report:
+        return
+
+    time_to_first_byte = response.elapsed.total_seconds()
+    start = time.perf_counter() - time_to_first_byte
+
+    retries = getattr(response.raw, "retries", None)
+
+    record = NetworkRecord(
+        url=response.url,
+        method=response.request.method if response.request else "GET",
+        status=response.status_code,
+        time_to_first_byte=time_to_first_byte,
+        total_time=time_to_first_byte,
+        retries=len(retries.history) if retries else 0,
+        cache_hit=response.status_code == requests.codes.not_modified,
+    )
+
+    iter_content = response.iter_content
+
+    def counted_iter_content(*args, **kwargs):
+        for chunk in iter_content(*args, **kwargs):
+            record.bytes += len(chunk)
+            record.total_time = time.perf_counter() - start
+
+            yield chunk
+
+    response.iter_content = counted_iter_content
+
+    report.add(record)
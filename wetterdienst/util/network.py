@@ -1,53 +1,539 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2018-2021, earthobservations developers.
 # Distributed under the MIT License. See LICENSE for more info.
-from typing import List
+import html
+import io
+import logging
+import re
+import tempfile
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from io import BytesIO
+from typing import IO, Callable, Dict, List, NamedTuple, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
 
-session = requests.Session()
+from wetterdienst.util.cache import known_missing, record_validators, remember_missing
+from wetterdienst.util.engine import download_engine
+from wetterdienst.util.instrumentation import record_cache_hit
+from wetterdienst.util.transport import create_session
 
+log = logging.getLogger(__name__)
 
-def list_remote_files(url: str, recursive: bool) -> List[str]:
+session = create_session()
+
+# Bytes requested from the end of a resource, which holds e.g. the central
+# directory of a ZIP archive
+RANGE_TAIL_SIZE = 64 * 1024 + 22
+
+# Minimum number of bytes requested for a read that is not buffered yet
+RANGE_MIN_FETCH = 16 * 1024
+
+# Bounds of the chunk size of streamed downloads, depending on their size
+STREAM_MIN_CHUNK_SIZE = 64 * 1024
+STREAM_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Attempts to resume an interrupted download
+STREAM_RESUME_ATTEMPTS = 5
+
+CONTENT_RANGE_REGEX = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+# Links of directory listings with the text up to the next link
+LISTING_LINK_REGEX = re.compile(
+    r"<a\s[^>]*?href=\"(?P<href>[^\"]+)\"[^>]*>.*?</a>(?P<details>.*?)(?=<a\s|\Z)",
+    re.IGNORECASE | re.DOTALL,
+)
+LISTING_TAG_REGEX = re.compile(r"<[^>]+>")
+LISTING_DETAILS_REGEX = re.compile(
+    r"(?P<date>\d{2}-\w{3}-\d{4} \d{2}:\d{2}|\d{4}-\d{2}-\d{2} \d{2}:\d{2})"
+    r"(?::\d{2})?\s+(?P<size>-|\d+(?:\.\d+)?[KMGT]?)"
+)
+LISTING_SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+class _InFlight:
+    """ Request in flight, shared with callers requesting the same url meanwhile """
+
+    def __init__(self) -> None:
+        self.future = Future()
+        self.waiters = 0
+
+
+_in_flight: Dict[str, _InFlight] = {}
+_in_flight_lock = threading.Lock()
+
+
+def coalesced_get(url: str, session_: Optional[requests.Session] = None) -> BytesIO:
     """
-    A function used to create a listing of all files of a given path on the server
+    Function to request a resource. Resources answered with "404 Not Found" are not
+    requested again until the negative cache expires. The validators of the
+    response (ETag/Last-Modified) are recorded for the cached value being created,
+    so it can be revalidated once it expires.
 
-    Args:
-        url: the url which should be searched for files
-        recursive: definition if the function should iteratively list files
-        from sub folders
+    Concurrent requests of the same url are coalesced: threads wait for the request
+    in flight. Processes sharing the cache wait for each other on the lock of the
+    cache entry the resource is stored in, which is only held while the resource
+    is downloaded and stored.
 
-    Returns:
-        a list of strings representing the files from the path
+    :param url: the url of the resource
+    :param session_: session used for the request, defaults to the module session
+    :return: file object with the content of the resource
     """
+    with _in_flight_lock:
+        in_flight = _in_flight.get(url)
 
-    if not url.endswith("/"):
-        url += "/"
+        owner = in_flight is None
+        if owner:
+            in_flight = _in_flight[url] = _InFlight()
+        else:
+            in_flight.waiters += 1
+
+    if not owner:
+        log.info(f"Waiting for request of {url} in flight")
+
+        content, headers = in_flight.future.result()
+
+        record_cache_hit(url)
+        record_validators(url, headers)
+
+        return BytesIO(content)
+
+    try:
+        r = _get(url, session_)
+    except Exception as e:
+        with _in_flight_lock:
+            del _in_flight[url]
+
+        in_flight.future.set_exception(e)
+
+        raise
+
+    with _in_flight_lock:
+        del _in_flight[url]
+
+    in_flight.future.set_result((r.content, r.headers) if in_flight.waiters else None)
+
+    record_validators(url, r.headers)
+
+    return BytesIO(r.content)
+
+
+def _get(url: str, session_: Optional[requests.Session] = None) -> requests.Response:
+    """ Implementation of coalesced_get for a single caller """
+    session_ = session_ or session
+
+    # Do not ask again for resources that recently did not exist
+    if known_missing(url):
+        log.info(f"Resource {url} is known to be missing")
+
+        record_cache_hit(url)
+
+        r = requests.Response()
+        r.status_code = requests.codes.not_found
+        r.reason = "Not Found (cached)"
+        r.url = url
+        r.raise_for_status()
+
+    r = session_.get(url)
+
+    if r.status_code == requests.codes.not_found:
+        remember_missing(url)
 
-    r = session.get(url)
     r.raise_for_status()
 
-    soup = BeautifulSoup(r.text, "lxml")
+    return r
+
+
+def revalidate(
+    url: str, validators: Dict[str, str], session_: Optional[requests.Session] = None
+) -> bool:
+    """
+    Function to check with a conditional request whether a resource is unchanged
+    since it was received with the given validators (ETag/Last-Modified). An
+    unchanged resource only costs a "304 Not Modified" round-trip, of a changed
+    one only the headers are read.
+
+    :param url: the url of the resource
+    :param validators: validators recorded with the resource
+    :param session_: session used for the request, defaults to the module session
+    :return: True if the resource is not modified
+    """
+    session_ = session_ or session
+
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    if not headers:
+        return False
+
+    try:
+        r = session_.get(url, headers=headers, stream=True)
+    except requests.exceptions.RequestException as e:
+        log.info(f"Revalidation of {url} failed: {e}")
+        return False
+
+    r.close()
+
+    return r.status_code == requests.codes.not_modified
+
+
+def stream_download(
+    url: str,
+    session_: Optional[requests.Session] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> IO[bytes]:
+    """
+    Function to download a large resource in chunks into a temporary file on disk.
+    Unlike a SpooledTemporaryFile before Python 3.11, the file is seekable, as
+    required e.g. by ``zipfile``. An interrupted download is resumed with a HTTP
+    Range request from the bytes received so far, and the download is checked to
+    be complete against the Content-Length of the resource.
+
+    :param url: the url of the resource
+    :param session_: session used for the requests, defaults to the module session
+    :param progress: function called with the number of bytes of every chunk
+    :return: file object with the content of the resource
+    """
+    session_ = session_ or session
+
+    r = session_.get(url, stream=True)
+    r.raise_for_status()
+
+    record_validators(url, r.headers)
+
+    # The length of encoded content does not match the decoded chunks
+    total = None
+    if "Content-Length" in r.headers and "Content-Encoding" not in r.headers:
+        total = int(r.headers["Content-Length"])
+
+    # Larger resources are read in larger chunks
+    chunk_size = min(
+        max((total or 0) // 100, STREAM_MIN_CHUNK_SIZE), STREAM_MAX_CHUNK_SIZE
+    )
+
+    # Resume only from the same version of the resource
+    validator = r.headers.get("ETag") or r.headers.get("Last-Modified")
+
+    spool = tempfile.TemporaryFile()
+
+    attempts = 0
+    while True:
+        try:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                spool.write(chunk)
+
+                if progress:
+                    progress(len(chunk))
+
+            received = spool.tell()
+
+            if total is None or received == total:
+                break
+
+            if received > total:
+                raise IOError(
+                    f"Download of {url} exceeds its length: {received} of {total} bytes"
+                )
+
+            reason = f"{received} of {total} bytes received"
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            reason = str(e)
+        finally:
+            r.close()
+
+        attempts += 1
+        if attempts > STREAM_RESUME_ATTEMPTS:
+            raise IOError(f"Download of {url} failed: {reason}")
+
+        received = spool.tell()
+
+        log.info(f"Download of {url} interrupted ({reason}), resuming at {received}")
+
+        headers = {"Range": f"bytes={received}-"}
+        if validator:
+            headers["If-Range"] = validator
+
+        r = session_.get(url, headers=headers, stream=True)
+        r.raise_for_status()
+
+        match = CONTENT_RANGE_REGEX.match(r.headers.get("Content-Range", ""))
+
+        if r.status_code != requests.codes.partial_content or not match:
+            # The resource changed or ranges are not supported, start over
+            spool.seek(0)
+            spool.truncate()
+        elif int(match.group(1)) != received:
+            raise IOError(f"Server resumed download of {url} at the wrong position")
+
+    spool.seek(0)
+
+    return spool
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Seekable, read-only file of a remote resource, which only requests the byte
+    ranges that are actually read with HTTP Range requests. When the server does not
+    support ranges, the whole resource is downloaded with the first request.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        session_: Optional[requests.Session] = None,
+        tail_size: int = RANGE_TAIL_SIZE,
+    ) -> None:
+        """
+        :param url: the url of the resource
+        :param session_: session used for the requests, defaults to the module session
+        :param tail_size: number of bytes requested from the end right away
+        """
+        super().__init__()
 
-    files_and_folders = [
-        link.get("href") for link in soup.find_all("a") if link.get("href") != "../"
-    ]
+        self.url = url
+        self.session = session_ or session
 
+        # Buffered byte ranges by their start offset
+        self._segments: Dict[int, bytes] = {}
+        self._position = 0
+
+        r = self.session.get(url, headers={"Range": f"bytes=-{tail_size}"})
+        r.raise_for_status()
+
+        record_validators(url, r.headers)
+
+        match = CONTENT_RANGE_REGEX.match(r.headers.get("Content-Range", ""))
+
+        if r.status_code == requests.codes.partial_content and match:
+            self.ranged = True
+            self.size = int(match.group(3))
+            self._segments[int(match.group(1))] = r.content
+        else:
+            log.info(f"Server does not support ranges for {url}, downloaded in full")
+
+            self.ranged = False
+            self.size = len(r.content)
+            self._segments[0] = r.content
+
+        self.transferred_bytes = len(r.content)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+
+        self._position = max(offset, 0)
+
+        return self._position
+
+    def fetch(self, start: int, end: int) -> None:
+        """
+        Request a byte range in advance, so reads within it are served from memory.
+
+        :param start: first byte of the range
+        :param end: last byte of the range, inclusive
+        """
+        end = min(end, self.size - 1)
+
+        if start > end or self._find(start, end + 1 - start) is not None:
+            return
+
+        r = self.session.get(self.url, headers={"Range": f"bytes={start}-{end}"})
+        r.raise_for_status()
+
+        if r.status_code != requests.codes.partial_content:
+            raise IOError(f"Server ignored the requested range of {self.url}")
+
+        self._segments[start] = r.content
+        self.transferred_bytes += len(r.content)
+
+    def _find(self, start: int, size: int) -> Optional[bytes]:
+        """ Buffered bytes from start of given size, if fully buffered """
+        for segment_start, segment in self._segments.items():
+            offset = start - segment_start
+
+            if 0 <= offset and offset + size <= len(segment):
+                return segment[offset : offset + size]
+
+        return None
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._position
+
+        size = max(min(size, self.size - self._position), 0)
+
+        if size == 0:
+            return b""
+
+        data = self._find(self._position, size)
+
+        if data is None:
+            self.fetch(self._position, self._position + max(size, RANGE_MIN_FETCH) - 1)
+
+            data = self._find(self._position, size)
+
+        self._position += len(data)
+
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+
+        return len(data)
+
+
+class ListedFile(NamedTuple):
+    """ File of a remote directory listing """
+
+    url: str
+    # Size in bytes, approximated for sizes listed like "1.2K"
+    size: Optional[int]
+    # Modification time as listed by the server
+    modified: Optional[datetime]
+
+
+def _parse_size(size: str) -> Optional[int]:
+    """ Parse size of a listing, either in bytes or abbreviated like "1.2K" """
+    if size == "-":
+        return None
+
+    multiplier = LISTING_SIZE_UNITS.get(size[-1].upper(), 1)
+    if size[-1].isalpha():
+        size = size[:-1]
+
+    return int(float(size) * multiplier)
+
+
+def _parse_listing(url: str, listing: str) -> Tuple[List[ListedFile], List[str]]:
+    """
+    Parse an Apache or nginx style directory listing into files and sub folders.
+    Links are matched directly in the markup, no document tree is built.
+
+    :param url: the url of the listed folder
+    :param listing: markup of the listing
+    :return: files and urls of sub folders of the folder
+    """
     files = []
     folders = []
 
-    for f in files_and_folders:
-        if not f.endswith("/"):
-            files.append(urljoin(url, f))
-        else:
-            folders.append(urljoin(url, f))
+    for match in LISTING_LINK_REGEX.finditer(listing):
+        href = html.unescape(match.group("href"))
+
+        # Skip parent directory and sorting links
+        if href.startswith(("../", "?")):
+            continue
+
+        link = urljoin(url, href)
+
+        if href.endswith("/"):
+            # Only descend into the folder, not to links outside of it
+            if link.startswith(url) and link != url:
+                folders.append(link)
+            continue
+
+        size = modified = None
+
+        # Date and size follow the link, possibly within table cells
+        details = LISTING_DETAILS_REGEX.search(
+            LISTING_TAG_REGEX.sub(" ", match.group("details"))
+        )
+
+        if details:
+            date = details.group("date")
+            modified = datetime.strptime(
+                date, "%d-%b-%Y %H:%M" if date[2] == "-" else "%Y-%m-%d %H:%M"
+            )
+            size = _parse_size(details.group("size"))
+
+        files.append(ListedFile(link, size, modified))
+
+    return files, folders
+
+
+def _list_folder(url: str) -> Tuple[List[ListedFile], List[str]]:
+    """ Request and parse the listing of a single folder """
+    listing = coalesced_get(url)
+
+    return _parse_listing(url, listing.getvalue().decode("utf-8", errors="replace"))
+
+
+def crawl_remote_files(url: str, recursive: bool) -> List[ListedFile]:
+    """
+    A function used to create a listing of all files of a given path on the server,
+    including size and modification time of every file. With recursive, all
+    folders of a level of the directory tree are listed concurrently on the
+    download engine.
+
+    :param url: the url which should be searched for files
+    :param recursive: definition if the function should iteratively list files
+        from sub folders
+    :return: files of the path, ordered like the listings
+    """
+    if not url.endswith("/"):
+        url += "/"
+
+    listings = {}
+
+    level = [url]
+    while level:
+        listings.update(zip(level, download_engine.map(_list_folder, level)))
+
+        if not recursive:
+            break
+
+        level = list(
+            dict.fromkeys(
+                folder
+                for folder_url in level
+                for folder in listings[folder_url][1]
+                if folder not in listings
+            )
+        )
+
+    def collect(folder_url: str) -> List[ListedFile]:
+        files, folders = listings[folder_url]
 
-    if recursive:
-        files_in_folders = [list_remote_files(folder, recursive) for folder in folders]
+        files = list(files)
 
-        for files_in_folder in files_in_folders:
-            files.extend(files_in_folder)
+        if recursive:
+            for folder in folders:
+                files.extend(collect(folder))
 
-    return files
+        return files
+
+    return collect(url)
+
+
+def list_remote_files(url: str, recursive: bool) -> List[str]:
+    """
+    A function used to create a listing of all files of a given path on the server
+
+    Args:
+        url: the url which should be searched for files
+        recursive: definition if the function should iteratively list files
+        from sub folders
+
+    Returns:
+        a list of strings representing the files from the path
+    """
+    return [file.url for file in crawl_remote_files(url, recursive)]
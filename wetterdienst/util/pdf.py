@@ -4,12 +4,13 @@
 from io import BytesIO, StringIO
 
 import PyPDF2
-import requests
+
+from wetterdienst.util.transport import create_session
 
 
 def read_pdf(url):
     text = StringIO()
-    response = requests.get(url)
+    response = create_session().get(url)
     pdf = PyPDF2.PdfFileReader(BytesIO(response.content))
     for page_number in range(pdf.numPages):
         page = pdf.getPage(page_number)
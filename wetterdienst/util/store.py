@@ -0,0 +1,1154 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+"""
+Content-addressed on-disk store for downloaded payloads.
+
+Every payload is written to its own file, named by the SHA-256 hash of its cache
+key, while a small dbm or SQLite index keeps the metadata. Reading a payload
+memory-maps the file instead of unpickling and copying it.
+"""
+import dbm
+import hashlib
+import io
+import logging
+import mmap
+import os
+import pickle  # noqa: S403
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from dogpile.cache.api import NO_VALUE, CacheBackend, CachedValue
+from dogpile.cache.proxy import ProxyBackend
+
+log = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# Metadata stored along with the values dogpile.cache sets in the current context,
+# e.g. the validators of the response a value was created from
+entry_metadata: ContextVar[Dict[str, Any]] = ContextVar(
+    "wetterdienst_entry_metadata", default={}
+)
+
+
+class MappedPayload(io.BufferedIOBase):
+    """
+    Read-only, seekable file object over a memory-mapped payload file. Mimics the
+    reading part of ``io.BytesIO``, so it can be handed to ``zipfile``, ``gzip``,
+    ``tarfile`` or ``pandas`` without copying the payload into memory first.
+    """
+
+    def __init__(self, path: str) -> None:
+        super(MappedPayload, self).__init__()
+
+        self.name = path
+        self._position = 0
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+
+            # Empty files can not be memory-mapped
+            if size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b""
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._map) + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+
+        self._position = position
+
+        return position
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            end = len(self._map)
+        else:
+            end = min(self._position + size, len(self._map))
+
+        data = self._map[self._position : end]
+
+        self._position = max(self._position, end)
+
+        return bytes(data)
+
+    read1 = read
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+
+        buffer[: len(data)] = data
+
+        return len(data)
+
+    def getvalue(self) -> bytes:
+        return bytes(self._map[:])
+
+    def getbuffer(self) -> memoryview:
+        return memoryview(self._map)
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # Exported buffers are still alive, the map is released with them
+                pass
+
+        super(MappedPayload, self).close()
+
+
+class Eviction(Enum):
+    """ Strategies to pick payloads for eviction once a store exceeds its budget """
+
+    LRU = "lru"  # least recently used
+    LFU = "lfu"  # least frequently used
+
+
+class IndexType(Enum):
+    """ Storage of the metadata index of a payload store """
+
+    DBM = "dbm"  # single writer, guarded by file locks
+    SQLITE = "sqlite"  # concurrent readers and writers across processes (WAL)
+
+
+# Reserved index key holding the running total of stored bytes
+STORED_BYTES_KEY = "__stored_bytes__"
+
+# Fraction of the budget the store is shrunk to when evicting, so that eviction
+# does not have to run again on the very next write
+EVICTION_LOW_WATERMARK = 0.9
+
+# Seconds to wait for a locked SQLite database before giving up
+SQLITE_BUSY_TIMEOUT = 30
+
+# Seconds after which a regeneration lock is considered abandoned, e.g. by a
+# killed worker, and seconds between attempts to acquire a held lock
+MUTEX_TIMEOUT = 60 * 5
+MUTEX_POLL_INTERVAL = 0.1
+
+
+class SqliteIndex:
+    """
+    Mapping interface over the records table of a SQLite index, matching the
+    subset of the dbm interface used by :class:`PayloadStore`.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.connection.execute(
+            "SELECT value FROM records WHERE key = ?", (key,)
+        ).fetchone()
+
+        return row[0] if row else default
+
+    def __setitem__(self, key: str, value: Union[bytes, str]) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO records (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def __delitem__(self, key: str) -> None:
+        self.connection.execute("DELETE FROM records WHERE key = ?", (key,))
+
+    def keys(self):
+        return [row[0] for row in self.connection.execute("SELECT key FROM records")]
+
+
+class SqliteMutex:
+    """
+    Lock for a single key, shared by all processes using the same SQLite index.
+    Used by dogpile.cache, so only one worker regenerates an expired value while
+    the others wait for it.
+    """
+
+    def __init__(self, store: "PayloadStore", key: str) -> None:
+        self.store = store
+        self.key = key
+        self.owner = None
+
+    def acquire(self, wait: bool = True) -> bool:
+        owner = f"{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex}"
+
+        while True:
+            now = time.time()
+
+            with self.store._connection(write=True) as connection:
+                # Take over locks of workers that died while holding them
+                connection.execute(
+                    "DELETE FROM locks WHERE key = ? AND acquired < ?",
+                    (self.key, now - MUTEX_TIMEOUT),
+                )
+
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO locks (key, owner, acquired) "
+                    "VALUES (?, ?, ?)",
+                    (self.key, owner, now),
+                )
+
+            if cursor.rowcount:
+                self.owner = owner
+                return True
+
+            if not wait:
+                return False
+
+            time.sleep(MUTEX_POLL_INTERVAL)
+
+    def release(self) -> None:
+        with self.store._connection(write=True) as connection:
+            connection.execute(
+                "DELETE FROM locks WHERE key = ? AND owner = ?", (self.key, self.owner)
+            )
+
+        self.owner = None
+
+    def locked(self) -> bool:
+        with self.store._connection() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM locks WHERE key = ? AND acquired >= ?",
+                (self.key, time.time() - MUTEX_TIMEOUT),
+            ).fetchone()
+
+        return row is not None
+
+
+class FileMutex:
+    """
+    Lock for a single key, shared by all processes using the same dbm index by an
+    advisory lock on a file named by the hash of the key. The file is opened anew
+    for every acquisition, so threads of one process exclude each other as well,
+    while locks of other keys never block. The file is removed along with the
+    payload of the key.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+
+    def acquire(self, wait: bool = True) -> bool:
+        while True:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+            lock_file = open(self.path, "a")
+
+            try:
+                fcntl.flock(
+                    lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB
+                )
+            except BlockingIOError:
+                lock_file.close()
+                return False
+
+            # The file may have been removed while waiting for its lock, then the
+            # lock is taken on the file now at the path
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = None
+
+            if current == os.fstat(lock_file.fileno()).st_ino:
+                self._file = lock_file
+
+                return True
+
+            lock_file.close()
+
+    def release(self) -> None:
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+        self._file = None
+
+    def locked(self) -> bool:
+        if not self.acquire(wait=False):
+            return True
+
+        self.release()
+
+        return False
+
+    def remove(self) -> None:
+        """ Remove the lock file, unless the lock is held right now """
+        if not os.path.exists(self.path) or not self.acquire(wait=False):
+            return
+
+        try:
+            os.unlink(self.path)
+        finally:
+            self.release()
+
+
+class PayloadStore:
+    """
+    Store writing one file per payload below ``directory``, addressed by the hash
+    of its key, and keeping the metadata of all payloads in an index file.
+
+    If ``max_bytes`` is given, the store evicts payloads, by least recent or
+    least frequent use, as soon as the stored bytes exceed that budget.
+
+    The dbm index allows a single writer at a time. The SQLite index runs in WAL
+    mode, so it can be shared by several processes, e.g. workers of the REST API.
+    Both provide cross-process locks of single keys by :meth:`get_mutex`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        index_filename: str,
+        max_bytes: Optional[int] = None,
+        eviction: Eviction = Eviction.LRU,
+        index_type: IndexType = IndexType.DBM,
+    ) -> None:
+        self.directory = directory
+        self.index_filename = index_filename
+        self.max_bytes = max_bytes
+        self.eviction = Eviction(eviction)
+        self.index_type = IndexType(index_type)
+
+        self._lock = threading.RLock()
+        self._lock_filename = f"{index_filename}.lock"
+
+        # SQLite connections can neither be shared by threads nor survive a fork
+        self._local = threading.local()
+
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def digest(key: str) -> str:
+        """ Hash used to address the payload file of a key """
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def path(self, digest: str) -> str:
+        """ Path of payload file, sharded by the first two characters of its hash """
+        return os.path.join(self.directory, digest[:2], digest)
+
+    @contextmanager
+    def _connection(self, write: bool = False):
+        """
+        Connection to the SQLite index of the current thread and process. Writes
+        run in an immediate transaction, which is committed on exit.
+        """
+        pid, connection = getattr(self._local, "connection", (None, None))
+
+        if pid != os.getpid():
+            connection = sqlite3.connect(
+                self.index_filename,
+                timeout=SQLITE_BUSY_TIMEOUT,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, value BLOB)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS locks "
+                "(key TEXT PRIMARY KEY, owner TEXT, acquired REAL)"
+            )
+
+            self._local.connection = (os.getpid(), connection)
+
+        if not write:
+            yield connection
+            return
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+
+    @contextmanager
+    def _index(self, flag: str):
+        """
+        Open the index. The dbm index is guarded by a thread lock and, where
+        available, an advisory file lock for concurrent processes, the SQLite
+        index by its own locking.
+        """
+        if self.index_type == IndexType.SQLITE:
+            with self._connection(write=flag != "r") as connection:
+                yield SqliteIndex(connection)
+            return
+
+        with self._lock:
+            lock_file = None
+
+            if fcntl:
+                lock_file = open(self._lock_filename, "a+")
+                fcntl.flock(lock_file, fcntl.LOCK_SH if flag == "r" else fcntl.LOCK_EX)
+
+            try:
+                try:
+                    index = dbm.open(self.index_filename, flag)
+                except dbm.error:
+                    if flag != "r":
+                        raise
+
+                    # Index does not exist yet
+                    index = None
+
+                try:
+                    yield index if index is not None else {}
+                finally:
+                    if index is not None:
+                        index.close()
+            finally:
+                if lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+
+    @staticmethod
+    def _load_record(raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        if raw is None:
+            return None
+
+        try:
+            record = pickle.loads(raw)  # noqa: S301
+        except Exception:
+            return None
+
+        # Records from other backends sharing the filename are not ours
+        if not isinstance(record, dict) or "digest" not in record:
+            return None
+
+        return record
+
+    @staticmethod
+    def _get_stored_bytes(index) -> int:
+        return int(index.get(STORED_BYTES_KEY, 0))
+
+    @staticmethod
+    def _set_stored_bytes(index, stored_bytes: int) -> None:
+        index[STORED_BYTES_KEY] = str(max(stored_bytes, 0))
+
+    def stored_bytes(self) -> int:
+        """ Number of payload bytes currently held by the store """
+        with self._index("r") as index:
+            return self._get_stored_bytes(index)
+
+    def get(self, key: str) -> Optional[Tuple[MappedPayload, Dict[str, Any]]]:
+        """
+        Get payload and metadata stored for key. Accessing a payload counts as use
+        for the eviction strategy.
+
+        :param key: key of payload
+        :return: memory-mapped payload and its metadata or None if not stored
+        """
+        with self._index("r") as index:
+            record = self._load_record(index.get(key))
+
+        if not record:
+            return None
+
+        try:
+            payload = MappedPayload(self.path(record["digest"]))
+        except FileNotFoundError:
+            log.warning(f"Payload file for {key} is missing")
+            return None
+
+        if self.max_bytes:
+            self._touch(key)
+
+        return payload, record["metadata"]
+
+    def metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get only the metadata stored for key, without accessing the payload.
+
+        :param key: key of payload
+        :return: metadata or None if not stored
+        """
+        with self._index("r") as index:
+            record = self._load_record(index.get(key))
+
+        return record["metadata"] if record else None
+
+    def update_metadata(self, key: str, metadata: Dict[str, Any]) -> bool:
+        """
+        Replace the metadata stored for key, keeping its payload.
+
+        :param key: key of payload
+        :param metadata: small dictionary stored in the index next to the payload
+        :return: False if nothing is stored for key
+        """
+        with self._index("w") as index:
+            record = self._load_record(index.get(key))
+
+            if not record:
+                return False
+
+            record["metadata"] = metadata
+
+            index[key] = pickle.dumps(record)
+
+        return True
+
+    def _touch(self, key: str) -> None:
+        """ Record access of payload for the eviction strategy """
+        with self._index("w") as index:
+            record = self._load_record(index.get(key))
+
+            if not record:
+                return
+
+            record["accessed"] = time.time()
+            record["hits"] = record.get("hits", 0) + 1
+
+            index[key] = pickle.dumps(record)
+
+    def set(
+        self,
+        key: str,
+        data: Union[bytes, bytearray, memoryview, IO[bytes]],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Store payload and its metadata for key. The payload file is written to a
+        temporary file first and then moved into place to keep readers consistent.
+
+        :param key: key of payload
+        :param data: payload, or file object the payload is copied from
+        :param metadata: small dictionary stored in the index next to the payload
+        """
+        digest = self.digest(key)
+        path = self.path(digest)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if hasattr(data, "read"):
+                    shutil.copyfileobj(data, f)
+                else:
+                    f.write(data)
+
+                size = f.tell()
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        now = time.time()
+
+        record = {
+            "digest": digest,
+            "size": size,
+            "metadata": metadata or {},
+            "created": now,
+            "accessed": now,
+            "hits": 0,
+        }
+
+        with self._index("c") as index:
+            previous = self._load_record(index.get(key))
+
+            stored_bytes = self._get_stored_bytes(index) + record["size"]
+            if previous:
+                stored_bytes -= previous["size"]
+
+            index[key] = pickle.dumps(record)
+
+            if self.max_bytes and stored_bytes > self.max_bytes:
+                stored_bytes = self._evict(index, stored_bytes, keep=key)
+
+            self._set_stored_bytes(index, stored_bytes)
+
+    def _evict(self, index, stored_bytes: int, keep: str) -> int:
+        """
+        Remove payloads until the store is back below its low watermark.
+
+        :param index: opened index
+        :param stored_bytes: currently stored bytes
+        :param keep: key that must not be evicted, usually the one just written
+        :return: stored bytes after eviction
+        """
+        records = []
+        for key in index.keys():
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+
+            if key in (STORED_BYTES_KEY, keep):
+                continue
+
+            record = self._load_record(index.get(key))
+            if record:
+                records.append((key, record))
+
+        if self.eviction == Eviction.LFU:
+            records.sort(key=lambda item: (item[1]["hits"], item[1]["accessed"]))
+        else:
+            records.sort(key=lambda item: item[1]["accessed"])
+
+        target = self.max_bytes * EVICTION_LOW_WATERMARK
+
+        evicted = 0
+        for key, record in records:
+            if stored_bytes <= target:
+                break
+
+            del index[key]
+
+            self._remove(record["digest"])
+
+            stored_bytes -= record["size"]
+            evicted += 1
+
+        log.info(
+            f"Evicted {evicted} payloads from {self.directory}, "
+            f"{stored_bytes} bytes remain"
+        )
+
+        return stored_bytes
+
+    def get_mutex(self, key: str) -> Optional[Union[SqliteMutex, FileMutex]]:
+        """
+        Lock for key shared across processes, kept in the SQLite index or, for dbm
+        indexes, as a lock file next to the payload file of the key.
+
+        :param key: key of payload
+        :return: mutex or None if file locks are not available
+        """
+        if self.index_type == IndexType.SQLITE:
+            return SqliteMutex(self, key)
+
+        if not fcntl:
+            return None
+
+        return FileMutex(f"{self.path(self.digest(key))}.lock")
+
+    def delete(self, key: str) -> None:
+        """
+        Remove payload and metadata stored for key.
+
+        :param key: key of payload
+        """
+        with self._index("c") as index:
+            record = self._load_record(index.get(key))
+
+            if record:
+                del index[key]
+
+                self._set_stored_bytes(
+                    index, self._get_stored_bytes(index) - record["size"]
+                )
+
+        if record:
+            self._remove(record["digest"])
+        else:
+            self._remove_lock(self.digest(key))
+
+    def _remove(self, digest: str) -> None:
+        """ Remove the payload file of a digest along with its lock file """
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+        self._remove_lock(digest)
+
+    def _remove_lock(self, digest: str) -> None:
+        """ Remove the lock file of a digest, see get_mutex() """
+        if self.index_type == IndexType.DBM and fcntl:
+            FileMutex(f"{self.path(digest)}.lock").remove()
+
+
+class FileIndexStore:
+    """
+    SQLite store of the files of remote folders, e.g. the data files of a DWD
+    dataset. Every listing of a folder is kept as rows of its files with their
+    size and modification time, which are updated incrementally from new listings:
+    only added, removed and changed files are written. The files of a listing are
+    read back as a whole and grouped by station in memory.
+
+    Besides its url, a file is described by a station id and an optional date
+    range, given as strings of its start and end date ("YYYYMMDD").
+
+    Without a filename, the store is held in memory of the process.
+    """
+
+    COLUMNS = ["url", "station_id", "date_range", "from_date", "to_date"]
+
+    def __init__(self, filename: Optional[str] = None) -> None:
+        self.filename = filename
+
+        if filename:
+            self._database, self._uri = filename, False
+        else:
+            name = f"fileindex-{uuid.uuid4().hex}"
+            self._database, self._uri = f"file:{name}?mode=memory&cache=shared", True
+
+        # SQLite connections can neither be shared by threads nor survive a fork
+        self._local = threading.local()
+
+        # An in-memory database only lives as long as one of its connections
+        self._keeper = None if filename else self._connect()
+
+        # Locks of the listings being updated by threads of this process
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._database,
+            timeout=SQLITE_BUSY_TIMEOUT,
+            isolation_level=None,
+            uri=self._uri,
+        )
+
+        if self.filename:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "listing TEXT NOT NULL, url TEXT NOT NULL, size INTEGER, modified REAL, "
+            "station_id TEXT, date_range TEXT, from_date TEXT, to_date TEXT, "
+            "PRIMARY KEY (listing, url))"
+        )
+        # Index of earlier versions, which only cost time on every write
+        connection.execute("DROP INDEX IF EXISTS files_station")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS listings "
+            "(listing TEXT PRIMARY KEY, updated REAL, changed REAL)"
+        )
+
+        return connection
+
+    @contextmanager
+    def _connection(self, write: bool = False):
+        """
+        Connection of the current thread and process. Writes run in an immediate
+        transaction, which is committed on exit.
+        """
+        pid, connection = getattr(self._local, "connection", (None, None))
+
+        if pid != os.getpid():
+            connection = self._connect()
+
+            self._local.connection = (os.getpid(), connection)
+
+        if not write:
+            yield connection
+            return
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+
+    @contextmanager
+    def lock(self, listing: str) -> Iterator[None]:
+        """
+        Exclusive lock of a listing, held while it is updated. Stores kept in a file
+        are locked across all processes using the file as well, by a lock file
+        named by the hash of the listing.
+
+        :param listing: url of the listed folder
+        """
+        with self._locks_lock:
+            thread_lock = self._locks.setdefault(listing, threading.Lock())
+
+        with thread_lock:
+            if not (self.filename and fcntl):
+                yield
+                return
+
+            digest = hashlib.sha256(listing.encode("utf-8")).hexdigest()
+
+            mutex = FileMutex(os.path.join(f"{self.filename}.locks", digest))
+            mutex.acquire()
+
+            try:
+                yield
+            finally:
+                mutex.release()
+
+    def updated(self, listing: str) -> Optional[float]:
+        """
+        Time of the last update of a listing.
+
+        :param listing: url of the listed folder
+        :return: timestamp, None if the listing was never stored
+        """
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT updated FROM listings WHERE listing = ?", (listing,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def changed(self, listing: str) -> Optional[float]:
+        """
+        Time of the last change of the files of a listing.
+
+        :param listing: url of the listed folder
+        :return: timestamp, None if the listing was never stored
+        """
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT changed FROM listings WHERE listing = ?", (listing,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def update(
+        self,
+        listing: str,
+        files: List[Tuple[str, Optional[int], Optional[float]]],
+        describe: Callable[[List[str]], pd.DataFrame],
+    ) -> Dict[str, int]:
+        """
+        Update the files of a listing from a new listing of the folder.
+
+        :param listing: url of the listed folder
+        :param files: url, size and modification time of every file of the listing
+        :param describe: function describing added and changed files by a frame
+            with the columns of the store, files not described are left out
+        :return: number of added, removed and changed files
+        """
+        listed = {url: (size, modified) for url, size, modified in files}
+
+        with self._connection(write=True) as connection:
+            stored = {
+                url: (size, modified)
+                for url, size, modified in connection.execute(
+                    "SELECT url, size, modified FROM files WHERE listing = ?",
+                    (listing,),
+                )
+            }
+
+            added = [url for url in listed if url not in stored]
+            removed = [url for url in stored if url not in listed]
+            changed = [
+                url for url in listed if url in stored and listed[url] != stored[url]
+            ]
+
+            connection.executemany(
+                "DELETE FROM files WHERE listing = ? AND url = ?",
+                [(listing, url) for url in removed + changed],
+            )
+
+            if added or changed:
+                df = describe(added + changed).reindex(columns=self.COLUMNS)
+                df = df.astype(object).where(df.notna(), None)
+
+                connection.executemany(
+                    "INSERT INTO files (listing, url, size, modified, station_id, "
+                    "date_range, from_date, to_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (listing, url, *listed[url], station_id, *dates)
+                        for url, station_id, *dates in df.itertuples(
+                            index=False, name=None
+                        )
+                    ],
+                )
+
+            modified = bool(added or removed or changed)
+
+            # The time of the last change is strictly increasing, so changes within
+            # the same tick of the clock can be told apart
+            connection.execute(
+                "INSERT INTO listings (listing, updated, changed) VALUES (?, ?, ?) "
+                "ON CONFLICT (listing) DO UPDATE SET updated = excluded.updated, "
+                "changed = CASE WHEN ? "
+                "THEN MAX(excluded.changed, changed + 1e-6) ELSE changed END",
+                (listing, time.time(), time.time(), modified),
+            )
+
+        return {"added": len(added), "removed": len(removed), "changed": len(changed)}
+
+    def query(self, listing: str) -> pd.DataFrame:
+        """
+        Files of a listing, ordered by station id and url.
+
+        :param listing: url of the listed folder
+        :return: frame with the columns of the store
+        """
+        with self._connection() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM files WHERE listing = ? "
+                "ORDER BY station_id, url",
+                (listing,),
+            ).fetchall()
+
+        return pd.DataFrame(rows, columns=self.COLUMNS)
+
+    def stored_bytes(self) -> int:
+        """
+        Size of the database including its write-ahead log.
+
+        :return: stored bytes, 0 for stores held in memory
+        """
+        if not self.filename:
+            return 0
+
+        stored_bytes = 0
+        for filename in (self.filename, f"{self.filename}-wal"):
+            try:
+                stored_bytes += os.path.getsize(filename)
+            except FileNotFoundError:
+                pass
+
+        return stored_bytes
+
+    def clear(self) -> None:
+        """ Remove all listings """
+        with self._connection(write=True) as connection:
+            connection.execute("DELETE FROM files")
+            connection.execute("DELETE FROM listings")
+
+
+class FileStoreBackend(CacheBackend):
+    """
+    dogpile.cache backend keeping cached values in a :class:`PayloadStore`.
+
+    ``bytes`` values are stored as they are and read back as ``bytes``, ``BytesIO``
+    values and other binary file objects are stored as they are and read back as
+    memory-mapped :class:`MappedPayload`. All other values are pickled into the
+    payload file. Metadata set in ``entry_metadata`` is stored along with them.
+
+    Arguments:
+
+    - filename: path of the index file
+    - directory: directory for payload files, defaults to filename without
+      extension
+    - max_bytes: optional byte budget of the store
+    - eviction: eviction strategy once the budget is exceeded, "lru" or "lfu"
+    - index: type of the index, "dbm" or "sqlite"
+    """
+
+    _KIND_BYTES = "bytes"
+    _KIND_BUFFER = "buffer"
+    _KIND_PICKLE = "pickle"
+
+    def __init__(self, arguments: dict) -> None:
+        filename = arguments["filename"]
+        directory = arguments.get("directory", os.path.splitext(filename)[0])
+
+        self.store = PayloadStore(
+            directory=directory,
+            index_filename=filename,
+            max_bytes=arguments.get("max_bytes"),
+            eviction=arguments.get("eviction", Eviction.LRU),
+            index_type=arguments.get("index", IndexType.DBM),
+        )
+
+    def get_mutex(self, key: str):
+        return self.store.get_mutex(key)
+
+    def get(self, key: str):
+        stored = self.store.get(key)
+
+        if not stored:
+            return NO_VALUE
+
+        payload, metadata = stored
+
+        kind = metadata.get("kind")
+
+        if kind == self._KIND_BUFFER:
+            value = payload
+        else:
+            with payload:
+                if kind == self._KIND_BYTES:
+                    value = payload.getvalue()
+                else:
+                    value = pickle.loads(payload.getbuffer())  # noqa: S301
+
+        return CachedValue(value, metadata["dogpile"])
+
+    def get_multi(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: CachedValue) -> None:
+        payload, dogpile_metadata = value
+
+        metadata = {**entry_metadata.get(), "dogpile": dogpile_metadata}
+
+        # A revalidated value is still held by its own payload file, so only its
+        # metadata is renewed
+        if (
+            isinstance(payload, MappedPayload)
+            and payload.name == self.store.path(self.store.digest(key))
+            and self.store.update_metadata(key, {**metadata, "kind": self._KIND_BUFFER})
+        ):
+            return
+
+        position = None
+
+        if isinstance(payload, bytes):
+            kind, data = self._KIND_BYTES, payload
+        elif isinstance(payload, io.BytesIO):
+            kind, data = self._KIND_BUFFER, payload.getbuffer()
+        elif isinstance(payload, MappedPayload):
+            kind, data = self._KIND_BUFFER, payload.getbuffer()
+        elif hasattr(payload, "read"):
+            # Files spooled to disk are copied without being read into memory
+            kind, data = self._KIND_BUFFER, payload
+
+            position = payload.tell()
+            payload.seek(0)
+        else:
+            kind, data = self._KIND_PICKLE, pickle.dumps(payload)
+
+        try:
+            self.store.set(key, data, {**metadata, "kind": kind})
+        finally:
+            # The value is handed to the caller after it is stored
+            if position is not None:
+                payload.seek(position)
+
+    def set_multi(self, mapping) -> None:
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.store.delete(key)
+
+    def delete_multi(self, keys) -> None:
+        for key in keys:
+            self.delete(key)
+
+
+def sizeof(value: Any) -> int:
+    """
+    Estimate the number of bytes held by a cached value.
+
+    :param value: cached value
+    :return: size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    elif isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    elif isinstance(value, (bytes, bytearray)):
+        return len(value)
+
+    return sys.getsizeof(value)
+
+
+class MemoryTier(ProxyBackend):
+    """
+    In-process tier in front of a cache backend, keeping recently used values as
+    live Python objects, so hot values are not unpickled again on every access.
+    Values are held until ``max_bytes`` is exceeded, then the least recently used
+    ones are dropped. Expiration is still decided by the cache region, based on
+    the metadata kept along with the value.
+
+    Like the dogpile memory backend, this hands out the very same object on every
+    access, so cached values must not be modified in place.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        super(MemoryTier, self).__init__()
+
+        self.max_bytes = max_bytes
+        self.held_bytes = 0
+
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _hold(self, key: str, value: CachedValue) -> None:
+        size = sizeof(value.payload)
+
+        with self._lock:
+            self._drop(key)
+
+            if size > self.max_bytes:
+                return
+
+            self._values[key] = (value, size)
+            self.held_bytes += size
+
+            while self.held_bytes > self.max_bytes:
+                _, (_, dropped_size) = self._values.popitem(last=False)
+                self.held_bytes -= dropped_size
+
+    def _drop(self, key: str) -> None:
+        held = self._values.pop(key, None)
+
+        if held:
+            self.held_bytes -= held[1]
+
+    def get(self, key: str):
+        with self._lock:
+            held = self._values.get(key)
+
+            if held:
+                self._values.move_to_end(key)
+                return held[0]
+
+        value = self.proxied.get(key)
+
+        if value is not NO_VALUE:
+            self._hold(key, value)
+
+        return value
+
+    def get_multi(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: CachedValue) -> None:
+        self.proxied.set(key, value)
+        self._hold(key, value)
+
+    def set_multi(self, mapping) -> None:
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._drop(key)
+
+        self.proxied.delete(key)
+
+    def delete_multi(self, keys) -> None:
+        for key in keys:
+            self.delete(key)
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021, earthobservations developers.
+# Distributed under the MIT License. See LICENSE for more info.
+"""
+Transport layer of all network access. Sessions of all providers are created with
+``create_session``, whose adapters are selected by ``WD_TRANSPORT``:
+
+- ``http`` (default): live access to the servers via HTTP(S) and FTP
+- ``local``: a local directory tree in place of all servers, where a url like
+  ``https://opendata.dwd.de/weather/`` is read from ``<root>/opendata.dwd.de/weather/``
+- ``record``: live access, while all responses are recorded into a replay store
+- ``replay``: responses are answered from a replay store, without network access
+
+The directory tree or replay store is given by ``WD_TRANSPORT_ROOT``.
+
+Live HTTP access follows a transport policy: connections are pooled according to
+the download concurrency, failed requests are retried with exponential backoff
+and jitter, and requests can be limited per host.
+"""
+import hashlib
+import html
+import json
+import logging
+import os
+import random
+import threading
+import time
+from enum import Enum
+from io import BytesIO
+from typing import Dict, Optional
+from urllib.parse import quote, urlparse
+from urllib.request import url2pathname
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests_ftp.ftp import FTPAdapter
+from urllib3 import Retry
+
+from wetterdienst.util.engine import DOWNLOAD_CONCURRENCY
+from wetterdienst.util.instrumentation import record_response
+
+log = logging.getLogger(__name__)
+
+# Retries of failed requests
+HTTP_RETRIES = int(os.environ.get("WD_HTTP_RETRIES", 3))
+
+# Base of the exponential backoff between retries in seconds
+HTTP_BACKOFF = float(os.environ.get("WD_HTTP_BACKOFF", 0.5))
+
+# Responses that are retried
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Requests per second and host, 0 for no limit
+HTTP_RATE_LIMIT = float(os.environ.get("WD_HTTP_RATE_LIMIT", 0))
+
+# Requests per host that may be sent at once before the rate limit applies
+HTTP_RATE_BURST = int(os.environ.get("WD_HTTP_RATE_BURST", DOWNLOAD_CONCURRENCY))
+
+
+class TransportType(Enum):
+    HTTP = "http"
+    LOCAL = "local"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+transport_type = TransportType(os.environ.get("WD_TRANSPORT", "http").lower())
+transport_root = os.environ.get("WD_TRANSPORT_ROOT")
+
+
+def _response(request: requests.PreparedRequest, status_code: int) -> requests.Response:
+    """ Empty response to a request """
+    response = requests.Response()
+    response.url = request.url
+    response.request = request
+    response.status_code = status_code
+    response.reason = requests.status_codes._codes[status_code][0].upper()
+    response.raw = BytesIO(b"")
+
+    return response
+
+
+class JitteredRetry(Retry):
+    """
+    Retry with exponential backoff, where every wait is drawn at random up to the
+    backoff, so clients failing at the same time do not retry at the same time.
+    """
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+
+class TokenBucket:
+    """ Token bucket limiting the rate of requests """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        :param rate: tokens added per second
+        :param burst: maximum number of tokens
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """ Take a token, waiting until one is available """
+        with self._lock:
+            now = time.monotonic()
+
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            self._tokens -= 1
+
+            # Tokens are reserved in order, so waiting callers do not overtake
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket(host: str) -> TokenBucket:
+    """ Token bucket of a host, shared by all sessions """
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(HTTP_RATE_LIMIT, HTTP_RATE_BURST)
+
+        return _buckets[host]
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """ HTTP adapter limiting the requests per host according to HTTP_RATE_LIMIT """
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if HTTP_RATE_LIMIT > 0:
+            _bucket(urlparse(request.url).netloc).acquire()
+
+        return super().send(request, **kwargs)
+
+
+def url_to_path(root: str, url: str) -> str:
+    """
+    Local path of a url within a directory tree with one folder per host, as read
+    by the local transport and written by mirrors. Query strings are part of the
+    file name, quoted like in urls, e.g. ``bulk_data_e.html%3Fformat%3Dcsv``.
+
+    :param root: root of the directory tree
+    :param url: url of the resource
+    :return: path of the resource
+    """
+    url = urlparse(url)
+
+    path = url2pathname(url.path)
+    if url.query:
+        path += quote(f"?{url.query}", safe="")
+
+    return os.path.join(root, url.hostname or "", path.lstrip(os.sep))
+
+
+class FileAdapter(BaseAdapter):
+    """
+    Transport adapter answering requests of file:// urls from the local file system
+    like a web server, so a local mirror can be used in place of a remote server.
+    Directories are answered with a listing in the format of the DWD server.
+    """
+
+    def _path(self, url: str) -> str:
+        """ Local path of a url """
+        return url2pathname(urlparse(url).path)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        path = self._path(request.url)
+
+        if os.path.isdir(path):
+            content = self._render_listing(path)
+        elif os.path.isfile(path):
+            with open(path, "rb") as f:
+                content = f.read()
+        else:
+            return _response(request, requests.codes.not_found)
+
+        response = _response(request, requests.codes.ok)
+        response.headers["Content-Length"] = str(len(content))
+        response.raw = BytesIO(content)
+
+        return response
+
+    @staticmethod
+    def _render_listing(path: str) -> bytes:
+        """ Listing of a directory with modification time and size of every file """
+        lines = ['<html><body><pre><a href="../">../</a>']
+
+        for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+            stat = entry.stat()
+
+            name, size = entry.name, str(stat.st_size)
+            if entry.is_dir():
+                name, size = f"{name}/", "-"
+
+            modified = time.strftime("%d-%b-%Y %H:%M", time.gmtime(stat.st_mtime))
+
+            lines.append(
+                f'<a href="{quote(name)}">{html.escape(name)}</a> {modified} {size}'
+            )
+
+        lines.append("</pre></body></html>")
+
+        return "\n".join(lines).encode()
+
+    def close(self) -> None:
+        pass
+
+
+class LocalAdapter(FileAdapter):
+    """
+    Transport adapter answering requests of remote urls from a local directory tree
+    with one folder per host, see ``url_to_path``.
+    """
+
+    def __init__(self, root: str) -> None:
+        super().__init__()
+        self.root = root
+
+    def _path(self, url: str) -> str:
+        return url_to_path(self.root, url)
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter answering requests from a replay store of recorded responses.
+    Given an adapter, requests are sent with it and their responses are recorded.
+    """
+
+    def __init__(self, root: str, adapter: Optional[BaseAdapter] = None) -> None:
+        super().__init__()
+        self.root = root
+        self.adapter = adapter
+
+    def _path(self, request: requests.PreparedRequest) -> str:
+        """ Path of a recorded response, without extension """
+        key = f"{request.method} {request.url} {request.headers.get('Range', '')}"
+
+        return os.path.join(self.root, hashlib.sha256(key.encode()).hexdigest())
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        path = self._path(request)
+
+        if self.adapter:
+            response = self.adapter.send(request, **kwargs)
+
+            self._record(path, response)
+
+            return response
+
+        try:
+            with open(f"{path}.json") as f:
+                recorded = json.load(f)
+        except FileNotFoundError:
+            raise requests.ConnectionError(
+                f"No recorded response for {request.method} {request.url}",
+                request=request,
+            )
+
+        response = _response(request, recorded["status_code"])
+        response.headers.update(recorded["headers"])
+
+        with open(f"{path}.body", "rb") as f:
+            response.raw = BytesIO(f.read())
+
+        return response
+
+    def _record(self, path: str, response: requests.Response) -> None:
+        """ Record a response, its content can still be read afterwards """
+        content = response.content
+
+        os.makedirs(self.root, exist_ok=True)
+
+        with open(f"{path}.body", "wb") as f:
+            f.write(content)
+
+        with open(f"{path}.json", "w") as f:
+            json.dump(
+                {
+                    "url": response.url,
+                    "status_code": response.status_code,
+                    "headers": dict(response.headers),
+                },
+                f,
+            )
+
+        # Content is decoded already
+        response.headers.pop("Content-Encoding", None)
+
+    def close(self) -> None:
+        if self.adapter:
+            self.adapter.close()
+
+
+def create_session(
+    retries: Optional[int] = None, pool_maxsize: int = DOWNLOAD_CONCURRENCY
+) -> requests.Session:
+    """
+    Create a session with the adapters of the selected transport.
+
+    :param retries: retries of failed HTTP requests, defaults to WD_HTTP_RETRIES
+    :param pool_maxsize: number of pooled connections per host, defaults to the
+        download concurrency
+    :return: session
+    """
+    session = requests.Session()
+
+    session.hooks["response"].append(record_response)
+
+    # Local files are always read from disk, e.g. a local mirror
+    session.mount("file://", FileAdapter())
+
+    if transport_type == TransportType.LOCAL:
+        adapter = LocalAdapter(transport_root)
+
+        for prefix in ("http://", "https://", "ftp://"):
+            session.mount(prefix, adapter)
+
+        return session
+
+    max_retries = JitteredRetry(
+        total=HTTP_RETRIES if retries is None else retries,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=HTTP_RETRY_STATUS,
+        # Pass the last failed response on, it is raised by the caller
+        raise_on_status=False,
+    )
+
+    http_adapter = RateLimitedAdapter(
+        max_retries=max_retries,
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+    )
+
+    adapters = {
+        "http://": http_adapter,
+        "https://": http_adapter,
+        "ftp://": FTPAdapter(),
+    }
+
+    for prefix, adapter in adapters.items():
+        if transport_type == TransportType.RECORD:
+            adapter = ReplayAdapter(transport_root, adapter)
+        elif transport_type == TransportType.REPLAY:
+            adapter = ReplayAdapter(transport_root)
+
+        session.mount(prefix, adapter)
+
+    return session